@@ -12,7 +12,7 @@ load_dotenv()
 
 from app.db.base import Base
 # Import models so they register with Base.metadata
-from app.db.models import customer, invoice, payment
+from app.db.models import customer, invoice, payment, aging, idempotency, event, invoice_tombstone
 target_metadata = Base.metadata
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,43 @@
+"""add customer name search indexes
+
+Revision ID: 0b4d7e2a9c51
+Revises: f6a1d0b7c385
+Create Date: 2026-10-17 19:02:11.508394
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b4d7e2a9c51'
+down_revision: Union[str, Sequence[str], None] = 'f6a1d0b7c385'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Bytewise key: a prefix is an index range, and ORDER BY walks the same index
+    op.create_index(
+        'ix_customers_name_search_key_id',
+        'customers',
+        [sa.text('lower(name) COLLATE "C"'), 'id'],
+        unique=False,
+    )
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_customers_name_trgm',
+        'customers',
+        [sa.text('lower(name) gin_trgm_ops')],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_customers_name_trgm', table_name='customers')
+    op.drop_index('ix_customers_name_search_key_id', table_name='customers')
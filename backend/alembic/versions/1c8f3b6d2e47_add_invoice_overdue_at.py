@@ -0,0 +1,38 @@
+"""add invoices.overdue_at and the overdue sweep index
+
+Revision ID: 1c8f3b6d2e47
+Revises: 0b4d7e2a9c51
+Create Date: 2026-10-17 20:14:52.731906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c8f3b6d2e47'
+down_revision: Union[str, Sequence[str], None] = '0b4d7e2a9c51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable, no default: a metadata-only change, no table rewrite
+    op.add_column('invoices', sa.Column('overdue_at', sa.DateTime(timezone=True), nullable=True))
+    # Only unflagged PENDING invoices; the first sweep flags the existing backlog
+    op.create_index(
+        'ix_invoices_overdue_sweep',
+        'invoices',
+        ['due_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING' AND overdue_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_invoices_overdue_sweep', table_name='invoices')
+    op.drop_column('invoices', 'overdue_at')
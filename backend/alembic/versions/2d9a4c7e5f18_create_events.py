@@ -0,0 +1,42 @@
+"""create events outbox table
+
+Revision ID: 2d9a4c7e5f18
+Revises: 1c8f3b6d2e47
+Create Date: 2026-10-17 21:03:27.184620
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d9a4c7e5f18'
+down_revision: Union[str, Sequence[str], None] = '1c8f3b6d2e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'events',
+        sa.Column('seq', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+        # pg_current_xact_id() of the writing transaction, set by add_events
+        sa.Column('txid', sa.BigInteger(), nullable=False),
+        sa.Column('type', sa.String(length=40), nullable=False),
+        sa.Column('invoice_id', sa.Integer(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('seq'),
+    )
+    op.create_index('ix_events_txid_seq', 'events', ['txid', 'seq'], unique=False)
+    op.create_index('ix_events_created_at', 'events', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_created_at', table_name='events')
+    op.drop_index('ix_events_txid_seq', table_name='events')
+    op.drop_table('events')
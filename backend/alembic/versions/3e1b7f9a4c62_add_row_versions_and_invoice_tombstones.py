@@ -0,0 +1,57 @@
+"""add row_version change markers and invoice_tombstones
+
+Revision ID: 3e1b7f9a4c62
+Revises: 2d9a4c7e5f18
+Create Date: 2026-10-17 22:41:08.519374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e1b7f9a4c62'
+down_revision: Union[str, Sequence[str], None] = '2d9a4c7e5f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same expression the models use for inserts and updates (next_row_version)
+# and declare as the server default (row_version_server_default)
+CURRENT_TXID = 'pg_current_xact_id()::text::bigint'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('invoices', 'payments'):
+        # A constant default is a metadata-only change: existing rows read as
+        # version 0, i.e. part of any sync that starts from the beginning
+        op.add_column(table, sa.Column('row_version', sa.BigInteger(), server_default='0', nullable=False))
+        # New rows are stamped by the application; the server default covers
+        # raw SQL writers such as bulk_import's COPY path
+        op.alter_column(table, 'row_version', server_default=sa.text(CURRENT_TXID))
+        op.create_index(f'ix_{table}_row_version_id', table, ['row_version', 'id'], unique=False)
+
+    op.create_table(
+        'invoice_tombstones',
+        sa.Column('invoice_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('row_version', sa.BigInteger(), server_default=sa.text(CURRENT_TXID), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('invoice_id'),
+    )
+    op.create_index(
+        'ix_invoice_tombstones_row_version_invoice_id',
+        'invoice_tombstones',
+        ['row_version', 'invoice_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_invoice_tombstones_row_version_invoice_id', table_name='invoice_tombstones')
+    op.drop_table('invoice_tombstones')
+    for table in ('payments', 'invoices'):
+        op.drop_index(f'ix_{table}_row_version_id', table_name=table)
+        op.drop_column(table, 'row_version')
@@ -0,0 +1,30 @@
+"""add invoice keyset pagination indexes
+
+Revision ID: 3f9c1a7e5b20
+Revises: 6daaa2d10dae
+Create Date: 2026-10-17 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1a7e5b20'
+down_revision: Union[str, Sequence[str], None] = '6daaa2d10dae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_invoices_issued_at_id', 'invoices', ['issued_at', 'id'], unique=False)
+    op.create_index('ix_invoices_customer_id_issued_at_id', 'invoices', ['customer_id', 'issued_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_invoices_customer_id_issued_at_id', table_name='invoices')
+    op.drop_index('ix_invoices_issued_at_id', table_name='invoices')
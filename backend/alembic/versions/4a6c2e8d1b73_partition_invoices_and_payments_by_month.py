@@ -0,0 +1,214 @@
+"""partition invoices and payments by month
+
+Revision ID: 4a6c2e8d1b73
+Revises: 3e1b7f9a4c62
+Create Date: 2026-10-17 23:58:41.207316
+
+Invoices are range-partitioned on issued_at, one partition per calendar
+month (UTC), named invoices_pYYYYMM. Payments are partitioned the same way
+on invoice_issued_at, a copy of their invoice's issued_at, so an invoice and
+its payments always share a month and the detail join touches one partition
+of each. Rows outside every monthly partition go to invoices_default /
+payments_default.
+
+Partitioned tables need the partition key in every unique constraint, so
+the primary keys become (id, issued_at) and (id, invoice_issued_at) and the
+payments foreign key becomes (invoice_id, invoice_issued_at) -> invoices
+(id, issued_at). Ids still come from the existing sequences and stay unique.
+
+This rebuilds both tables (copy, drop, rename) under an exclusive lock: run
+it in a maintenance window. Partitions are created from the month of the
+oldest invoice to MONTHS_AHEAD months past the current one; after that the
+worker's partition_maintenance job keeps creating them ahead of time
+through create_monthly_partitions().
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a6c2e8d1b73'
+down_revision: Union[str, Sequence[str], None] = '3e1b7f9a4c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same as the PARTITION_MONTHS_AHEAD default
+MONTHS_AHEAD = 3
+
+# Same expression the models use for inserts and updates (next_row_version)
+# and declare as the server default (row_version_server_default)
+CURRENT_TXID = 'pg_current_xact_id()::text::bigint'
+
+# create_monthly_partitions(parent, first_month, months): partitions of parent
+# for first_month and the `months` months after it, skipping ones that exist.
+# Returns how many it created. Fails if the default partition already holds
+# rows for a month being created; move them out first.
+CREATE_MONTHLY_PARTITIONS = """
+CREATE OR REPLACE FUNCTION create_monthly_partitions(parent text, first_month date, months integer)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month_start date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    FOR i IN 0..months LOOP
+        month_start := (date_trunc('month', first_month::timestamp) + make_interval(months => i))::date;
+        partition_name := format('%s_p%s', parent, to_char(month_start, 'YYYYMM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                parent,
+                month_start::timestamp AT TIME ZONE 'UTC',
+                (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+
+INVOICE_COLUMNS = 'id, customer_id, amount, currency, amount_paid, issued_at, due_at, status, overdue_at, row_version'
+PAYMENT_COLUMNS = 'id, invoice_id, amount, paid_at, row_version'
+
+INVOICE_INDEXES = {
+    'ix_invoices_receivables': '(customer_id, currency, status) INCLUDE (due_at, amount, amount_paid, issued_at)',
+    'ix_invoices_customer_id_issued_at_id': '(customer_id, issued_at, id)',
+    'ix_invoices_customer_id_status_issued_at_id': '(customer_id, status, issued_at, id)',
+    'ix_invoices_status_issued_at_id': '(status, issued_at, id)',
+    'ix_invoices_issued_at_id': '(issued_at, id)',
+    'ix_invoices_overdue_sweep': "(due_at, id) WHERE status = 'PENDING' AND overdue_at IS NULL",
+    'ix_invoices_row_version_id': '(row_version, id)',
+}
+PAYMENT_INDEXES = {
+    'ix_payments_invoice_id': '(invoice_id)',
+    'ix_payments_row_version_id': '(row_version, id)',
+}
+
+
+def _rebuild(partitioned: bool) -> None:
+    """
+    Recreate invoices and payments, partitioned or not, and move the rows
+    across. Keys and indexes are added once the old tables are gone, so
+    they keep their names.
+    """
+    for table in ('invoices', 'payments'):
+        op.execute(f'ALTER TABLE {table} RENAME TO {table}_old')
+
+    op.execute(f"""
+        CREATE TABLE invoices (
+            id integer NOT NULL DEFAULT nextval('invoices_id_seq'),
+            customer_id integer NOT NULL,
+            amount numeric(12, 2) NOT NULL,
+            currency varchar(3) NOT NULL,
+            amount_paid numeric(12, 2) NOT NULL DEFAULT '0',
+            issued_at timestamptz NOT NULL,
+            due_at timestamptz NOT NULL,
+            status invoice_status NOT NULL,
+            overdue_at timestamptz,
+            row_version bigint NOT NULL DEFAULT {CURRENT_TXID},
+            CONSTRAINT ck_invoices_amount_positive CHECK (amount > 0),
+            CONSTRAINT ck_invoices_currency_nonempty CHECK (currency <> ''),
+            CONSTRAINT ck_invoices_amount_paid_range CHECK (amount_paid >= 0 AND amount_paid <= amount)
+        ) {'PARTITION BY RANGE (issued_at)' if partitioned else ''}
+    """)
+    op.execute(f"""
+        CREATE TABLE payments (
+            id integer NOT NULL DEFAULT nextval('payments_id_seq'),
+            invoice_id integer NOT NULL,
+            {'invoice_issued_at timestamptz NOT NULL,' if partitioned else ''}
+            amount numeric(12, 2) NOT NULL,
+            paid_at timestamptz NOT NULL,
+            row_version bigint NOT NULL DEFAULT {CURRENT_TXID},
+            CONSTRAINT ck_payments_amount_positive CHECK (amount > 0)
+        ) {'PARTITION BY RANGE (invoice_issued_at)' if partitioned else ''}
+    """)
+
+    if partitioned:
+        op.execute(CREATE_MONTHLY_PARTITIONS)
+        for table in ('invoices', 'payments'):
+            op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+        # Same months for both tables, oldest invoice through MONTHS_AHEAD from now
+        op.execute(f"""
+            SELECT
+                create_monthly_partitions('invoices', first_month, months),
+                create_monthly_partitions('payments', first_month, months)
+            FROM (
+                SELECT
+                    first_month,
+                    (
+                        extract(year FROM age(this_month, first_month)) * 12
+                        + extract(month FROM age(this_month, first_month))
+                    )::integer + {MONTHS_AHEAD} AS months
+                FROM (
+                    SELECT
+                        date_trunc('month', COALESCE(min(issued_at), now()) AT TIME ZONE 'UTC')::date AS first_month,
+                        date_trunc('month', now() AT TIME ZONE 'UTC')::date AS this_month
+                    FROM invoices_old
+                ) AS extent
+            ) AS bounds
+        """)
+
+    op.execute(f'INSERT INTO invoices ({INVOICE_COLUMNS}) SELECT {INVOICE_COLUMNS} FROM invoices_old')
+    if partitioned:
+        op.execute(f"""
+            INSERT INTO payments ({PAYMENT_COLUMNS}, invoice_issued_at)
+            SELECT p.id, p.invoice_id, p.amount, p.paid_at, p.row_version, i.issued_at
+            FROM payments_old p
+            JOIN invoices_old i ON i.id = p.invoice_id
+        """)
+    else:
+        op.execute(f'INSERT INTO payments ({PAYMENT_COLUMNS}) SELECT {PAYMENT_COLUMNS} FROM payments_old')
+
+    # The sequences move to the new tables before the old ones are dropped
+    for table in ('invoices', 'payments'):
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    op.execute('DROP TABLE payments_old')
+    op.execute('DROP TABLE invoices_old')
+
+    if partitioned:
+        op.execute('ALTER TABLE invoices ADD CONSTRAINT invoices_pkey PRIMARY KEY (id, issued_at)')
+        op.execute('ALTER TABLE payments ADD CONSTRAINT payments_pkey PRIMARY KEY (id, invoice_issued_at)')
+    else:
+        op.execute('ALTER TABLE invoices ADD CONSTRAINT invoices_pkey PRIMARY KEY (id)')
+        op.execute('ALTER TABLE payments ADD CONSTRAINT payments_pkey PRIMARY KEY (id)')
+    op.execute("""
+        ALTER TABLE invoices ADD CONSTRAINT invoices_customer_id_fkey
+        FOREIGN KEY (customer_id) REFERENCES customers (id) ON DELETE RESTRICT
+    """)
+    if partitioned:
+        # ON UPDATE CASCADE: a draft whose issued_at changes takes its payments along
+        op.execute("""
+            ALTER TABLE payments ADD CONSTRAINT payments_invoice_id_fkey
+            FOREIGN KEY (invoice_id, invoice_issued_at) REFERENCES invoices (id, issued_at)
+            ON UPDATE CASCADE ON DELETE CASCADE
+        """)
+    else:
+        op.execute("""
+            ALTER TABLE payments ADD CONSTRAINT payments_invoice_id_fkey
+            FOREIGN KEY (invoice_id) REFERENCES invoices (id) ON DELETE CASCADE
+        """)
+
+    # On a partitioned table each index is created on every partition,
+    # existing and future
+    for table, indexes in (('invoices', INVOICE_INDEXES), ('payments', PAYMENT_INDEXES)):
+        for name, definition in indexes.items():
+            op.execute(f'CREATE INDEX {name} ON {table} {definition}')
+
+    for table in ('invoices', 'payments'):
+        op.execute(f'ANALYZE {table}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rebuild(partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rebuild(partitioned=False)
+    op.execute('DROP FUNCTION create_monthly_partitions(text, date, integer)')
@@ -0,0 +1,50 @@
+"""add invoice amount_paid running total
+
+Revision ID: a7d2e4c81f36
+Revises: 3f9c1a7e5b20
+Create Date: 2026-10-17 10:02:17.884310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2e4c81f36'
+down_revision: Union[str, Sequence[str], None] = '3f9c1a7e5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'invoices',
+        sa.Column('amount_paid', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False),
+    )
+    # Backfill from existing payments
+    op.execute(
+        """
+        UPDATE invoices
+        SET amount_paid = totals.total
+        FROM (
+            SELECT invoice_id, SUM(amount) AS total
+            FROM payments
+            GROUP BY invoice_id
+        ) AS totals
+        WHERE totals.invoice_id = invoices.id
+        """
+    )
+    op.create_check_constraint(
+        'ck_invoices_amount_paid_range',
+        'invoices',
+        'amount_paid >= 0 AND amount_paid <= amount',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ck_invoices_amount_paid_range', 'invoices', type_='check')
+    op.drop_column('invoices', 'amount_paid')
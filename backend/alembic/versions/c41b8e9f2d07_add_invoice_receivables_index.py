@@ -0,0 +1,34 @@
+"""add covering index for the receivables report
+
+Revision ID: c41b8e9f2d07
+Revises: a7d2e4c81f36
+Create Date: 2026-10-17 14:03:27.118420
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41b8e9f2d07'
+down_revision: Union[str, Sequence[str], None] = 'a7d2e4c81f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_invoices_receivables',
+        'invoices',
+        ['customer_id', 'currency', 'status'],
+        unique=False,
+        postgresql_include=['due_at', 'amount', 'amount_paid', 'issued_at'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_invoices_receivables', table_name='invoices')
@@ -0,0 +1,48 @@
+"""create receivable_aging summary table
+
+Revision ID: d8e5a3c1b9f4
+Revises: c41b8e9f2d07
+Create Date: 2026-10-17 15:26:09.771304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e5a3c1b9f4'
+down_revision: Union[str, Sequence[str], None] = 'c41b8e9f2d07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'receivable_aging',
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('due_on', sa.Date(), nullable=False),
+        sa.Column('balance', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('invoice_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ondelete='RESTRICT'),
+        sa.PrimaryKeyConstraint('customer_id', 'currency', 'due_on'),
+    )
+    # Backfill from the open invoices (same result as python -m app.db.rebuild_aging)
+    op.execute(
+        """
+        INSERT INTO receivable_aging (customer_id, currency, due_on, balance, invoice_count)
+        SELECT customer_id, currency, (due_at AT TIME ZONE 'UTC')::date,
+               SUM(amount - amount_paid), COUNT(*)
+        FROM invoices
+        WHERE status = 'PENDING'
+        GROUP BY customer_id, currency, (due_at AT TIME ZONE 'UTC')::date
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('receivable_aging')
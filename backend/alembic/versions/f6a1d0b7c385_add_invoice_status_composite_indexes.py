@@ -0,0 +1,40 @@
+"""add composite indexes for status list filters
+
+Revision ID: f6a1d0b7c385
+Revises: e2f7c9a4d613
+Create Date: 2026-10-17 17:35:40.226871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a1d0b7c385'
+down_revision: Union[str, Sequence[str], None] = 'e2f7c9a4d613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_invoices_status_issued_at_id', 'invoices', ['status', 'issued_at', 'id'], unique=False)
+    op.create_index(
+        'ix_invoices_customer_id_status_issued_at_id',
+        'invoices',
+        ['customer_id', 'status', 'issued_at', 'id'],
+        unique=False,
+    )
+    # Both are leading prefixes of the composite indexes
+    op.drop_index('ix_invoices_status', table_name='invoices')
+    op.drop_index('ix_invoices_customer_id', table_name='invoices')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_invoices_customer_id', 'invoices', ['customer_id'], unique=False)
+    op.create_index('ix_invoices_status', 'invoices', ['status'], unique=False)
+    op.drop_index('ix_invoices_customer_id_status_issued_at_id', table_name='invoices')
+    op.drop_index('ix_invoices_status_issued_at_id', table_name='invoices')
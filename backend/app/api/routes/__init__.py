@@ -1,3 +1,3 @@
-from app.api.routes import invoices, customers
+from app.api.routes import invoices, customers, payments, reports
 
-__all__ = ["invoices", "customers"]
\ No newline at end of file
+__all__ = ["invoices", "customers", "payments", "reports"]
\ No newline at end of file
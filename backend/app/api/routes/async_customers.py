@@ -0,0 +1,82 @@
+from typing import Literal, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.async_session import get_async_db
+from app.db.models.customer import Customer
+from app.db.models.invoice import InvoiceStatus
+from app.api.schemas.customer import CustomerCreate, CustomerPage, CustomerResponse
+from app.api.schemas.invoice import InvoicePage
+from app.api.services.async_customer_service import get_customers_by_ids, search_customers
+from app.api.services.async_invoice_service import list_invoice_summaries
+from app.api.services.customer_service import CustomerError, parse_customer_ids
+from app.api.services.invoice_service import InvoiceError, invoice_page_response, parse_invoice_fields
+from app.api.services.pagination import CursorError, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+# Async mirror of routes/customers.py, mounted ahead of it when DB_ASYNC is enabled
+router = APIRouter(prefix="/customers", tags=["customers"])
+
+
+@router.post("", response_model=CustomerResponse, status_code=201)
+async def create_customer_endpoint(
+    customer_data: CustomerCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new customer"""
+    try:
+        customer = Customer(name=customer_data.name)
+        db.add(customer)
+        await db.commit()
+        await db.refresh(customer)
+        return customer
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("", response_model=CustomerPage)
+async def list_customers_endpoint(
+    q: Optional[str] = Query(None, max_length=255, description="Name search: names starting with q first, then names containing it"),
+    ids: Optional[str] = Query(None, description="Comma-separated ids to look up instead (q, limit and cursor are ignored)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Search customers by name, or list them in name order, one page at a time"""
+    try:
+        if ids is not None:
+            return await get_customers_by_ids(db, parse_customer_ids(ids))
+        return await search_customers(db, q, limit=limit, cursor=cursor)
+    except (CursorError, CustomerError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{customer_id:int}/invoices", response_model=InvoicePage)
+async def get_customer_invoices_endpoint(
+    customer_id: int,
+    status: Optional[InvoiceStatus] = Query(None, description="Filter by invoice status"),
+    from_date: Optional[datetime] = Query(None, alias="from", description="Filter invoices issued from this date"),
+    to_date: Optional[datetime] = Query(None, alias="to", description="Filter invoices issued to this date"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include: Optional[Literal["payments"]] = Query(None, description="payments: embed each invoice's payments"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (id is always included)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List invoice summaries for a customer with optional filters, one page at a time"""
+    try:
+        page = await list_invoice_summaries(
+            db,
+            parse_invoice_fields(fields),
+            include_payments=include == "payments",
+            customer_id=customer_id,
+            status=status,
+            from_date=from_date,
+            to_date=to_date,
+            limit=limit,
+            cursor=cursor
+        )
+    except (CursorError, InvoiceError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return invoice_page_response(page)
@@ -0,0 +1,206 @@
+import asyncio
+from typing import Literal, Optional, Union
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.async_session import get_async_db
+from app.db.models.invoice import InvoiceStatus
+from app.api.schemas.invoice import InvoiceCreate, InvoiceResponse, InvoiceDraftUpdate, InvoicePage, InvoiceChanges
+from app.api.schemas.payment import PaymentCreate, PaymentResponse
+from app.api.services.async_invoice_service import (
+    create_invoice,
+    get_invoice_detail,
+    update_invoice,
+    post_invoice,
+    void_invoice,
+    delete_invoice,
+    list_invoice_summaries,
+    list_invoice_changes,
+)
+from app.api.services import invoice_service, payment_service
+from app.api.services.invoice_service import (
+    InvoiceError,
+    invoice_changes_response,
+    invoice_page_response,
+    parse_invoice_fields,
+)
+from app.api.services.async_payment_service import record_payment
+from app.api.services.payment_service import PaymentError
+from app.api.services.payment_pipeline import PIPELINE_TIMEOUT_DETAIL, payment_pipeline
+from app.api.services.idempotency_service import IdempotencyError, run_idempotent, idempotent_response
+from app.api.services.invoice_cache import get_cached_invoice, cache_invoice, invoice_response
+from app.api.services.pagination import CursorError, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+# Async mirror of the hot routes in routes/invoices.py, mounted ahead of it
+# when DB_ASYNC is enabled. Path params use the :int convertor so literal
+# sub-paths such as /invoices/export fall through to the sync router.
+router = APIRouter(prefix="/invoices", tags=["invoices"])
+
+
+@router.post("", response_model=InvoiceResponse, status_code=201)
+async def create_invoice_endpoint(
+    invoice_data: InvoiceCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new invoice (retries with the same Idempotency-Key replay the first response)"""
+    try:
+        if idempotency_key:
+            # The whole claim/operation/store sequence runs on the sync session
+            result = await db.run_sync(
+                run_idempotent, idempotency_key, "POST /invoices", invoice_data,
+                lambda session: InvoiceResponse.model_validate(invoice_service.create_invoice(session, invoice_data)),
+            )
+            return idempotent_response(result)
+        invoice = await create_invoice(db, invoice_data)
+        return invoice
+    except IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{invoice_id:int}", response_model=InvoiceResponse)
+async def get_invoice_endpoint(
+    invoice_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get invoice details including payments (cached; supports ETag / If-None-Match)"""
+    entry = get_cached_invoice(invoice_id)
+    if entry is None:
+        invoice = await get_invoice_detail(db, invoice_id)
+        if not invoice:
+            raise HTTPException(status_code=404, detail=f"Invoice {invoice_id} not found")
+        entry = cache_invoice(invoice)
+    return invoice_response(entry, if_none_match)
+
+
+@router.patch("/{invoice_id:int}", response_model=InvoiceResponse)
+async def update_invoice_endpoint(
+    invoice_id: int,
+    data: InvoiceDraftUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update a DRAFT invoice (amount, currency, issued_at, due_at). Only DRAFT can be updated."""
+    try:
+        invoice = await update_invoice(db, invoice_id, data)
+        return invoice
+    except InvoiceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{invoice_id:int}/post", response_model=InvoiceResponse)
+async def post_invoice_endpoint(invoice_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Send invoice for payment (DRAFT → PENDING)."""
+    try:
+        invoice = await post_invoice(db, invoice_id)
+        return invoice
+    except InvoiceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{invoice_id:int}/void", response_model=InvoiceResponse)
+async def void_invoice_endpoint(invoice_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Cancel invoice (set status to VOID). Only PENDING invoices can be voided."""
+    try:
+        invoice = await void_invoice(db, invoice_id)
+        return invoice
+    except InvoiceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/{invoice_id:int}", status_code=204)
+async def delete_invoice_endpoint(invoice_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete an invoice from the DB. Only DRAFT invoices can be deleted."""
+    try:
+        await delete_invoice(db, invoice_id)
+    except InvoiceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{invoice_id:int}/payments", response_model=PaymentResponse, status_code=201)
+async def create_payment_endpoint(
+    invoice_id: int,
+    payment_data: PaymentCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Record a payment against an invoice (retries with the same Idempotency-Key replay the first response).
+    With PAYMENT_GROUP_COMMIT, payments without a key go through the group-commit pipeline.
+    """
+    try:
+        if idempotency_key:
+            result = await db.run_sync(
+                run_idempotent, idempotency_key, f"POST /invoices/{invoice_id}/payments", payment_data,
+                lambda session: PaymentResponse.model_validate(
+                    payment_service.record_payment(session, invoice_id, payment_data)
+                ),
+            )
+            return idempotent_response(result)
+        if settings.payment_group_commit:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(payment_pipeline.submit(invoice_id, payment_data)),
+                payment_pipeline.timeout,
+            )
+        payment = await record_payment(db, invoice_id, payment_data)
+        return payment
+    except PaymentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail=PIPELINE_TIMEOUT_DETAIL)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("", response_model=Union[InvoicePage, InvoiceChanges])
+async def list_invoices_endpoint(
+    status: Optional[InvoiceStatus] = Query(None, description="Filter by invoice status"),
+    customer_id: Optional[int] = Query(None, description="Filter by customer ID"),
+    from_date: Optional[datetime] = Query(None, alias="from", description="Filter invoices issued from this date"),
+    to_date: Optional[datetime] = Query(None, alias="to", description="Filter invoices issued to this date"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include: Optional[Literal["payments"]] = Query(None, description="payments: embed each invoice's payments"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (id is always included)"),
+    changed_since: Optional[str] = Query(
+        None,
+        description="Sync token (0 to start): only invoices changed since, plus deleted drafts; no filters or cursor",
+    ),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    List invoice summaries with optional filters, newest first, one page at a
+    time; or, with changed_since, the invoices changed since a sync token
+    """
+    try:
+        if changed_since is not None:
+            if any(value is not None for value in (status, customer_id, from_date, to_date, cursor)):
+                raise InvoiceError("changed_since cannot be combined with filters or cursor")
+            changes = await list_invoice_changes(
+                db,
+                changed_since,
+                parse_invoice_fields(fields),
+                include_payments=include == "payments",
+                limit=limit
+            )
+            return invoice_changes_response(changes)
+        page = await list_invoice_summaries(
+            db,
+            parse_invoice_fields(fields),
+            include_payments=include == "payments",
+            status=status,
+            customer_id=customer_id,
+            from_date=from_date,
+            to_date=to_date,
+            limit=limit,
+            cursor=cursor
+        )
+    except (CursorError, InvoiceError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return invoice_page_response(page)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
@@ -6,9 +6,21 @@ from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.db.models.customer import Customer
 from app.db.models.invoice import InvoiceStatus
-from app.api.schemas.customer import CustomerCreate, CustomerResponse
-from app.api.schemas.invoice import InvoiceResponse
-from app.api.services.invoice_service import get_customer_invoices
+from app.api.schemas.customer import CustomerCreate, CustomerPage, CustomerResponse
+from app.api.schemas.invoice import InvoicePage
+from app.api.services.invoice_service import (
+    InvoiceError,
+    invoice_page_response,
+    list_invoice_summaries,
+    parse_invoice_fields,
+)
+from app.api.services.customer_service import (
+    CustomerError,
+    get_customers_by_ids,
+    parse_customer_ids,
+    search_customers,
+)
+from app.api.services.pagination import CursorError, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/customers", tags=["customers"])
 
@@ -39,29 +51,48 @@ def create_customer_endpoint(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("", response_model=list[CustomerResponse])
+@router.get("", response_model=CustomerPage)
 def list_customers_endpoint(
+    q: Optional[str] = Query(None, max_length=255, description="Name search: names starting with q first, then names containing it"),
+    ids: Optional[str] = Query(None, description="Comma-separated ids to look up instead (q, limit and cursor are ignored)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
-    """List all customers"""
-    customers = db.query(Customer).order_by(Customer.id).all()
-    return customers
+    """Search customers by name, or list them in name order, one page at a time"""
+    try:
+        if ids is not None:
+            return get_customers_by_ids(db, parse_customer_ids(ids))
+        return search_customers(db, q, limit=limit, cursor=cursor)
+    except (CursorError, CustomerError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/{customer_id}/invoices", response_model=list[InvoiceResponse])
+@router.get("/{customer_id}/invoices", response_model=InvoicePage)
 def get_customer_invoices_endpoint(
     customer_id: int,
     status: Optional[InvoiceStatus] = Query(None, description="Filter by invoice status"),
     from_date: Optional[datetime] = Query(None, alias="from", description="Filter invoices issued from this date"),
     to_date: Optional[datetime] = Query(None, alias="to", description="Filter invoices issued to this date"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include: Optional[Literal["payments"]] = Query(None, description="payments: embed each invoice's payments"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (id is always included)"),
     db: Session = Depends(get_db)
 ):
-    """List invoices for a customer with optional filters"""
-    invoices = get_customer_invoices(
-        db, 
-        customer_id, 
-        status=status,
-        from_date=from_date,
-        to_date=to_date
-    )
-    return invoices
\ No newline at end of file
+    """List invoice summaries for a customer with optional filters, one page at a time"""
+    try:
+        page = list_invoice_summaries(
+            db,
+            parse_invoice_fields(fields),
+            include_payments=include == "payments",
+            customer_id=customer_id,
+            status=status,
+            from_date=from_date,
+            to_date=to_date,
+            limit=limit,
+            cursor=cursor
+        )
+    except (CursorError, InvoiceError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return invoice_page_response(page)
@@ -0,0 +1,53 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.api.schemas.event import EventPage
+from app.api.services.event_service import decode_event_cursor, list_events, stream_events
+from app.api.services.pagination import CursorError, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+def get_db():
+    """Dependency to get database session"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@router.get("", response_model=EventPage)
+def list_events_endpoint(
+    after: Optional[str] = Query(None, description="next_cursor from the previous call (omit to start from the oldest event)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    db: Session = Depends(get_db)
+):
+    """Invoice and payment state changes committed after the cursor, oldest first"""
+    try:
+        return list_events(db, after=after, limit=limit)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/stream")
+def stream_events_endpoint(
+    after: Optional[str] = Query(None, description="Cursor to start after (omit to start from the oldest event)"),
+    last_event_id: Optional[str] = Header(None, description="Sent by EventSource on reconnect; takes precedence over after"),
+    db: Session = Depends(get_db)
+):
+    """The same feed as server-sent events; each message id is the cursor to resume from"""
+    cursor = last_event_id or after
+    if cursor:
+        try:
+            decode_event_cursor(cursor)
+        except CursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        stream_events(db, after=cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,23 +1,47 @@
-from typing import Optional
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Literal, Optional, Union
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.session import SessionLocal
 from app.db.models.invoice import InvoiceStatus
-from app.api.schemas.invoice import InvoiceCreate, InvoiceResponse, InvoiceDraftUpdate
+from app.api.schemas.invoice import (
+    BatchInvoiceRequest,
+    BatchInvoiceResponse,
+    BatchTransitionRequest,
+    BatchTransitionResponse,
+    InvoiceChanges,
+    InvoiceCreate,
+    InvoiceDraftUpdate,
+    InvoicePage,
+    InvoiceResponse,
+)
 from app.api.schemas.payment import PaymentCreate, PaymentResponse
 from app.api.services.invoice_service import (
     create_invoice,
-    get_invoice,
-    get_all_invoices,
+    create_invoices_batch,
+    post_invoices_batch,
+    void_invoices_batch,
+    get_invoice_detail,
     update_invoice,
     post_invoice,
     void_invoice,
     delete_invoice,
+    list_invoice_summaries,
+    list_invoice_changes,
+    parse_invoice_fields,
+    invoice_page_response,
+    invoice_changes_response,
 )
 from app.api.services.invoice_service import InvoiceError
+from app.api.services.invoice_cache import get_cached_invoice, cache_invoice, invoice_response
+from app.api.services.idempotency_service import IdempotencyError, run_idempotent, idempotent_response
+from app.api.services.pagination import CursorError, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.api.services.payment_service import record_payment, PaymentError
+from app.api.services.payment_pipeline import PIPELINE_TIMEOUT_DETAIL, payment_pipeline
+from app.api.services.export_service import iter_invoices_for_export, export_ndjson, export_csv
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
@@ -34,26 +58,116 @@ def get_db():
 @router.post("", response_model=InvoiceResponse, status_code=201)
 def create_invoice_endpoint(
     invoice_data: InvoiceCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db)
 ):
-    """Create a new invoice"""
+    """Create a new invoice (retries with the same Idempotency-Key replay the first response)"""
     try:
+        if idempotency_key:
+            result = run_idempotent(
+                db, idempotency_key, "POST /invoices", invoice_data,
+                lambda session: InvoiceResponse.model_validate(create_invoice(session, invoice_data)),
+            )
+            return idempotent_response(result)
         invoice = create_invoice(db, invoice_data)
         return invoice
+    except IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/batch", response_model=BatchInvoiceResponse)
+def create_invoices_batch_endpoint(
+    batch: BatchInvoiceRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Create a batch of invoices (e.g. a billing run) in one transaction.
+    mode=per_item creates the valid items and reports the others;
+    mode=all_or_nothing creates nothing if any item is rejected.
+    """
+    try:
+        results = create_invoices_batch(db, batch.items, all_or_nothing=batch.mode == "all_or_nothing")
+    except InvoiceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    created = sum(1 for r in results if r.status == "created")
+    return BatchInvoiceResponse(
+        created=created,
+        rejected=len(results) - created,
+        results=results,
+    )
+
+
+def _transition_targets(batch: BatchTransitionRequest) -> dict:
+    if batch.ids is not None:
+        return {"invoice_ids": batch.ids}
+    return batch.filter.model_dump()
+
+
+@router.post("/post-batch", response_model=BatchTransitionResponse)
+def post_invoices_batch_endpoint(batch: BatchTransitionRequest, db: Session = Depends(get_db)):
+    """
+    Post many invoices (DRAFT → PENDING) in one transaction: the given ids,
+    or every DRAFT matching the filter. Ids that cannot be posted are skipped
+    with the reason.
+    """
+    return post_invoices_batch(db, **_transition_targets(batch))
+
+
+@router.post("/void-batch", response_model=BatchTransitionResponse)
+def void_invoices_batch_endpoint(batch: BatchTransitionRequest, db: Session = Depends(get_db)):
+    """
+    Void many invoices (PENDING → VOID) in one transaction: the given ids,
+    or every PENDING invoice matching the filter. Ids that cannot be voided
+    are skipped with the reason.
+    """
+    return void_invoices_batch(db, **_transition_targets(batch))
+
+
+@router.get("/export")
+def export_invoices_endpoint(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson or csv"),
+    status: Optional[InvoiceStatus] = Query(None, description="Filter by invoice status"),
+    customer_id: Optional[int] = Query(None, description="Filter by customer ID"),
+    from_date: Optional[datetime] = Query(None, alias="from", description="Filter invoices issued from this date"),
+    to_date: Optional[datetime] = Query(None, alias="to", description="Filter invoices issued to this date"),
+    db: Session = Depends(get_db)
+):
+    """Stream every matching invoice with its payments as NDJSON or CSV"""
+    invoices = iter_invoices_for_export(
+        db,
+        status=status,
+        customer_id=customer_id,
+        from_date=from_date,
+        to_date=to_date
+    )
+    filename = f"invoices-{date.today().isoformat()}.{export_format}"
+    if export_format == "csv":
+        body, media_type = export_csv(invoices), "text/csv"
+    else:
+        body, media_type = export_ndjson(invoices), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/{invoice_id}", response_model=InvoiceResponse)
 def get_invoice_endpoint(
     invoice_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
-    """Get invoice details including payments"""
-    invoice = get_invoice(db, invoice_id)
-    if not invoice:
-        raise HTTPException(status_code=404, detail=f"Invoice {invoice_id} not found")
-    return invoice
+    """Get invoice details including payments (cached; supports ETag / If-None-Match)"""
+    entry = get_cached_invoice(invoice_id)
+    if entry is None:
+        invoice = get_invoice_detail(db, invoice_id)
+        if not invoice:
+            raise HTTPException(status_code=404, detail=f"Invoice {invoice_id} not found")
+        entry = cache_invoice(invoice)
+    return invoice_response(entry, if_none_match)
 
 
 @router.patch("/{invoice_id}", response_model=InvoiceResponse)
@@ -103,32 +217,77 @@ def delete_invoice_endpoint(invoice_id: int, db: Session = Depends(get_db)):
 def create_payment_endpoint(
     invoice_id: int,
     payment_data: PaymentCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db)
 ):
-    """Record a payment against an invoice"""
+    """
+    Record a payment against an invoice (retries with the same Idempotency-Key replay the first response).
+    With PAYMENT_GROUP_COMMIT, payments without a key go through the group-commit pipeline.
+    """
     try:
+        if idempotency_key:
+            result = run_idempotent(
+                db, idempotency_key, f"POST /invoices/{invoice_id}/payments", payment_data,
+                lambda session: PaymentResponse.model_validate(record_payment(session, invoice_id, payment_data)),
+            )
+            return idempotent_response(result)
+        if settings.payment_group_commit:
+            return payment_pipeline.record(invoice_id, payment_data)
         payment = record_payment(db, invoice_id, payment_data)
         return payment
     except PaymentError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail=PIPELINE_TIMEOUT_DETAIL)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.get("", response_model=list[InvoiceResponse])
+@router.get("", response_model=Union[InvoicePage, InvoiceChanges])
 def list_invoices_endpoint(
     status: Optional[InvoiceStatus] = Query(None, description="Filter by invoice status"),
     customer_id: Optional[int] = Query(None, description="Filter by customer ID"),
     from_date: Optional[datetime] = Query(None, alias="from", description="Filter invoices issued from this date"),
     to_date: Optional[datetime] = Query(None, alias="to", description="Filter invoices issued to this date"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include: Optional[Literal["payments"]] = Query(None, description="payments: embed each invoice's payments"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (id is always included)"),
+    changed_since: Optional[str] = Query(
+        None,
+        description="Sync token (0 to start): only invoices changed since, plus deleted drafts; no filters or cursor",
+    ),
     db: Session = Depends(get_db)
 ):
-    """List all invoices with optional filters"""
-    invoices = get_all_invoices(
-        db,
-        status=status,
-        customer_id=customer_id,
-        from_date=from_date,
-        to_date=to_date
-    )
-    return invoices
\ No newline at end of file
+    """
+    List invoice summaries with optional filters, newest first, one page at a
+    time; or, with changed_since, the invoices changed since a sync token
+    """
+    try:
+        if changed_since is not None:
+            if any(value is not None for value in (status, customer_id, from_date, to_date, cursor)):
+                raise InvoiceError("changed_since cannot be combined with filters or cursor")
+            changes = list_invoice_changes(
+                db,
+                changed_since,
+                parse_invoice_fields(fields),
+                include_payments=include == "payments",
+                limit=limit
+            )
+            return invoice_changes_response(changes)
+        page = list_invoice_summaries(
+            db,
+            parse_invoice_fields(fields),
+            include_payments=include == "payments",
+            status=status,
+            customer_id=customer_id,
+            from_date=from_date,
+            to_date=to_date,
+            limit=limit,
+            cursor=cursor
+        )
+    except (CursorError, InvoiceError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return invoice_page_response(page)
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.api.schemas.payment import BatchPaymentRequest, BatchPaymentResponse
+from app.api.services.payment_service import record_payments_batch
+
+router = APIRouter(prefix="/payments", tags=["payments"])
+
+
+def get_db():
+    """Dependency to get database session"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@router.post("/batch", response_model=BatchPaymentResponse)
+def create_payments_batch_endpoint(
+    batch: BatchPaymentRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Record a batch of payments (e.g. a bank remittance file) in one transaction.
+    Each item is accepted or rejected on its own; see the per-item results.
+    """
+    results = record_payments_batch(db, batch.items)
+    recorded = sum(1 for r in results if r.status == "recorded")
+    return BatchPaymentResponse(
+        recorded=recorded,
+        rejected=len(results) - recorded,
+        results=results,
+    )
@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.api.schemas.report import ReceivablesReport, AgingReport
+from app.api.services.report_service import get_receivables_summary, get_aging_report
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+def get_db():
+    """Dependency to get database session"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@router.get("/receivables", response_model=ReceivablesReport)
+def receivables_report_endpoint(
+    customer_id: Optional[int] = Query(None, description="Filter by customer ID"),
+    from_date: Optional[datetime] = Query(None, alias="from", description="Filter invoices issued from this date"),
+    to_date: Optional[datetime] = Query(None, alias="to", description="Filter invoices issued to this date"),
+    as_of: Optional[datetime] = Query(None, description="Reference time for overdue balances (default: now)"),
+    db: Session = Depends(get_db)
+):
+    """Invoiced, paid, outstanding and overdue totals plus status counts per customer and currency"""
+    as_of = as_of or datetime.now(timezone.utc)
+    items = get_receivables_summary(
+        db,
+        customer_id=customer_id,
+        from_date=from_date,
+        to_date=to_date,
+        as_of=as_of
+    )
+    return ReceivablesReport(as_of=as_of, items=items)
+
+
+@router.get("/aging", response_model=AgingReport)
+def aging_report_endpoint(
+    customer_id: Optional[int] = Query(None, description="Filter by customer ID"),
+    as_of: Optional[datetime] = Query(None, description="Reference time for days past due (default: now)"),
+    db: Session = Depends(get_db)
+):
+    """Open balances per customer and currency in current / 1-30 / 31-60 / 61-90 / 90+ days past due buckets"""
+    as_of = as_of or datetime.now(timezone.utc)
+    items = get_aging_report(db, customer_id=customer_id, as_of=as_of)
+    return AgingReport(as_of=as_of, items=items)
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -9,4 +10,10 @@ class CustomerResponse(BaseModel):
     id: int
     name: str
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CustomerPage(BaseModel):
+    """One page of customers; pass next_cursor back as `cursor` to get the next page."""
+    items: list[CustomerResponse]
+    next_cursor: Optional[str] = None
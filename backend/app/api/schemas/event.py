@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel
+
+
+class EventResponse(BaseModel):
+    """One invoice/payment state change. payload holds the invoice header after the change (and the payment)."""
+    seq: int
+    type: str
+    invoice_id: int
+    created_at: datetime
+    payload: dict[str, Any]
+
+
+class EventPage(BaseModel):
+    """Events after the cursor; poll again with next_cursor as `after` (it stays put when nothing is new)."""
+    items: list[EventResponse]
+    next_cursor: Optional[str] = None
@@ -1,7 +1,8 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Literal, Optional
+from typing_extensions import TypedDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, model_validator
 
 from app.db.models.invoice import InvoiceStatus
 
@@ -19,6 +20,69 @@ class InvoiceCreate(InvoiceBase):
     pass
 
 
+class BatchInvoiceRequest(BaseModel):
+    items: list[InvoiceCreate] = Field(min_length=1, max_length=50_000)
+    # per_item: create the valid items and report the rest;
+    # all_or_nothing: create nothing if any item is rejected
+    mode: Literal["per_item", "all_or_nothing"] = "per_item"
+
+
+class BatchInvoiceResult(BaseModel):
+    index: int  # position of the item in the request
+    status: Literal["created", "rejected"]
+    invoice_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BatchInvoiceResponse(BaseModel):
+    created: int
+    rejected: int
+    results: list[BatchInvoiceResult]
+
+
+# Most invoices one transition batch changes: the ids limit, and the cap on
+# a filter (repeat the request while has_more to work through the rest)
+MAX_BATCH_TRANSITION = 50_000
+
+
+class BatchTransitionFilter(BaseModel):
+    """Invoices to transition by filter; the expected status is implied by the transition"""
+    customer_id: Optional[int] = None
+    from_date: Optional[datetime] = Field(None, alias="from")
+    to_date: Optional[datetime] = Field(None, alias="to")
+
+    @model_validator(mode="after")
+    def _has_criterion(self):
+        # An empty filter would transition every invoice in the expected status
+        if self.customer_id is None and self.from_date is None and self.to_date is None:
+            raise ValueError("Filter needs at least one of customer_id, from or to")
+        return self
+
+
+class BatchTransitionRequest(BaseModel):
+    """Either explicit invoice ids or a filter, not both"""
+    ids: Optional[list[int]] = Field(None, min_length=1, max_length=MAX_BATCH_TRANSITION)
+    filter: Optional[BatchTransitionFilter] = None
+
+    @model_validator(mode="after")
+    def _ids_or_filter(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide either ids or filter")
+        return self
+
+
+class BatchTransitionSkip(BaseModel):
+    invoice_id: int
+    error: str
+
+
+class BatchTransitionResponse(BaseModel):
+    updated_ids: list[int]
+    skipped: list[BatchTransitionSkip]
+    # Filter only: the cap was reached and more invoices match
+    has_more: bool = False
+
+
 class InvoiceUpdate(BaseModel):
     status: Optional[InvoiceStatus] = None
 
@@ -48,6 +112,99 @@ class InvoiceResponse(InvoiceBase):
     issued_at: datetime
     due_at: datetime
     status: InvoiceStatus
+    amount_paid: Decimal = Decimal("0")
+    balance_due: Decimal
+    overdue_at: Optional[datetime] = None
     payments: list[PaymentResponse] = []
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class InvoiceSummary(BaseModel):
+    """
+    Invoice list row: the header columns (or the subset asked for with
+    `fields`), and payments only when requested with `include=payments`.
+    Fields that were not selected are left out of the JSON entirely.
+    """
+    id: int
+    customer_id: Optional[int] = None
+    amount: Optional[Decimal] = None
+    currency: Optional[str] = None
+    issued_at: Optional[datetime] = None
+    due_at: Optional[datetime] = None
+    status: Optional[InvoiceStatus] = None
+    amount_paid: Optional[Decimal] = None
+    balance_due: Optional[Decimal] = None
+    overdue_at: Optional[datetime] = None
+    payments: Optional[list[PaymentResponse]] = None
+
+
+class InvoicePage(BaseModel):
+    """One page of invoices; pass next_cursor back as `cursor` to get the next page."""
+    items: list[InvoiceSummary]
+    next_cursor: Optional[str] = None
+
+
+class InvoiceTombstoneResponse(BaseModel):
+    id: int
+    deleted_at: datetime
+
+
+class InvoiceChanges(BaseModel):
+    """
+    Invoices changed since a `changed_since` token (upsert them) and drafts
+    deleted since (remove them). Pass next_token back as `changed_since`;
+    has_more means the next call returns more right away.
+    """
+    items: list[InvoiceSummary]
+    deleted: list[InvoiceTombstoneResponse]
+    next_token: str
+    has_more: bool
+
+
+# Read fast path: rows from Core selects are kept as plain dicts and
+# serialized in one pass by these prebuilt adapters, without building ORM or
+# model instances. The models above still document the responses; key order
+# follows the SELECT, and keys that were not selected are simply absent.
+class PaymentRow(TypedDict):
+    id: int
+    invoice_id: int
+    amount: Decimal
+    paid_at: datetime
+
+
+class InvoiceRow(TypedDict, total=False):
+    id: int
+    customer_id: int
+    amount: Decimal
+    currency: str
+    issued_at: datetime
+    due_at: datetime
+    status: InvoiceStatus
+    amount_paid: Decimal
+    balance_due: Decimal
+    overdue_at: Optional[datetime]
+    payments: list[PaymentRow]
+
+
+class InvoicePageRows(TypedDict):
+    items: list[InvoiceRow]
+    next_cursor: Optional[str]
+
+
+class InvoiceTombstoneRow(TypedDict):
+    id: int
+    deleted_at: datetime
+
+
+class InvoiceChangesRows(TypedDict):
+    items: list[InvoiceRow]
+    deleted: list[InvoiceTombstoneRow]
+    next_token: str
+    has_more: bool
+
+
+invoice_json = TypeAdapter(InvoiceRow)
+payment_json = TypeAdapter(PaymentRow)
+invoice_page_json = TypeAdapter(InvoicePageRows)
+invoice_changes_json = TypeAdapter(InvoiceChangesRows)
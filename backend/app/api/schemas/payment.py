@@ -1,6 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -15,4 +15,25 @@ class PaymentResponse(BaseModel):
     amount: Decimal
     paid_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class BatchPaymentItem(PaymentCreate):
+    invoice_id: int
+
+
+class BatchPaymentRequest(BaseModel):
+    items: list[BatchPaymentItem] = Field(min_length=1, max_length=50_000)
+
+
+class BatchPaymentResult(BaseModel):
+    index: int  # position of the item in the request
+    invoice_id: int
+    status: Literal["recorded", "rejected"]
+    payment_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BatchPaymentResponse(BaseModel):
+    recorded: int
+    rejected: int
+    results: list[BatchPaymentResult]
@@ -0,0 +1,37 @@
+from datetime import datetime
+from decimal import Decimal
+from pydantic import BaseModel
+
+from app.db.models.invoice import InvoiceStatus
+
+
+class ReceivablesRow(BaseModel):
+    customer_id: int
+    currency: str
+    total_invoiced: Decimal  # PENDING + PAID invoices
+    total_paid: Decimal
+    outstanding: Decimal  # balance still due on PENDING invoices
+    overdue: Decimal  # part of outstanding whose due date has passed
+    invoice_counts: dict[InvoiceStatus, int]
+
+
+class ReceivablesReport(BaseModel):
+    as_of: datetime
+    items: list[ReceivablesRow]
+
+
+class AgingRow(BaseModel):
+    customer_id: int
+    currency: str
+    current: Decimal  # not yet due
+    days_1_30: Decimal
+    days_31_60: Decimal
+    days_61_90: Decimal
+    days_over_90: Decimal
+    total: Decimal
+    invoice_count: int  # open (PENDING) invoices
+
+
+class AgingReport(BaseModel):
+    as_of: datetime
+    items: list[AgingRow]
@@ -0,0 +1,100 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.db.models.aging import ReceivableAging
+from app.db.models.invoice import Invoice, InvoiceStatus
+
+
+# (customer_id, currency, due_on) -> [balance delta, open invoice count delta]
+AgingDeltas = dict[tuple[int, str, date], list]
+
+
+class AgingError(Exception):
+    """The aging summary cannot be maintained on this database"""
+    pass
+
+
+def due_on(due_at: datetime) -> date:
+    """UTC calendar date an invoice falls due (SQLite hands back naive UTC datetimes)"""
+    if due_at.tzinfo is None:
+        return due_at.date()
+    return due_at.astimezone(timezone.utc).date()
+
+
+def add_aging_delta(deltas: AgingDeltas, invoice, balance: Decimal, count: int = 0) -> None:
+    """Accumulate a change to an invoice's open balance (and open-invoice count)"""
+    key = (invoice.customer_id, invoice.currency, due_on(invoice.due_at))
+    entry = deltas.setdefault(key, [Decimal("0"), 0])
+    entry[0] += balance
+    entry[1] += count
+
+
+def _upsert(db: Session):
+    """INSERT ... ON CONFLICT adding to an existing summary row (PostgreSQL and SQLite)"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(ReceivableAging)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(ReceivableAging)
+    else:
+        raise AgingError(f"Aging upsert is not supported for dialect {dialect}")
+    return stmt.on_conflict_do_update(
+        index_elements=[ReceivableAging.customer_id, ReceivableAging.currency, ReceivableAging.due_on],
+        set_={
+            "balance": ReceivableAging.balance + stmt.excluded.balance,
+            "invoice_count": ReceivableAging.invoice_count + stmt.excluded.invoice_count,
+        },
+    )
+
+
+def apply_aging_deltas(db: Session, deltas: AgingDeltas) -> None:
+    """
+    Fold deltas into the aging table with one upsert per key (executemany).
+    Keys are applied in sorted order so concurrent writers lock summary rows
+    in the same order. Rows left with no open invoices are removed. Does not commit.
+    """
+    rows = [
+        {"customer_id": key[0], "currency": key[1], "due_on": key[2], "balance": balance, "invoice_count": count}
+        for key, (balance, count) in sorted(deltas.items())
+        if balance or count
+    ]
+    if not rows:
+        return
+    db.execute(_upsert(db), rows)
+    if any(row["invoice_count"] < 0 for row in rows):
+        # Core-level executemany: the ORM has no bulk DELETE by parameter sets
+        db.connection().execute(
+            delete(ReceivableAging)
+            .where(ReceivableAging.invoice_count <= 0)
+            .where(ReceivableAging.customer_id == bindparam("c"))
+            .where(ReceivableAging.currency == bindparam("cur"))
+            .where(ReceivableAging.due_on == bindparam("d")),
+            [
+                {"c": row["customer_id"], "cur": row["currency"], "d": row["due_on"]}
+                for row in rows
+                if row["invoice_count"] < 0
+            ],
+        )
+
+
+def rebuild_aging(db: Session, batch_size: int = 10_000) -> int:
+    """
+    Recompute the whole aging table from PENDING invoices, streaming them in
+    batches. Returns the number of summary rows written. Does not commit.
+    """
+    deltas: AgingDeltas = {}
+    rows = db.execute(
+        select(Invoice.customer_id, Invoice.currency, Invoice.due_at, Invoice.amount, Invoice.amount_paid)
+        .where(Invoice.status == InvoiceStatus.PENDING)
+        .execution_options(yield_per=batch_size)
+    )
+    for row in rows:
+        add_aging_delta(deltas, row, Decimal(str(row.amount)) - Decimal(str(row.amount_paid)), 1)
+
+    db.execute(delete(ReceivableAging).execution_options(synchronize_session=False))
+    apply_aging_deltas(db, deltas)
+    return len(deltas)
+
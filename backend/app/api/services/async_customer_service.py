@@ -0,0 +1,36 @@
+"""
+Async counterparts of customer_service for the opt-in async stack, built from
+the same query helpers.
+"""
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.services.customer_service import (
+    build_customer_page,
+    customer_search_queries,
+    customers_by_ids_query,
+    normalize_search_term,
+)
+from app.api.services.pagination import DEFAULT_PAGE_SIZE
+
+
+async def search_customers(
+    db: AsyncSession,
+    q: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None
+) -> dict:
+    """One page of customers matching q, prefix matches first, then by name"""
+    rows = []
+    for tier, query in customer_search_queries(normalize_search_term(q), cursor):
+        needed = limit + 1 - len(rows)
+        if needed <= 0:
+            break
+        rows.extend((tier, row) for row in (await db.execute(query.limit(needed))).all())
+    return build_customer_page(rows, limit)
+
+
+async def get_customers_by_ids(db: AsyncSession, customer_ids: list[int]) -> dict:
+    """The named customers (unknown ids are left out), as a single page"""
+    rows = (await db.execute(customers_by_ids_query(customer_ids))).all() if customer_ids else []
+    return {"items": [{"id": row.id, "name": row.name} for row in rows], "next_cursor": None}
@@ -0,0 +1,113 @@
+"""
+Async counterparts of invoice_service for the opt-in async stack.
+
+Reads are native async Core queries built by the same query builders
+as the sync service. Writes run the sync implementations on the AsyncSession's
+connection via run_sync: the IO is still non-blocking (asyncpg), and the
+business rules live in exactly one place.
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.invoice import InvoiceStatus
+from app.api.schemas.invoice import (
+    InvoiceChangesRows,
+    InvoiceCreate,
+    InvoiceDraftUpdate,
+    InvoicePageRows,
+    InvoiceResponse,
+    InvoiceRow,
+)
+from app.api.services import invoice_service
+from app.api.services.invoice_service import (
+    invoice_summary_query,
+    payments_for_invoices_query,
+    build_invoice_page,
+    invoice_detail_query,
+    build_invoice_detail,
+    invoice_changes_queries,
+    split_invoice_changes,
+    build_invoice_changes,
+)
+from app.api.services.pagination import DEFAULT_PAGE_SIZE
+
+
+async def create_invoice(db: AsyncSession, invoice_data: InvoiceCreate) -> InvoiceResponse:
+    """Create a new invoice"""
+    return await db.run_sync(invoice_service.create_invoice, invoice_data)
+
+
+async def get_invoice_detail(db: AsyncSession, invoice_id: int) -> Optional[InvoiceRow]:
+    """Read path for GET /invoices/{id}: Core rows, no ORM objects"""
+    return build_invoice_detail((await db.execute(invoice_detail_query(invoice_id))).all())
+
+
+async def update_invoice(db: AsyncSession, invoice_id: int, data: InvoiceDraftUpdate) -> InvoiceResponse:
+    """Update a DRAFT invoice's amount, currency, and/or dates. Only DRAFT can be updated."""
+    return await db.run_sync(invoice_service.update_invoice, invoice_id, data)
+
+
+async def post_invoice(db: AsyncSession, invoice_id: int) -> InvoiceResponse:
+    """Send invoice for payment: DRAFT → PENDING."""
+    return await db.run_sync(invoice_service.post_invoice, invoice_id)
+
+
+async def delete_invoice(db: AsyncSession, invoice_id: int) -> None:
+    """Delete an invoice from the DB. Only DRAFT invoices can be deleted."""
+    await db.run_sync(invoice_service.delete_invoice, invoice_id)
+
+
+async def void_invoice(db: AsyncSession, invoice_id: int) -> InvoiceResponse:
+    """Cancel invoice: set status to VOID. Only PENDING invoices can be voided."""
+    return await db.run_sync(invoice_service.void_invoice, invoice_id)
+
+
+async def list_invoice_summaries(
+    db: AsyncSession,
+    fields: list[str],
+    include_payments: bool = False,
+    status: Optional[InvoiceStatus] = None,
+    customer_id: Optional[int] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None
+) -> InvoicePageRows:
+    """One page of invoice summaries; payments cost a second query only when included"""
+    result = await db.execute(invoice_summary_query(
+        fields,
+        status=status,
+        customer_id=customer_id,
+        from_date=from_date,
+        to_date=to_date,
+        limit=limit + 1,
+        cursor=cursor
+    ))
+    rows = result.all()
+    payment_rows = None
+    if include_payments:
+        page = rows[:limit]
+        payment_rows = (await db.execute(payments_for_invoices_query(
+            [row.id for row in page], [row.issued_at for row in page]
+        ))).all() if page else []
+    return build_invoice_page(rows, fields, limit, payment_rows)
+
+
+async def list_invoice_changes(
+    db: AsyncSession,
+    token: str,
+    fields: list[str],
+    include_payments: bool = False,
+    limit: int = DEFAULT_PAGE_SIZE
+) -> InvoiceChangesRows:
+    """Incremental sync: invoices written and drafts deleted since the token, oldest change first"""
+    invoice_query, tombstone_query = invoice_changes_queries(db.get_bind().dialect.name, fields, token, limit + 1)
+    invoice_rows = (await db.execute(invoice_query)).all()
+    tombstone_rows = (await db.execute(tombstone_query)).all()
+    entries, has_more = split_invoice_changes(invoice_rows, tombstone_rows, limit)
+    payment_rows = None
+    if include_payments:
+        invoice_ids = [row.id for deleted, row in entries if not deleted]
+        payment_rows = (await db.execute(payments_for_invoices_query(invoice_ids))).all() if invoice_ids else []
+    return build_invoice_changes(entries, has_more, fields, token, payment_rows)
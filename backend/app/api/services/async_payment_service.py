@@ -0,0 +1,26 @@
+"""
+Async counterparts of payment_service for the opt-in async stack.
+The locking and business rules are the sync implementations, run on the
+AsyncSession's connection via run_sync.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas.payment import PaymentCreate, PaymentResponse, BatchPaymentItem, BatchPaymentResult
+from app.api.services import payment_service
+
+
+async def record_payment(
+    db: AsyncSession,
+    invoice_id: int,
+    payment_data: PaymentCreate
+) -> PaymentResponse:
+    """Record a payment against an invoice (see payment_service.record_payment)"""
+    return await db.run_sync(payment_service.record_payment, invoice_id, payment_data)
+
+
+async def record_payments_batch(
+    db: AsyncSession,
+    items: list[BatchPaymentItem]
+) -> list[BatchPaymentResult]:
+    """Record many payments in one transaction (see payment_service.record_payments_batch)"""
+    return await db.run_sync(payment_service.record_payments_batch, items)
@@ -0,0 +1,145 @@
+"""
+Customer lookups for pickers and typeahead.
+
+Search results come in two tiers. Tier 0 is names starting with the query, in
+name order: one range of ix_customers_name_search_key_id, so the first page
+costs the same with a hundred customers or ten million. Tier 1 is names
+containing the query somewhere else. It is only searched for queries of
+MIN_CONTAINS_LENGTH characters or more (the shortest a pg_trgm index can
+narrow), and only once tier 0 cannot fill the page. Without a query every
+customer is listed in name order. Cursors carry (tier, key, id) of the last
+row, so paging never re-runs an earlier tier.
+"""
+from typing import Optional
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.db.models.customer import Customer, name_search_key
+from app.api.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    CursorError,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+PREFIX_TIER = 0
+CONTAINS_TIER = 1
+MIN_CONTAINS_LENGTH = 3
+
+
+class CustomerError(Exception):
+    """Invalid customer lookup"""
+    pass
+
+
+def normalize_search_term(q: Optional[str]) -> Optional[str]:
+    """Lowercased, trimmed query; None when there is nothing to match"""
+    term = (q or "").strip().lower()
+    return term or None
+
+
+def _prefix_end(term: str) -> str:
+    """Smallest string greater than every string starting with term"""
+    return term[:-1] + chr(ord(term[-1]) + 1)
+
+
+def decode_customer_cursor(cursor: str) -> tuple[int, str, int]:
+    """Decode a (tier, key, id) customer cursor."""
+    values = decode_cursor(cursor)
+    try:
+        tier, key, customer_id = values
+    except ValueError as e:
+        raise CursorError("Invalid cursor") from e
+    if tier not in (PREFIX_TIER, CONTAINS_TIER) or not isinstance(key, str) or not isinstance(customer_id, int):
+        raise CursorError("Invalid cursor")
+    return tier, key, customer_id
+
+
+def customer_search_queries(term: Optional[str], cursor: Optional[str] = None) -> list[tuple[int, Select]]:
+    """
+    The tier queries still to run for this page, in rank order, each ordered
+    by (key, id) and without a LIMIT (the caller limits each to what the page
+    still needs).
+    """
+    after_tier, after = PREFIX_TIER, None
+    key = name_search_key(Customer.name)
+    if cursor:
+        after_tier, last_key, last_id = decode_customer_cursor(cursor)
+        # (key, id) > (last_key, last_id), spelled so that key >= last_key
+        # bounds the index range (SQLite will not range-scan an expression
+        # index on a row-value comparison)
+        after = and_(key >= last_key, or_(key > last_key, Customer.id > last_id))
+
+    base = select(Customer.id, Customer.name, key.label("key")).order_by(key, Customer.id)
+
+    queries = []
+    if after_tier == PREFIX_TIER:
+        query = base
+        if term:
+            query = query.where(key >= term, key < _prefix_end(term))
+        if after is not None:
+            query = query.where(after)
+        queries.append((PREFIX_TIER, query))
+
+    if term and len(term) >= MIN_CONTAINS_LENGTH:
+        query = base.where(
+            func.lower(Customer.name).contains(term, autoescape=True),
+            or_(key < term, key >= _prefix_end(term)),
+        )
+        if after is not None and after_tier == CONTAINS_TIER:
+            query = query.where(after)
+        queries.append((CONTAINS_TIER, query))
+
+    return queries
+
+
+def build_customer_page(rows: list[tuple[int, object]], limit: int) -> dict:
+    """Turn (tier, row) pairs fetched up to limit + 1 into a page and its next cursor"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        tier, last = rows[-1]
+        next_cursor = encode_cursor(tier, last.key, last.id)
+    return {
+        "items": [{"id": row.id, "name": row.name} for _, row in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+def search_customers(
+    db: Session,
+    q: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None
+) -> dict:
+    """One page of customers matching q, prefix matches first, then by name"""
+    rows = []
+    for tier, query in customer_search_queries(normalize_search_term(q), cursor):
+        needed = limit + 1 - len(rows)
+        if needed <= 0:
+            break
+        rows.extend((tier, row) for row in db.execute(query.limit(needed)))
+    return build_customer_page(rows, limit)
+
+
+def parse_customer_ids(ids: str) -> list[int]:
+    """Parse a comma-separated ids= parameter into at most MAX_PAGE_SIZE distinct ids"""
+    try:
+        parsed = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError as e:
+        raise CustomerError("ids must be comma-separated integers") from e
+    if len(parsed) > MAX_PAGE_SIZE:
+        raise CustomerError(f"At most {MAX_PAGE_SIZE} ids per request")
+    return parsed
+
+
+def customers_by_ids_query(customer_ids: list[int]) -> Select:
+    return select(Customer.id, Customer.name).where(Customer.id.in_(customer_ids)).order_by(Customer.id)
+
+
+def get_customers_by_ids(db: Session, customer_ids: list[int]) -> dict:
+    """The named customers (unknown ids are left out), as a single page"""
+    rows = db.execute(customers_by_ids_query(customer_ids)).all() if customer_ids else []
+    return {"items": [{"id": row.id, "name": row.name} for row in rows], "next_cursor": None}
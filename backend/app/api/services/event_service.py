@@ -0,0 +1,188 @@
+"""
+Transactional outbox for invoice and payment state changes.
+
+Every mutation adds its events with add_events() before its own commit, so
+an event exists exactly when the change it describes does. Consumers read
+the feed incrementally (GET /events?after=<cursor>, or the SSE stream)
+instead of re-scanning the invoices table.
+
+Ordering: seq values are handed out at insert time, so a transaction can
+commit event 11 while event 10 is still in flight. A consumer that had
+already moved past 11 would never see 10. On PostgreSQL each event also
+records its transaction id, and the feed only returns events of
+transactions older than the oldest one still running
+(pg_snapshot_xmin). Nothing can appear behind that horizon any more, so
+walking (txid, seq) never skips an event. SQLite has one writer at a time,
+so its txid is always 0 and the feed is in seq order.
+"""
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import AsyncIterator, Callable, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, insert, literal, literal_column, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.event import Event
+from app.api.schemas.invoice import InvoiceRow, PaymentRow, invoice_json, payment_json
+from app.api.services.pagination import CursorError, DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor
+
+
+INVOICE_CREATED = "invoice.created"
+INVOICE_UPDATED = "invoice.updated"
+INVOICE_POSTED = "invoice.posted"
+INVOICE_VOIDED = "invoice.voided"
+INVOICE_DELETED = "invoice.deleted"
+INVOICE_OVERDUE = "invoice.overdue"
+PAYMENT_RECORDED = "payment.recorded"
+
+# Invoice header carried by every event payload (payments are not embedded)
+EVENT_INVOICE_FIELDS = (
+    "id", "customer_id", "amount", "currency", "issued_at", "due_at", "status",
+    "amount_paid", "balance_due", "overdue_at",
+)
+PURGE_BATCH_SIZE = 10_000
+
+
+def invoice_state(invoice) -> InvoiceRow:
+    """Event payload fields of an Invoice entity (or any object with its attributes)"""
+    state = {field: getattr(invoice, field) for field in EVENT_INVOICE_FIELDS if field != "balance_due"}
+    # Entities hold whatever was assigned (floats, the int 0 default) until refreshed
+    state["amount"] = Decimal(str(invoice.amount))
+    state["amount_paid"] = Decimal(str(invoice.amount_paid or 0))
+    state["balance_due"] = state["amount"] - state["amount_paid"]
+    return state
+
+
+def invoice_event(event_type: str, invoice: InvoiceRow, payment: Optional[PaymentRow] = None) -> dict:
+    """An events row for an invoice change; payment events carry the payment too"""
+    payload = {"invoice": invoice_json.dump_python(invoice, mode="json")}
+    if payment is not None:
+        payload["payment"] = payment_json.dump_python(payment, mode="json")
+    return {"type": event_type, "invoice_id": invoice["id"], "payload": payload}
+
+
+def _current_txid(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        return literal_column("pg_current_xact_id()::text::bigint")
+    return literal(0)
+
+
+def add_events(db: Session, events: list[dict]) -> None:
+    """Insert event rows in the caller's transaction. Does not commit."""
+    if events:
+        db.execute(insert(Event).values(txid=_current_txid(db)), events)
+
+
+def decode_event_cursor(cursor: str) -> tuple[int, int]:
+    """Decode a (txid, seq) event cursor."""
+    values = decode_cursor(cursor)
+    try:
+        txid, seq = values
+        return int(txid), int(seq)
+    except (ValueError, TypeError) as e:
+        raise CursorError("Invalid cursor") from e
+
+
+def events_query(db: Session, after: Optional[str], limit: int):
+    """Committed events after the cursor, in feed order, up to the visibility horizon"""
+    query = select(Event.seq, Event.txid, Event.type, Event.invoice_id, Event.payload, Event.created_at)
+    if after:
+        query = query.where(tuple_(Event.txid, Event.seq) > tuple_(*decode_event_cursor(after)))
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.where(Event.txid < literal_column("pg_snapshot_xmin(pg_current_snapshot())::text::bigint"))
+    return query.order_by(Event.txid, Event.seq).limit(limit)
+
+
+def list_events(db: Session, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> dict:
+    """
+    One page of the feed. next_cursor is the position after the last event
+    returned (or `after` itself when there is nothing new), so consumers can
+    keep polling with it.
+    """
+    rows = db.execute(events_query(db, after, limit)).all()
+    items = [
+        {
+            "seq": row.seq,
+            "type": row.type,
+            "invoice_id": row.invoice_id,
+            "created_at": row.created_at,
+            "payload": row.payload,
+        }
+        for row in rows
+    ]
+    next_cursor = encode_cursor(rows[-1].txid, rows[-1].seq) if rows else after
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _poll_events(db: Session, cursor: Optional[str]) -> list:
+    """One page of the feed after cursor, ending the read transaction"""
+    try:
+        return db.execute(events_query(db, cursor, DEFAULT_PAGE_SIZE)).all()
+    finally:
+        db.rollback()
+
+
+async def stream_events(
+    db: Session,
+    after: Optional[str] = None,
+    poll_interval: Optional[float] = None,
+    heartbeat: float = 15.0,
+    should_stop: Callable[[], bool] = lambda: False
+) -> AsyncIterator[str]:
+    """
+    Server-sent events: one `id:`/`event:`/`data:` message per event, the id
+    being the cursor to resume from (browsers send it back as Last-Event-ID).
+    Polls every poll_interval seconds, ending each read transaction so no
+    connection is held between polls; sends a comment line as keep-alive.
+    Only the query runs in the threadpool: an idle stream waits on the event
+    loop, so open streams do not use up the threads sync routes run on.
+    """
+    poll_interval = settings.events_poll_interval_seconds if poll_interval is None else poll_interval
+    cursor = after
+    last_sent = time.monotonic()
+    while not should_stop():
+        rows = await run_in_threadpool(_poll_events, db, cursor)
+        for row in rows:
+            cursor = encode_cursor(row.txid, row.seq)
+            data = {
+                "seq": row.seq,
+                "type": row.type,
+                "invoice_id": row.invoice_id,
+                "created_at": row.created_at.isoformat(),
+                "payload": row.payload,
+            }
+            yield f"id: {cursor}\nevent: {row.type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+            last_sent = time.monotonic()
+        if len(rows) == DEFAULT_PAGE_SIZE:
+            continue
+        if time.monotonic() - last_sent >= heartbeat:
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+        await asyncio.sleep(poll_interval)
+
+
+def purge_old_events(
+    db: Session,
+    retention_days: Optional[float] = None,
+    batch_size: int = PURGE_BATCH_SIZE
+) -> int:
+    """
+    Delete events older than the retention window, batch_size rows per
+    transaction, using the created_at index. Returns the number deleted.
+    """
+    days = settings.event_retention_days if retention_days is None else retention_days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    deleted = 0
+    while True:
+        expired = select(Event.seq).where(Event.created_at < cutoff).limit(batch_size).scalar_subquery()
+        result = db.execute(
+            delete(Event).where(Event.seq.in_(expired)).execution_options(synchronize_session=False)
+        )
+        db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
@@ -0,0 +1,120 @@
+import csv
+import io
+from datetime import datetime
+from typing import Iterator, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.db.models.invoice import Invoice, InvoiceStatus
+from app.api.schemas.invoice import InvoiceResponse
+from app.api.services.invoice_service import apply_invoice_filters
+
+
+EXPORT_BATCH_SIZE = 1000
+# Flush the response buffer once it reaches this many characters
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+CSV_COLUMNS = [
+    "invoice_id",
+    "customer_id",
+    "amount",
+    "currency",
+    "issued_at",
+    "due_at",
+    "status",
+    "amount_paid",
+    "balance_due",
+    "payment_id",
+    "payment_amount",
+    "paid_at",
+]
+
+
+def iter_invoices_for_export(
+    db: Session,
+    status: Optional[InvoiceStatus] = None,
+    customer_id: Optional[int] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[Invoice]:
+    """
+    Stream invoices (with payments) matching the list filters.
+    Rows are fetched from a server-side cursor batch_size at a time, and each
+    batch's payments are loaded with one IN query, so memory stays bounded by
+    the batch size rather than the size of the result.
+    """
+    query = apply_invoice_filters(
+        select(Invoice),
+        status=status,
+        customer_id=customer_id,
+        from_date=from_date,
+        to_date=to_date
+    )
+    query = (
+        query.options(selectinload(Invoice.payments))
+        .order_by(Invoice.issued_at.desc(), Invoice.id.desc())
+        .execution_options(yield_per=batch_size)
+    )
+    for invoice in db.scalars(query):
+        yield invoice
+
+
+def _chunked(lines: Iterator[str]) -> Iterator[str]:
+    """Group small lines into larger chunks so each write to the socket carries real payload."""
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def export_ndjson(invoices: Iterator[Invoice]) -> Iterator[str]:
+    """One InvoiceResponse JSON document (payments embedded) per line"""
+    return _chunked(
+        InvoiceResponse.model_validate(invoice).model_dump_json() + "\n"
+        for invoice in invoices
+    )
+
+
+def _csv_rows(invoices: Iterator[Invoice]) -> Iterator[str]:
+    out = io.StringIO()
+    writer = csv.writer(out)
+
+    def flush() -> str:
+        value = out.getvalue()
+        out.seek(0)
+        out.truncate(0)
+        return value
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+    for invoice in invoices:
+        header = [
+            invoice.id,
+            invoice.customer_id,
+            invoice.amount,
+            invoice.currency,
+            invoice.issued_at.isoformat(),
+            invoice.due_at.isoformat(),
+            invoice.status.value,
+            invoice.amount_paid,
+            invoice.balance_due,
+        ]
+        if not invoice.payments:
+            writer.writerow(header + ["", "", ""])
+        for payment in invoice.payments:
+            writer.writerow(header + [payment.id, payment.amount, payment.paid_at.isoformat()])
+        yield flush()
+
+
+def export_csv(invoices: Iterator[Invoice]) -> Iterator[str]:
+    """One row per payment (invoice columns repeated); unpaid invoices get a single row with empty payment columns"""
+    return _chunked(_csv_rows(invoices))
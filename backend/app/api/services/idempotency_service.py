@@ -0,0 +1,162 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+
+from app.api.services.invoice_cache import defer_invalidations
+from app.db.models.idempotency import IdempotencyKey
+from app.core.config import settings
+from app.core.metrics import IDEMPOTENT_REPLAYS
+
+
+PURGE_BATCH_SIZE = 10_000
+
+
+class IdempotencyError(Exception):
+    """The original request for this Idempotency-Key has not finished yet"""
+    status_code = 409
+
+
+class IdempotencyKeyReused(IdempotencyError):
+    """The Idempotency-Key was already used for a different request"""
+    status_code = 422
+
+
+@dataclass
+class IdempotentResult:
+    status_code: int
+    body: str
+    replayed: bool
+
+
+def request_fingerprint(scope: str, payload: BaseModel) -> str:
+    """Hash of the endpoint and validated body; a retry must reproduce it"""
+    return hashlib.sha256(f"{scope}\n{payload.model_dump_json()}".encode()).hexdigest()
+
+
+def _cutoff(ttl_hours: Optional[float] = None) -> datetime:
+    hours = settings.idempotency_key_ttl_hours if ttl_hours is None else ttl_hours
+    return datetime.now(timezone.utc) - timedelta(hours=hours)
+
+
+def _find(db: Session, key: str) -> tuple[Optional[IdempotencyKey], bool]:
+    """The stored key (if any) and whether it has outlived the TTL"""
+    row = db.execute(
+        select(IdempotencyKey, IdempotencyKey.created_at < _cutoff())
+        .where(IdempotencyKey.key == key)
+    ).first()
+    return (row[0], bool(row[1])) if row else (None, False)
+
+
+def _replay(record: IdempotencyKey, fingerprint: str) -> IdempotentResult:
+    if record.request_hash != fingerprint:
+        raise IdempotencyKeyReused("Idempotency-Key was already used for a different request")
+    if record.status_code is None:
+        raise IdempotencyError("A request with this Idempotency-Key is still being processed")
+    IDEMPOTENT_REPLAYS.inc()
+    return IdempotentResult(record.status_code, record.response_body, replayed=True)
+
+
+def run_idempotent(
+    db: Session,
+    key: str,
+    scope: str,
+    payload: BaseModel,
+    operation: Callable[[Session], BaseModel],
+    status_code: int = 201
+) -> IdempotentResult:
+    """
+    Run operation at most once per Idempotency-Key and return its response.
+    A stored key is answered with a plain SELECT, without running the operation
+    or taking any of its locks. A new key is claimed by inserting its row before
+    the operation runs; a concurrent retry blocks on the unique index and then
+    replays. The operation gets a session joined to this transaction, where its
+    own commit only releases a savepoint, so its writes, the claim and the
+    stored response all commit together, and its cache invalidations wait
+    for that commit. Only successful responses are stored: a request that
+    fails can be retried with the same key.
+    """
+    fingerprint = request_fingerprint(scope, payload)
+    record, expired = _find(db, key)
+    if record is not None and not expired:
+        return _replay(record, fingerprint)
+    if record is not None:
+        # Deleted with its own statement before the new row is inserted: the
+        # unit of work would run the INSERT first and hit the unique index
+        db.expunge(record)
+        db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.key == key, IdempotencyKey.created_at < _cutoff())
+            .execution_options(synchronize_session=False)
+        )
+
+    record = IdempotencyKey(key=key, request_hash=fingerprint)
+    db.add(record)
+    try:
+        db.flush()
+    except IntegrityError:
+        # A concurrent request with the same key committed first
+        db.rollback()
+        record, _ = _find(db, key)
+        if record is None:
+            raise IdempotencyError("A request with this Idempotency-Key is still being processed")
+        return _replay(record, fingerprint)
+
+    work = Session(bind=db.connection(), autoflush=False, join_transaction_mode="create_savepoint")
+    with defer_invalidations():
+        try:
+            response = operation(work)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            work.close()
+        record.status_code = status_code
+        record.response_body = response.model_dump_json()
+        db.commit()
+    return IdempotentResult(status_code, record.response_body, replayed=False)
+
+
+def idempotent_response(result: IdempotentResult) -> Response:
+    """Send a stored or fresh idempotent result, flagging replays"""
+    headers = {"Idempotent-Replayed": "true"} if result.replayed else {}
+    return Response(
+        content=result.body,
+        status_code=result.status_code,
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def purge_expired_keys(
+    db: Session,
+    ttl_hours: Optional[float] = None,
+    batch_size: int = PURGE_BATCH_SIZE
+) -> int:
+    """
+    Delete keys older than the TTL, batch_size rows per transaction, using the
+    created_at index. Returns the number of keys deleted.
+    """
+    cutoff = _cutoff(ttl_hours)
+    deleted = 0
+    while True:
+        expired = (
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.created_at < cutoff)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.id.in_(expired))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
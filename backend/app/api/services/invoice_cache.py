@@ -0,0 +1,97 @@
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, NamedTuple, Optional
+from fastapi import Response
+
+from app.core.cache import build_cache
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+from app.api.schemas.invoice import InvoiceRow, invoice_json
+
+
+# Serialized InvoiceResponse payloads for GET /invoices/{id}.
+# Every service function that changes an invoice or its payments calls
+# invalidate_invoices after committing. A read that raced with a write can
+# still re-populate a stale entry, so the TTL bounds staleness in that case.
+# Under run_idempotent that commit only releases a savepoint, so the calls
+# are deferred to the real commit (defer_invalidations).
+invoice_cache = build_cache(settings)
+
+# Invoice ids collected by defer_invalidations, for the current request
+_deferred: ContextVar[Optional[set[int]]] = ContextVar("deferred_invalidations", default=None)
+
+
+class CachedInvoice(NamedTuple):
+    etag: str
+    payload: bytes
+
+
+def _key(invoice_id: int) -> str:
+    return f"invoice:{invoice_id}"
+
+
+def make_etag(payload: bytes) -> str:
+    return '"' + hashlib.blake2b(payload, digest_size=16).hexdigest() + '"'
+
+
+def get_cached_invoice(invoice_id: int) -> Optional[CachedInvoice]:
+    value = invoice_cache.get(_key(invoice_id))
+    if value is None:
+        CACHE_REQUESTS.inc(result="miss")
+        return None
+    CACHE_REQUESTS.inc(result="hit")
+    etag, _, payload = value.partition(b"\n")
+    return CachedInvoice(etag.decode(), payload)
+
+
+def cache_invoice(invoice: InvoiceRow) -> CachedInvoice:
+    """Serialize an invoice detail row (with its payments) and store it"""
+    payload = invoice_json.dump_json(invoice)
+    entry = CachedInvoice(make_etag(payload), payload)
+    invoice_cache.set(_key(invoice["id"]), entry.etag.encode() + b"\n" + payload)
+    return entry
+
+
+def invalidate_invoices(*invoice_ids: int) -> None:
+    deferred = _deferred.get()
+    if deferred is not None:
+        deferred.update(invoice_ids)
+        return
+    invoice_cache.delete(*(_key(invoice_id) for invoice_id in invoice_ids))
+
+
+@contextmanager
+def defer_invalidations() -> Iterator[None]:
+    """
+    Hold the invalidate_invoices calls made inside the block and apply them
+    when it exits. For operations whose commit only releases a savepoint:
+    evicting before the enclosing transaction commits would let a read in
+    between cache the old state until the TTL.
+    """
+    token = _deferred.set(set())
+    try:
+        yield
+    finally:
+        invoice_ids = _deferred.get()
+        _deferred.reset(token)
+        if invoice_ids:
+            invalidate_invoices(*invoice_ids)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 9110 weak comparison against an If-None-Match header"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def invoice_response(entry: CachedInvoice, if_none_match: Optional[str]) -> Response:
+    """200 with the cached payload, or 304 without a body when the client's copy is current"""
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.payload, media_type="application/json", headers=headers)
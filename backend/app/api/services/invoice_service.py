@@ -1,165 +1,744 @@
 from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
 from typing import Optional
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, update, delete, and_, or_, tuple_, literal_column
 
+from app.db.models.customer import Customer
 from app.db.models.invoice import Invoice, InvoiceStatus
-from app.api.schemas.invoice import InvoiceCreate, InvoiceDraftUpdate
+from app.db.models.payment import Payment
+from app.db.models.invoice_tombstone import InvoiceTombstone
+from app.api.schemas.invoice import (
+    BatchInvoiceResult,
+    BatchTransitionResponse,
+    BatchTransitionSkip,
+    MAX_BATCH_TRANSITION,
+    InvoiceChangesRows,
+    InvoiceCreate,
+    InvoiceDraftUpdate,
+    InvoicePageRows,
+    InvoiceResponse,
+    InvoiceRow,
+    PaymentRow,
+    invoice_changes_json,
+    invoice_page_json,
+)
+from app.api.services.aging_service import add_aging_delta, apply_aging_deltas
+from app.api.services.pagination import DEFAULT_PAGE_SIZE, encode_cursor, decode_invoice_cursor, decode_sync_token
+from app.api.services.invoice_cache import invalidate_invoices
+from app.api.services.payment_service import chunked
+from app.api.services.event_service import (
+    INVOICE_CREATED,
+    INVOICE_DELETED,
+    INVOICE_POSTED,
+    INVOICE_UPDATED,
+    INVOICE_VOIDED,
+    EVENT_INVOICE_FIELDS,
+    add_events,
+    invoice_event,
+    invoice_state,
+)
+from app.core.metrics import INVOICES_POSTED, INVOICES_VOIDED
 
 
-def create_invoice(db: Session, invoice_data: InvoiceCreate) -> Invoice:
-    """Create a new invoice"""
-    invoice = Invoice(**invoice_data.model_dump())
-    db.add(invoice)
+def create_invoice(db: Session, invoice_data: InvoiceCreate) -> InvoiceResponse:
+    """Create a new invoice with one INSERT ... RETURNING (no reload after commit)"""
+    row = db.execute(
+        insert(Invoice).values(**invoice_data.model_dump()).returning(*INVOICE_DETAIL_COLUMNS)
+    ).one()
+    if row.status == InvoiceStatus.PENDING:
+        _track_open_balance(db, row, sign=1)
+    add_events(db, [invoice_event(INVOICE_CREATED, invoice_state(row))])
     db.commit()
-    db.refresh(invoice)
-    return invoice
+    return InvoiceResponse.model_validate({**row._mapping, "payments": []})
 
 
-def get_invoice(db: Session, invoice_id: int) -> Optional[Invoice]:
-    """Get invoice by ID with payments loaded"""
-    return db.scalar(
-        select(Invoice)
-        .where(Invoice.id == invoice_id)
-        .options(selectinload(Invoice.payments))
-    )
-
 class InvoiceError(Exception):
     """Invoice operation error"""
     pass
 
 
-def update_invoice(db: Session, invoice_id: int, data: InvoiceDraftUpdate) -> Invoice:
-    """Update a DRAFT invoice's amount, currency, and/or dates. Only DRAFT can be updated."""
-    invoice = db.scalar(
-        select(Invoice)
-        .where(Invoice.id == invoice_id)
-        .options(selectinload(Invoice.payments))
-    )
-    if not invoice:
-        raise InvoiceError(f"Invoice {invoice_id} not found")
-    if invoice.status != InvoiceStatus.DRAFT:
+def _track_open_balance(db: Session, invoice: Invoice, sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) an invoice's outstanding balance in the aging summary"""
+    balance = Decimal(str(invoice.amount)) - Decimal(str(invoice.amount_paid or 0))
+    deltas = {}
+    add_aging_delta(deltas, invoice, sign * balance, sign)
+    apply_aging_deltas(db, deltas)
+
+
+def create_invoices_batch(
+    db: Session,
+    items: list[InvoiceCreate],
+    all_or_nothing: bool = False
+) -> list[BatchInvoiceResult]:
+    """
+    Create many invoices in one transaction.
+    The referenced customers are checked (and key-share locked against
+    deletion) with one query per chunk, then the accepted invoices are written
+    with multi-row INSERT ... RETURNING id per chunk, along with their aging
+    deltas and invoice.created events, and committed once. Items naming an
+    unknown customer are rejected: alone by default, or together with the
+    whole batch (InvoiceError, nothing written) when all_or_nothing is set.
+    """
+    customer_ids = sorted({item.customer_id for item in items})
+    known_customers = set()
+    for chunk in chunked(customer_ids):
+        known_customers.update(db.scalars(
+            select(Customer.id)
+            .where(Customer.id.in_(chunk))
+            .with_for_update(read=True, key_share=True)
+        ))
+
+    results: list[BatchInvoiceResult] = []
+    accepted: list[BatchInvoiceResult] = []
+    invoice_rows = []
+    aging_deltas = {}
+    for index, item in enumerate(items):
+        if item.customer_id not in known_customers:
+            results.append(BatchInvoiceResult(
+                index=index, status="rejected", error=f"Customer {item.customer_id} not found"
+            ))
+            continue
+        result = BatchInvoiceResult(index=index, status="created")
+        results.append(result)
+        accepted.append(result)
+        invoice_rows.append(item.model_dump())
+        if item.status == InvoiceStatus.PENDING:
+            add_aging_delta(aging_deltas, item, item.amount, 1)
+
+    rejected = [r for r in results if r.status == "rejected"]
+    if not invoice_rows or (rejected and all_or_nothing):
+        db.rollback()
+        if rejected and all_or_nothing:
+            raise InvoiceError(
+                f"{len(rejected)} item(s) rejected, no invoices created; "
+                f"first: item {rejected[0].index}: {rejected[0].error}"
+            )
+        return results
+
+    events = []
+    for result_chunk, row_chunk in zip(chunked(accepted), chunked(invoice_rows)):
+        invoice_ids = db.scalars(
+            insert(Invoice).returning(Invoice.id, sort_by_parameter_order=True),
+            row_chunk,
+        ).all()
+        for result, row, invoice_id in zip(result_chunk, row_chunk, invoice_ids):
+            result.invoice_id = invoice_id
+            new_invoice = SimpleNamespace(**row, id=invoice_id, amount_paid=0, overdue_at=None)
+            events.append(invoice_event(INVOICE_CREATED, invoice_state(new_invoice)))
+
+    apply_aging_deltas(db, aging_deltas)
+    add_events(db, events)
+    db.commit()
+    return results
+
+
+def _transition_error(invoice_id: int, status: Optional[InvoiceStatus], from_status: InvoiceStatus, check) -> str:
+    """
+    Why an invoice now in status (None: no such invoice) was not moved out of
+    from_status: the reason check gives, or a concurrent change when the
+    status passes the check again by the time it is read.
+    """
+    if status is None:
+        return f"Invoice {invoice_id} not found"
+    try:
+        check(status)
+    except InvoiceError as e:
+        return str(e)
+    return f"Invoice {invoice_id} was not {from_status.value} when the change ran"
+
+
+def _current_status(db: Session, invoice_id: int) -> Optional[InvoiceStatus]:
+    return db.scalar(select(Invoice.status).where(Invoice.id == invoice_id))
+
+
+def _invoice_response(db: Session, row) -> InvoiceResponse:
+    """
+    A RETURNING row as InvoiceResponse. amount_paid is the running total of
+    the invoice's payments, so they are only queried when it is non-zero.
+    """
+    payments = db.execute(payments_for_invoices_query([row.id], [row.issued_at])).all() if row.amount_paid else []
+    return InvoiceResponse.model_validate({
+        **row._mapping,
+        "payments": [dict(zip(PAYMENT_ROW_FIELDS, payment)) for payment in payments],
+    })
+
+
+def check_can_update(status: InvoiceStatus) -> None:
+    """Editing rule: only DRAFT invoices can be updated"""
+    if status != InvoiceStatus.DRAFT:
         raise InvoiceError("Only draft invoices can be updated")
+
+
+def update_invoice(db: Session, invoice_id: int, data: InvoiceDraftUpdate) -> InvoiceResponse:
+    """
+    Update a DRAFT invoice's amount, currency, and/or dates. Only DRAFT can be updated.
+    One conditional UPDATE ... RETURNING checks the status and the date order
+    on the row itself; the reason is looked up only when it matches nothing.
+    """
     update_data = data.model_dump(exclude_unset=True)
     if not update_data:
-        db.refresh(invoice)
-        return invoice
-    if "due_at" in update_data and "issued_at" in update_data:
-        if update_data["due_at"] < update_data["issued_at"]:
-            raise InvoiceError("Due date must be on or after issued date")
-    elif "due_at" in update_data and update_data["due_at"] < invoice.issued_at:
-        raise InvoiceError("Due date must be on or after issued date")
-    elif "issued_at" in update_data and invoice.due_at < update_data["issued_at"]:
+        invoice = get_invoice_detail(db, invoice_id)
+        if invoice is None:
+            raise InvoiceError(f"Invoice {invoice_id} not found")
+        check_can_update(invoice["status"])
+        return InvoiceResponse.model_validate(invoice)
+
+    conditions = [Invoice.id == invoice_id, Invoice.status == InvoiceStatus.DRAFT]
+    dates_ordered = True
+    if "due_at" in update_data or "issued_at" in update_data:
+        due_at = update_data.get("due_at", Invoice.due_at)
+        issued_at = update_data.get("issued_at", Invoice.issued_at)
+        if isinstance(due_at, datetime) and isinstance(issued_at, datetime):
+            dates_ordered = due_at >= issued_at
+        else:
+            conditions.append(due_at >= issued_at)
+    row = None
+    if dates_ordered:
+        row = db.execute(
+            update(Invoice)
+            .where(*conditions)
+            .values(**update_data)
+            .returning(*INVOICE_DETAIL_COLUMNS)
+            # The date condition cannot be evaluated in Python; fetch rides on RETURNING
+            .execution_options(synchronize_session="fetch")
+        ).one_or_none()
+    if row is None:
+        status = _current_status(db, invoice_id)
+        if status is None:
+            raise InvoiceError(f"Invoice {invoice_id} not found")
+        check_can_update(status)
         raise InvoiceError("Due date must be on or after issued date")
-    for key, value in update_data.items():
-        setattr(invoice, key, value)
+
+    add_events(db, [invoice_event(INVOICE_UPDATED, invoice_state(row))])
+    db.commit()
+    invalidate_invoices(invoice_id)
+    return InvoiceResponse.model_validate({**row._mapping, "payments": []})
+
+
+def check_can_post(status: InvoiceStatus) -> None:
+    """Posting rule: only DRAFT invoices can be sent for payment"""
+    if status != InvoiceStatus.DRAFT:
+        raise InvoiceError(f"Invoice must be DRAFT to post (current: {status.value})")
+
+
+def check_can_void(status: InvoiceStatus) -> None:
+    """Voiding rule: only PENDING invoices can be voided"""
+    if status == InvoiceStatus.DRAFT:
+        raise InvoiceError("Draft invoices can be deleted, not voided.")
+    if status == InvoiceStatus.PAID:
+        raise InvoiceError("Cannot void a paid invoice")
+    if status == InvoiceStatus.VOID:
+        raise InvoiceError("Invoice is already void")
+
+
+def check_can_delete(status: InvoiceStatus) -> None:
+    """Deletion rule: only DRAFT invoices can be deleted"""
+    if status != InvoiceStatus.DRAFT:
+        raise InvoiceError("Only draft invoices can be deleted. Use void to cancel a pending invoice.")
+
+
+def _transition_invoice(
+    db: Session,
+    invoice_id: int,
+    from_status: InvoiceStatus,
+    to_status: InvoiceStatus,
+    check,
+    event_type: str
+) -> InvoiceResponse:
+    """
+    Compare-and-set one invoice from from_status to to_status: a single
+    UPDATE ... WHERE id AND status RETURNING, then its aging delta and event,
+    and commit. When no row matches, one more query finds the reason.
+    """
+    row = db.execute(
+        update(Invoice)
+        .where(Invoice.id == invoice_id, Invoice.status == from_status)
+        .values(status=to_status)
+        .returning(*INVOICE_DETAIL_COLUMNS)
+    ).one_or_none()
+    if row is None:
+        raise InvoiceError(_transition_error(invoice_id, _current_status(db, invoice_id), from_status, check))
+
+    _track_open_balance(db, row, sign=1 if to_status == InvoiceStatus.PENDING else -1)
+    add_events(db, [invoice_event(event_type, invoice_state(row))])
+    invoice = _invoice_response(db, row)
     db.commit()
-    db.refresh(invoice)
+    invalidate_invoices(invoice_id)
     return invoice
 
 
-def post_invoice(db: Session, invoice_id: int) -> Invoice:
+def post_invoice(db: Session, invoice_id: int) -> InvoiceResponse:
     """Send invoice for payment: DRAFT → PENDING."""
-    invoice = db.scalar(
-        select(Invoice)
-        .where(Invoice.id == invoice_id)
-        .options(selectinload(Invoice.payments))
+    invoice = _transition_invoice(
+        db, invoice_id, InvoiceStatus.DRAFT, InvoiceStatus.PENDING, check_can_post, INVOICE_POSTED
     )
-    if not invoice:
-        raise InvoiceError(f"Invoice {invoice_id} not found")
-    if invoice.status != InvoiceStatus.DRAFT:
-        raise InvoiceError(f"Invoice must be DRAFT to post (current: {invoice.status.value})")
-    invoice.status = InvoiceStatus.PENDING
-    db.commit()
-    db.refresh(invoice)
+    INVOICES_POSTED.inc()
     return invoice
 
 
 def delete_invoice(db: Session, invoice_id: int) -> None:
     """Delete an invoice from the DB. Only DRAFT invoices can be deleted."""
-    invoice = db.scalar(
-        select(Invoice)
-        .where(Invoice.id == invoice_id)
-        .options(selectinload(Invoice.payments))
-    )
-    if not invoice:
-        raise InvoiceError(f"Invoice {invoice_id} not found")
-    if invoice.status != InvoiceStatus.DRAFT:
-        raise InvoiceError("Only draft invoices can be deleted. Use void to cancel a pending invoice.")
-    db.delete(invoice)
+    row = db.execute(
+        delete(Invoice)
+        .where(Invoice.id == invoice_id, Invoice.status == InvoiceStatus.DRAFT)
+        .returning(*INVOICE_DETAIL_COLUMNS)
+    ).one_or_none()
+    if row is None:
+        raise InvoiceError(_transition_error(
+            invoice_id, _current_status(db, invoice_id), InvoiceStatus.DRAFT, check_can_delete
+        ))
+    add_events(db, [invoice_event(INVOICE_DELETED, invoice_state(row))])
+    db.execute(insert(InvoiceTombstone).values(invoice_id=invoice_id))
     db.commit()
+    invalidate_invoices(invoice_id)
 
 
-def void_invoice(db: Session, invoice_id: int) -> Invoice:
+def void_invoice(db: Session, invoice_id: int) -> InvoiceResponse:
     """Cancel invoice: set status to VOID. Only PENDING invoices can be voided."""
-    invoice = db.scalar(
-        select(Invoice)
-        .where(Invoice.id == invoice_id)
-        .options(selectinload(Invoice.payments))
+    invoice = _transition_invoice(
+        db, invoice_id, InvoiceStatus.PENDING, InvoiceStatus.VOID, check_can_void, INVOICE_VOIDED
     )
-    if not invoice:
-        raise InvoiceError(f"Invoice {invoice_id} not found")
-    if invoice.status == InvoiceStatus.DRAFT:
-        raise InvoiceError("Draft invoices can be deleted, not voided.")
-    if invoice.status == InvoiceStatus.PAID:
-        raise InvoiceError("Cannot void a paid invoice")
-    if invoice.status == InvoiceStatus.VOID:
-        raise InvoiceError("Invoice is already void")
-    invoice.status = InvoiceStatus.VOID
-    db.commit()
-    db.refresh(invoice)
+    INVOICES_VOIDED.inc()
     return invoice
 
 
-def get_customer_invoices(
+def transition_targets_query(
+    status: InvoiceStatus,
+    invoice_ids: Optional[list[int]] = None,
+    customer_id: Optional[int] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    limit: Optional[int] = None
+):
+    """
+    Ids of the invoices a batch transition applies to: in status, and in
+    invoice_ids or matching the filters, the first `limit` by id. Locked in
+    id order, so concurrent batches cannot deadlock.
+    """
+    query = select(Invoice.id)
+    if invoice_ids is not None:
+        query = query.where(Invoice.id.in_(invoice_ids))
+    query = apply_invoice_filters(
+        query,
+        status=status,
+        customer_id=customer_id,
+        from_date=from_date,
+        to_date=to_date
+    )
+    query = query.order_by(Invoice.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.with_for_update()
+
+
+def _transition_invoices_batch(
     db: Session,
-    customer_id: int,
-    status: Optional[InvoiceStatus] = None,
+    from_status: InvoiceStatus,
+    to_status: InvoiceStatus,
+    check,
+    event_type: str,
+    invoice_ids: Optional[list[int]] = None,
+    **filters
+) -> BatchTransitionResponse:
+    """
+    Move every targeted invoice from from_status to to_status with one
+    UPDATE ... RETURNING per chunk of ids (one in all for a filter), adding
+    the aging deltas and events from the returned rows, and commit once.
+    Requested ids that were not updated are reported with the reason check
+    gives for their current status. A filter moves at most
+    MAX_BATCH_TRANSITION invoices; has_more says whether any are left, and
+    since moved invoices no longer match, the same request continues.
+    """
+    sign = 1 if to_status == InvoiceStatus.PENDING else -1
+    requested = sorted(set(invoice_ids)) if invoice_ids is not None else None
+    selections = chunked(requested) if requested is not None else [None]
+    limit = None if requested is not None else MAX_BATCH_TRANSITION
+    rows = []
+    for chunk in selections:
+        targets = transition_targets_query(from_status, chunk, **filters, limit=limit)
+        rows += db.execute(
+            update(Invoice)
+            .where(Invoice.id.in_(targets.scalar_subquery()))
+            .values(status=to_status)
+            .returning(*(INVOICE_SUMMARY_COLUMNS[field] for field in EVENT_INVOICE_FIELDS))
+            .execution_options(synchronize_session=False)
+        ).all()
+
+    aging_deltas = {}
+    for row in rows:
+        balance = Decimal(str(row.amount)) - Decimal(str(row.amount_paid))
+        add_aging_delta(aging_deltas, row, sign * balance, sign)
+    apply_aging_deltas(db, aging_deltas)
+    add_events(db, [invoice_event(event_type, dict(row._mapping)) for row in rows])
+
+    updated_ids = sorted(row.id for row in rows)
+    has_more = limit is not None and len(rows) == limit and db.scalar(
+        transition_targets_query(from_status, **filters, limit=1)
+    ) is not None
+    skipped = []
+    if requested is not None:
+        updated = set(updated_ids)
+        missing = [invoice_id for invoice_id in requested if invoice_id not in updated]
+        statuses = {}
+        for chunk in chunked(missing):
+            statuses.update(db.execute(select(Invoice.id, Invoice.status).where(Invoice.id.in_(chunk))).all())
+        for invoice_id in missing:
+            error = _transition_error(invoice_id, statuses.get(invoice_id), from_status, check)
+            skipped.append(BatchTransitionSkip(invoice_id=invoice_id, error=error))
+
+    db.commit()
+    invalidate_invoices(*updated_ids)
+    return BatchTransitionResponse(updated_ids=updated_ids, skipped=skipped, has_more=has_more)
+
+
+def post_invoices_batch(
+    db: Session,
+    invoice_ids: Optional[list[int]] = None,
+    customer_id: Optional[int] = None,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None
-) -> list[Invoice]:
-    """Get invoices for a customer with optional filters"""
-    query = select(Invoice).where(Invoice.customer_id == customer_id)
-    
-    if status:
-        query = query.where(Invoice.status == status)
-    
-    if from_date:
-        query = query.where(Invoice.issued_at >= from_date)
-    
-    if to_date:
-        query = query.where(Invoice.issued_at <= to_date)
-    
-    query = query.options(selectinload(Invoice.payments)) 
-    query = query.order_by(Invoice.issued_at.desc())
-    
-    return list(db.scalars(query).all())
+) -> BatchTransitionResponse:
+    """Post many DRAFT invoices (by ids, or every DRAFT matching the filters) in one transaction"""
+    result = _transition_invoices_batch(
+        db, InvoiceStatus.DRAFT, InvoiceStatus.PENDING, check_can_post, INVOICE_POSTED,
+        invoice_ids, customer_id=customer_id, from_date=from_date, to_date=to_date
+    )
+    INVOICES_POSTED.inc(len(result.updated_ids))
+    return result
 
 
-def get_all_invoices(
+def void_invoices_batch(
     db: Session,
+    invoice_ids: Optional[list[int]] = None,
+    customer_id: Optional[int] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+) -> BatchTransitionResponse:
+    """Void many PENDING invoices (by ids, or every PENDING matching the filters) in one transaction"""
+    result = _transition_invoices_batch(
+        db, InvoiceStatus.PENDING, InvoiceStatus.VOID, check_can_void, INVOICE_VOIDED,
+        invoice_ids, customer_id=customer_id, from_date=from_date, to_date=to_date
+    )
+    INVOICES_VOIDED.inc(len(result.updated_ids))
+    return result
+
+
+def apply_invoice_filters(
+    query,
     status: Optional[InvoiceStatus] = None,
     customer_id: Optional[int] = None,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None
-) -> list[Invoice]:
-    """Get all invoices with optional filters"""
-    query = select(Invoice)
-    
+):
+    """Apply the shared list filters (status, customer, issued_at range) to a query"""
     if status:
         query = query.where(Invoice.status == status)
-    
+
     if customer_id:
         query = query.where(Invoice.customer_id == customer_id)
-    
+
     if from_date:
         query = query.where(Invoice.issued_at >= from_date)
-    
+
     if to_date:
         query = query.where(Invoice.issued_at <= to_date)
-    
-    query = query.options(selectinload(Invoice.payments))
-    query = query.order_by(Invoice.issued_at.desc())
-    
-    return list(db.scalars(query).all())
\ No newline at end of file
+
+    return query
+
+
+def paginate_invoices(query, limit: Optional[int] = None, cursor: Optional[str] = None):
+    """
+    Order by (issued_at desc, id desc) and apply keyset pagination.
+    The cursor holds the (issued_at, id) of the last row of the previous page,
+    so every page is a single index range scan regardless of its depth.
+    The plain issued_at bound is implied by the row comparison; it is there
+    because PostgreSQL prunes monthly partitions on it but not on a row
+    comparison.
+    """
+    if cursor:
+        issued_at, invoice_id = decode_invoice_cursor(cursor)
+        query = query.where(
+            Invoice.issued_at <= issued_at,
+            tuple_(Invoice.issued_at, Invoice.id) < tuple_(issued_at, invoice_id),
+        )
+
+    query = query.order_by(Invoice.issued_at.desc(), Invoice.id.desc())
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    return query
+
+
+def split_invoice_page(invoices: list[Invoice], limit: int) -> tuple[list[Invoice], Optional[str]]:
+    """
+    Split a result fetched with limit + 1 into the page itself and the cursor
+    of the next page (None when this is the last page).
+    """
+    if len(invoices) <= limit:
+        return invoices, None
+    page = invoices[:limit]
+    last = page[-1]
+    return page, encode_cursor(last.issued_at, last.id)
+
+
+# Columns an invoice list row can carry (fields=); balance_due is computed in the SELECT
+INVOICE_SUMMARY_COLUMNS = {
+    "id": Invoice.id,
+    "customer_id": Invoice.customer_id,
+    "amount": Invoice.amount,
+    "currency": Invoice.currency,
+    "issued_at": Invoice.issued_at,
+    "due_at": Invoice.due_at,
+    "status": Invoice.status,
+    "amount_paid": Invoice.amount_paid,
+    "balance_due": (Invoice.amount - Invoice.amount_paid).label("balance_due"),
+    "overdue_at": Invoice.overdue_at,
+}
+
+
+def parse_invoice_fields(fields: Optional[str]) -> list[str]:
+    """
+    Validate a comma-separated fields= value. id is always included; no value
+    means every summary column.
+    """
+    if not fields:
+        return list(INVOICE_SUMMARY_COLUMNS)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in INVOICE_SUMMARY_COLUMNS]
+    if unknown:
+        raise InvoiceError(
+            f"Unknown field(s) {', '.join(unknown)}; "
+            f"choose from {', '.join(INVOICE_SUMMARY_COLUMNS)}"
+        )
+    return ["id"] + [name for name in dict.fromkeys(names) if name != "id"]
+
+
+def invoice_summary_query(
+    fields: list[str],
+    status: Optional[InvoiceStatus] = None,
+    customer_id: Optional[int] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+):
+    """
+    The list query projected to just the requested columns, with no ORM
+    entities or relationship loads. issued_at is always selected because the
+    next page's cursor is built from it.
+    """
+    columns = [INVOICE_SUMMARY_COLUMNS[name] for name in fields]
+    if "issued_at" not in fields:
+        columns.append(Invoice.issued_at)
+    query = apply_invoice_filters(
+        select(*columns),
+        status=status,
+        customer_id=customer_id,
+        from_date=from_date,
+        to_date=to_date
+    )
+    return paginate_invoices(query, limit=limit, cursor=cursor)
+
+
+PAYMENT_ROW_FIELDS = ("id", "invoice_id", "amount", "paid_at")
+
+
+def payments_for_invoices_query(invoice_ids: list[int], issued_at: Optional[list[datetime]] = None):
+    """
+    Payment columns for a page of invoices, in the same order as Invoice.payments.
+    Given the invoices' issued_at too, the query also filters on the payments
+    partition key, so only those months' partitions are read.
+    """
+    query = select(Payment.id, Payment.invoice_id, Payment.amount, Payment.paid_at).where(
+        Payment.invoice_id.in_(invoice_ids)
+    )
+    if issued_at is not None:
+        query = query.where(Payment.invoice_issued_at.in_(set(issued_at)))
+    return query.order_by(Payment.paid_at, Payment.id)
+
+
+def build_invoice_page(rows, fields: list[str], limit: int, payment_rows=None) -> InvoicePageRows:
+    """
+    Turn rows fetched with limit + 1 into a page of plain dicts holding only
+    the selected fields; payment_rows (when given) are embedded per invoice.
+    """
+    rows, next_cursor = split_invoice_page(rows, limit)
+    # Columns come back in fields order; zip drops the trailing cursor-only issued_at
+    items = [dict(zip(fields, row)) for row in rows]
+    if payment_rows is not None:
+        _embed_payments(items, payment_rows)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _embed_payments(items: list[InvoiceRow], payment_rows) -> None:
+    payments: dict[int, list[PaymentRow]] = {}
+    for payment in payment_rows:
+        payments.setdefault(payment.invoice_id, []).append(dict(zip(PAYMENT_ROW_FIELDS, payment)))
+    for item in items:
+        item["payments"] = payments.get(item["id"], [])
+
+
+def list_invoice_summaries(
+    db: Session,
+    fields: list[str],
+    include_payments: bool = False,
+    status: Optional[InvoiceStatus] = None,
+    customer_id: Optional[int] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None
+) -> InvoicePageRows:
+    """One page of invoice summaries; payments cost a second query only when included"""
+    rows = db.execute(invoice_summary_query(
+        fields,
+        status=status,
+        customer_id=customer_id,
+        from_date=from_date,
+        to_date=to_date,
+        limit=limit + 1,
+        cursor=cursor
+    )).all()
+    payment_rows = None
+    if include_payments:
+        page = rows[:limit]
+        payment_rows = db.execute(payments_for_invoices_query(
+            [row.id for row in page], [row.issued_at for row in page]
+        )).all() if page else []
+    return build_invoice_page(rows, fields, limit, payment_rows)
+
+
+def invoice_page_response(page: InvoicePageRows) -> Response:
+    """Serialize a page straight to JSON, skipping response_model validation"""
+    return Response(content=invoice_page_json.dump_json(page), media_type="application/json")
+
+
+def invoice_changes_queries(dialect: str, fields: list[str], token: str, limit: int):
+    """
+    Invoices, then tombstones, whose (row_version, id) is past the
+    changed_since token, each an index range in that order. On PostgreSQL
+    only markers below pg_snapshot_xmin are returned: a transaction still
+    running may yet commit a marker lower than one already visible, and
+    handing out the higher one first would move the token past it.
+    """
+    after = tuple_(*decode_sync_token(token))
+    columns = [INVOICE_SUMMARY_COLUMNS[name] for name in fields]
+    invoices = select(*columns, Invoice.row_version).where(tuple_(Invoice.row_version, Invoice.id) > after)
+    tombstones = select(
+        InvoiceTombstone.invoice_id.label("id"),
+        InvoiceTombstone.deleted_at,
+        InvoiceTombstone.row_version,
+    ).where(tuple_(InvoiceTombstone.row_version, InvoiceTombstone.invoice_id) > after)
+    if dialect == "postgresql":
+        horizon = literal_column("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        invoices = invoices.where(Invoice.row_version < horizon)
+        tombstones = tombstones.where(InvoiceTombstone.row_version < horizon)
+    return (
+        invoices.order_by(Invoice.row_version, Invoice.id).limit(limit),
+        tombstones.order_by(InvoiceTombstone.row_version, InvoiceTombstone.invoice_id).limit(limit),
+    )
+
+
+def split_invoice_changes(invoice_rows, tombstone_rows, limit: int) -> tuple[list, bool]:
+    """
+    Merge both results (each fetched with limit + 1) in (row_version, id)
+    order into the page's (deleted, row) entries and whether more follow.
+    """
+    entries = sorted(
+        [(False, row) for row in invoice_rows] + [(True, row) for row in tombstone_rows],
+        key=lambda entry: (entry[1].row_version, entry[1].id),
+    )
+    return entries[:limit], len(entries) > limit
+
+
+def build_invoice_changes(
+    entries: list,
+    has_more: bool,
+    fields: list[str],
+    token: str,
+    payment_rows=None
+) -> InvoiceChangesRows:
+    """Shape a page of changes; next_token is the last entry's position (or token when empty)"""
+    # zip drops the trailing row_version
+    items = [dict(zip(fields, row)) for deleted, row in entries if not deleted]
+    if payment_rows is not None:
+        _embed_payments(items, payment_rows)
+    deleted = [{"id": row.id, "deleted_at": row.deleted_at} for is_deleted, row in entries if is_deleted]
+    if entries:
+        last = entries[-1][1]
+        token = encode_cursor(last.row_version, last.id)
+    return {"items": items, "deleted": deleted, "next_token": token, "has_more": has_more}
+
+
+def list_invoice_changes(
+    db: Session,
+    token: str,
+    fields: list[str],
+    include_payments: bool = False,
+    limit: int = DEFAULT_PAGE_SIZE
+) -> InvoiceChangesRows:
+    """
+    Incremental sync: invoices written and drafts deleted since the token,
+    oldest change first, so a client only downloads what changed.
+    """
+    invoice_query, tombstone_query = invoice_changes_queries(db.get_bind().dialect.name, fields, token, limit + 1)
+    entries, has_more = split_invoice_changes(
+        db.execute(invoice_query).all(), db.execute(tombstone_query).all(), limit
+    )
+    payment_rows = None
+    if include_payments:
+        invoice_ids = [row.id for deleted, row in entries if not deleted]
+        payment_rows = db.execute(payments_for_invoices_query(invoice_ids)).all() if invoice_ids else []
+    return build_invoice_changes(entries, has_more, fields, token, payment_rows)
+
+
+def invoice_changes_response(changes: InvoiceChangesRows) -> Response:
+    """Serialize a page of changes straight to JSON, skipping response_model validation"""
+    return Response(content=invoice_changes_json.dump_json(changes), media_type="application/json")
+
+
+# InvoiceResponse field order, so detail payloads (and their ETags) match the model
+INVOICE_DETAIL_FIELDS = (
+    "customer_id", "amount", "currency", "issued_at", "due_at", "status",
+    "id", "amount_paid", "balance_due", "overdue_at",
+)
+
+
+INVOICE_DETAIL_COLUMNS = [INVOICE_SUMMARY_COLUMNS[name] for name in INVOICE_DETAIL_FIELDS]
+
+
+def invoice_detail_query(invoice_id: int):
+    """One invoice and its payments in a single round trip (one row per payment)"""
+    return (
+        select(
+            *INVOICE_DETAIL_COLUMNS,
+            Payment.id, Payment.invoice_id, Payment.amount, Payment.paid_at,
+        )
+        .outerjoin(Payment, and_(Payment.invoice_id == Invoice.id, Payment.invoice_issued_at == Invoice.issued_at))
+        .where(Invoice.id == invoice_id)
+        .order_by(Payment.paid_at, Payment.id)
+    )
+
+
+def build_invoice_detail(rows) -> Optional[InvoiceRow]:
+    """Fold the joined rows of invoice_detail_query into one invoice dict"""
+    if not rows:
+        return None
+    split = len(INVOICE_DETAIL_FIELDS)
+    detail = dict(zip(INVOICE_DETAIL_FIELDS, rows[0]))
+    detail["payments"] = [
+        dict(zip(PAYMENT_ROW_FIELDS, row[split:]))
+        for row in rows
+        if row[split] is not None
+    ]
+    return detail
+
+
+def get_invoice_detail(db: Session, invoice_id: int) -> Optional[InvoiceRow]:
+    """Read path for GET /invoices/{id}: Core rows, no ORM objects"""
+    return build_invoice_detail(db.execute(invoice_detail_query(invoice_id)).all())
+
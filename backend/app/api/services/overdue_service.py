@@ -0,0 +1,101 @@
+"""
+Overdue sweep: flag PENDING invoices whose due date has passed.
+
+Each batch is one short transaction that claims up to batch_size invoices
+with SELECT ... FOR UPDATE SKIP LOCKED, walking ix_invoices_overdue_sweep in
+(due_at, id) order, and sets their overdue_at. Rows locked by another worker
+or by record_payment are skipped rather than waited on, and a later run picks
+them up. Flagged rows drop out of the partial index, so an interrupted sweep
+simply resumes where it stopped.
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from sqlalchemy import select, text, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import INVOICES_MARKED_OVERDUE, JOB_BATCH_DURATION
+from app.db.models.invoice import Invoice, OVERDUE_SWEEP_WHERE
+from app.api.services.invoice_cache import invalidate_invoices
+from app.api.services.invoice_service import INVOICE_SUMMARY_COLUMNS
+from app.api.services.event_service import EVENT_INVOICE_FIELDS, INVOICE_OVERDUE, add_events, invoice_event
+
+
+@dataclass
+class SweepResult:
+    marked: int = 0
+    batches: int = 0
+
+
+def overdue_batch_query(now: datetime, batch_size: int, after: Optional[tuple[datetime, int]] = None):
+    """Ids of the next batch of unflagged PENDING invoices past due, locked, skipping locked rows"""
+    query = select(Invoice.id).where(text(OVERDUE_SWEEP_WHERE), Invoice.due_at < now)
+    if after is not None:
+        query = query.where(tuple_(Invoice.due_at, Invoice.id) > tuple_(*after))
+    return (
+        query.order_by(Invoice.due_at, Invoice.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def mark_overdue_batch(
+    db: Session,
+    now: datetime,
+    batch_size: int,
+    after: Optional[tuple[datetime, int]] = None
+) -> list[tuple[datetime, int]]:
+    """
+    Flag one batch, add an invoice.overdue event per invoice, and commit.
+    Returns the (due_at, id) of each invoice flagged.
+    """
+    rows = db.execute(
+        update(Invoice)
+        .where(Invoice.id.in_(overdue_batch_query(now, batch_size, after).scalar_subquery()))
+        .values(overdue_at=now)
+        .returning(*(INVOICE_SUMMARY_COLUMNS[field] for field in EVENT_INVOICE_FIELDS))
+        .execution_options(synchronize_session=False)
+    ).all()
+    add_events(db, [invoice_event(INVOICE_OVERDUE, dict(row._mapping)) for row in rows])
+    db.commit()
+    if rows:
+        # Reaches the API processes only through a shared cache (CACHE_BACKEND=redis);
+        # with the per-process memory backend they serve the old entry until its TTL
+        invalidate_invoices(*(row.id for row in rows))
+        INVOICES_MARKED_OVERDUE.inc(len(rows))
+    return [(row.due_at, row.id) for row in rows]
+
+
+def sweep_overdue_invoices(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+    should_stop: Callable[[], bool] = lambda: False
+) -> SweepResult:
+    """
+    Flag every PENDING invoice due before now, batch_size per transaction,
+    sleeping pause seconds between batches. should_stop is checked between
+    batches so a shutting-down worker finishes its current batch and exits.
+    """
+    now = now or datetime.now(timezone.utc)
+    batch_size = batch_size or settings.overdue_sweep_batch_size
+    pause = settings.overdue_sweep_batch_pause_seconds if pause is None else pause
+
+    result = SweepResult()
+    after = None
+    while not should_stop():
+        started = time.perf_counter()
+        flagged = mark_overdue_batch(db, now, batch_size, after)
+        JOB_BATCH_DURATION.observe(time.perf_counter() - started, job="overdue_sweep")
+        result.batches += 1
+        result.marked += len(flagged)
+        if len(flagged) < batch_size:
+            break
+        # Never revisit rows skipped as locked within this run
+        after = max(flagged)
+        if pause:
+            time.sleep(pause)
+    return result
@@ -0,0 +1,57 @@
+import base64
+import json
+from datetime import datetime
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class CursorError(Exception):
+    """Malformed or tampered pagination cursor"""
+    pass
+
+
+def encode_cursor(*values) -> str:
+    """Encode keyset values into an opaque, URL-safe cursor string."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Decode a cursor produced by encode_cursor back into its raw JSON values."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise CursorError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise CursorError("Invalid cursor")
+    return values
+
+
+def decode_invoice_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode an (issued_at, id) invoice cursor."""
+    values = decode_cursor(cursor)
+    try:
+        issued_at, invoice_id = values
+        return datetime.fromisoformat(issued_at), int(invoice_id)
+    except (ValueError, TypeError) as e:
+        raise CursorError("Invalid cursor") from e
+
+
+# changed_since value that starts a sync from the beginning
+SYNC_START_TOKEN = "0"
+
+
+def decode_sync_token(token: str) -> tuple[int, int]:
+    """Decode a (row_version, id) changed_since token; SYNC_START_TOKEN is (0, 0)."""
+    if token == SYNC_START_TOKEN:
+        return 0, 0
+    values = decode_cursor(token)
+    try:
+        row_version, row_id = values
+        return int(row_version), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise CursorError("Invalid changed_since token") from e
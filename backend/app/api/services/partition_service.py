@@ -0,0 +1,61 @@
+"""
+Monthly partitions of invoices (by issued_at) and payments (by their
+invoice's issued_at), once the partitioning migration has run.
+
+Rows for a month without a partition land in the table's default partition,
+which is never pruned, and a default partition holding rows for a month
+blocks creating that month's partition later. So partitions are created
+ahead of time: the worker calls ensure_partitions daily, which creates the
+current month and the next months_ahead months where missing, through the
+create_monthly_partitions() function the migration installs. On SQLite, or
+on PostgreSQL before the migration, there is nothing to do.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+# Partitioned on the same monthly bounds, so invoices and their payments share a month
+PARTITIONED_TABLES = ("invoices", "payments")
+
+# Creating a partition briefly locks its parent; give up rather than queue
+# every invoice query behind a long-running one (the next run retries)
+LOCK_TIMEOUT = "5s"
+
+
+def partitioned_tables(db: Session) -> list[str]:
+    """The tables of PARTITIONED_TABLES that are partitioned in this database"""
+    if db.get_bind().dialect.name != "postgresql":
+        return []
+    return [
+        table for table in PARTITIONED_TABLES
+        if db.scalar(
+            text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+            {"table": table},
+        )
+    ]
+
+
+def ensure_partitions(db: Session, months_ahead: Optional[int] = None, now: Optional[datetime] = None) -> int:
+    """
+    Create the missing monthly partitions from now's month through
+    months_ahead months later; returns how many were created.
+    """
+    if months_ahead is None:
+        months_ahead = settings.partition_months_ahead
+    now = now or datetime.now(timezone.utc)
+    first_month = now.astimezone(timezone.utc).date().replace(day=1)
+
+    created = 0
+    for table in partitioned_tables(db):
+        db.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+        created += db.scalar(
+            text("SELECT create_monthly_partitions(:table, :first_month, :months)"),
+            {"table": table, "first_month": first_month, "months": months_ahead},
+        )
+        db.commit()
+    return created
@@ -0,0 +1,163 @@
+"""
+Group commit for single payments (opt-in: PAYMENT_GROUP_COMMIT=true).
+
+When many callers pay the same invoice at once, record_payment serializes
+them on the invoice's row lock and commits each one on its own, so the hot
+row manages one payment per commit. The pipeline queues payments in-process
+instead, and a flusher thread records whatever is queued with
+record_payments_batch: each invoice is locked once, the overpayment and PAID
+rules run in arrival order, and the whole micro-batch is one commit. Every
+caller waits on its own Future, so a rejected payment raises PaymentError for
+that caller only.
+
+A batch is flushed no later than flush_interval after its oldest payment was
+queued, or as soon as max_batch payments are waiting. The queue is per
+process; payments from other processes (or the direct path) still serialize
+on the same row locks. Any error while flushing fails that batch's Futures
+only; the flusher carries on (or is restarted by the next submit), and
+record() gives up after timeout seconds.
+"""
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import PAYMENT_GROUP_COMMIT_BATCH_SIZE
+from app.db.session import SessionLocal
+from app.api.schemas.payment import BatchPaymentItem, PaymentCreate, PaymentResponse
+from app.api.services.payment_service import PaymentError, record_payments_batch
+
+
+# 503 detail for a payment whose batch did not finish within the timeout
+PIPELINE_TIMEOUT_DETAIL = "Payment not confirmed in time; check the invoice before retrying"
+
+
+@dataclass
+class _QueuedPayment:
+    item: BatchPaymentItem
+    future: Future = field(default_factory=Future)
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class PaymentPipeline:
+    """Queues payments and records them in micro-batches from one flusher thread"""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        flush_interval: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = (
+            settings.payment_group_commit_interval_ms / 1000 if flush_interval is None else flush_interval
+        )
+        self.max_batch = max_batch or settings.payment_group_commit_max_batch
+        self.timeout = settings.payment_group_commit_timeout_seconds if timeout is None else timeout
+        self._queue: list[_QueuedPayment] = []
+        self._changed = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(self, invoice_id: int, payment_data: PaymentCreate) -> Future:
+        """
+        Queue a payment; the Future resolves to its PaymentResponse, or raises
+        PaymentError if a rule rejected it. paid_at defaults to now, the time
+        it was received rather than the time its batch ran.
+        """
+        queued = _QueuedPayment(BatchPaymentItem(
+            invoice_id=invoice_id,
+            amount=payment_data.amount,
+            paid_at=payment_data.paid_at or datetime.now(timezone.utc),
+        ))
+        with self._changed:
+            if self._closed:
+                raise RuntimeError("Payment pipeline is closed")
+            self._queue.append(queued)
+            if self._thread is None:
+                self._start()
+            self._changed.notify()
+        return queued.future
+
+    def record(self, invoice_id: int, payment_data: PaymentCreate) -> PaymentResponse:
+        """
+        Blocking submit: the payment's result once its batch has committed.
+        Raises TimeoutError after self.timeout; the payment may still be
+        recorded later.
+        """
+        return self.submit(invoice_id, payment_data).result(timeout=self.timeout)
+
+    def close(self) -> None:
+        """Flush what is queued, then stop the flusher thread"""
+        with self._changed:
+            self._closed = True
+            self._changed.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _next_batch(self) -> list[_QueuedPayment]:
+        """Wait until the oldest payment is due (or the batch is full) and take the batch"""
+        with self._changed:
+            while not self._queue and not self._closed:
+                self._changed.wait()
+            deadline = self._queue[0].queued_at + self.flush_interval if self._queue else 0.0
+            while len(self._queue) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+            return batch
+
+    def _run(self) -> None:
+        try:
+            while True:
+                batch = self._next_batch()
+                if not batch:
+                    return
+                try:
+                    self.flush(batch)
+                except Exception as e:
+                    # Whatever failed, no caller of this batch is left waiting
+                    for queued in batch:
+                        if not queued.future.done():
+                            queued.future.set_exception(e)
+        finally:
+            with self._changed:
+                self._thread = None
+                if self._queue:
+                    self._start()
+
+    def _start(self) -> None:
+        """Start the flusher thread; called with self._changed held"""
+        self._thread = threading.Thread(target=self._run, name="payment-pipeline", daemon=True)
+        self._thread.start()
+
+    def flush(self, batch: list[_QueuedPayment]) -> None:
+        """Record one micro-batch in one transaction and resolve each caller's Future"""
+        with self.session_factory() as db:
+            try:
+                results = record_payments_batch(db, [queued.item for queued in batch])
+            except Exception:
+                db.rollback()
+                raise
+        PAYMENT_GROUP_COMMIT_BATCH_SIZE.observe(len(batch))
+        for queued, result in zip(batch, results):
+            if result.status == "recorded":
+                queued.future.set_result(PaymentResponse(
+                    id=result.payment_id,
+                    invoice_id=queued.item.invoice_id,
+                    amount=queued.item.amount,
+                    paid_at=queued.item.paid_at,
+                ))
+            else:
+                queued.future.set_exception(PaymentError(result.error))
+
+
+# Started on first use; only used when settings.payment_group_commit is on
+payment_pipeline = PaymentPipeline()
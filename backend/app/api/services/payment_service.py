@@ -1,11 +1,17 @@
+from dataclasses import dataclass
 from decimal import Decimal
 from datetime import datetime, timezone
+from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update, insert, case, literal, and_
 
 from app.db.models.invoice import Invoice, InvoiceStatus
 from app.db.models.payment import Payment
-from app.api.schemas.payment import PaymentCreate
+from app.api.schemas.payment import PaymentCreate, PaymentResponse, BatchPaymentItem, BatchPaymentResult
+from app.api.services.aging_service import add_aging_delta, apply_aging_deltas
+from app.api.services.invoice_cache import invalidate_invoices
+from app.api.services.event_service import PAYMENT_RECORDED, add_events, invoice_event, invoice_state
+from app.core.metrics import PAYMENTS_RECORDED, PAYMENT_REJECTIONS, OVERPAYMENT_EXCESS
 
 
 class PaymentError(Exception):
@@ -13,20 +19,55 @@ class PaymentError(Exception):
     pass
 
 
-def calculate_total_paid(db: Session, invoice_id: int) -> Decimal:
-    """Calculate the total amount paid for an invoice"""
-    result = db.scalar(
-        select(func.sum(Payment.amount))
-        .where(Payment.invoice_id == invoice_id)
-    )
-    return Decimal(result or 0)
+def check_payment_allowed(invoice: Invoice, amount: Decimal) -> None:
+    """
+    Enforce the payment business rules against an (already locked) invoice:
+    - Drafts cannot accept payments before being posted
+    - Cannot pay VOID or PAID invoices
+    - Payment must be positive
+    - No overpayment
+    """
+    # Business rule: Drafts cannot accept payments before being posted
+    if invoice.status == InvoiceStatus.DRAFT:
+        PAYMENT_REJECTIONS.inc(reason="draft")
+        raise PaymentError(
+            "Drafts cannot accept payments before being posted."
+        )
+
+    # Business rule: Cannot pay VOID or PAID invoices
+    if invoice.status in (InvoiceStatus.VOID, InvoiceStatus.PAID):
+        PAYMENT_REJECTIONS.inc(reason=invoice.status.value.lower())
+        raise PaymentError(
+            f"Cannot record payment for invoice with status {invoice.status.value}"
+        )
+
+    # Business rule: Payment must be positive (enforced by Pydantic, but double-check)
+    if amount <= 0:
+        PAYMENT_REJECTIONS.inc(reason="non_positive")
+        raise PaymentError("Payment amount must be positive")
+
+    # Business rule: No overpayment
+    remaining_balance = Decimal(str(invoice.amount)) - Decimal(str(invoice.amount_paid))
+    if amount > remaining_balance:
+        PAYMENT_REJECTIONS.inc(reason="overpayment")
+        OVERPAYMENT_EXCESS.observe(float(amount - remaining_balance))
+        raise PaymentError(
+            f"Payment amount {amount} exceeds remaining balance {remaining_balance}"
+        )
+
+
+def apply_payment(invoice: Invoice, amount: Decimal) -> None:
+    """Add a validated payment to the invoice's running total and mark it PAID when settled"""
+    invoice.amount_paid = Decimal(str(invoice.amount_paid)) + amount
+    if invoice.amount_paid >= Decimal(str(invoice.amount)):
+        invoice.status = InvoiceStatus.PAID
 
 
 def record_payment(
     db: Session, 
     invoice_id: int, 
     payment_data: PaymentCreate
-) -> Payment:
+) -> PaymentResponse:
     """
     Record a payment against an invoice.
     Enforces business rules:
@@ -42,50 +83,234 @@ def record_payment(
     )
     
     if not invoice:
+        PAYMENT_REJECTIONS.inc(reason="not_found")
         raise PaymentError(f"Invoice {invoice_id} not found")
-    
-    # Business rule: Drafts cannot accept payments before being posted
-    if invoice.status == InvoiceStatus.DRAFT:
-        raise PaymentError(
-            "Drafts cannot accept payments before being posted."
-        )
 
-    # Business rule: Cannot pay VOID or PAID invoices
-    if invoice.status in (InvoiceStatus.VOID, InvoiceStatus.PAID):
-        raise PaymentError(
-            f"Cannot record payment for invoice with status {invoice.status.value}"
-        )
-    
-    # Calculate current total paid
-    total_paid = calculate_total_paid(db, invoice_id)
+    # The running total on the locked row replaces a SUM over all payments
     new_payment_amount = Decimal(str(payment_data.amount))
-    
-    # Business rule: Payment must be positive (enforced by Pydantic, but double-check)
-    if new_payment_amount <= 0:
-        raise PaymentError("Payment amount must be positive")
-    
-    # Business rule: No overpayment
-    remaining_balance = Decimal(str(invoice.amount)) - total_paid
-    if new_payment_amount > remaining_balance:
-        raise PaymentError(
-            f"Payment amount {new_payment_amount} exceeds remaining balance {remaining_balance}"
-        )
+    check_payment_allowed(invoice, new_payment_amount)
     
     # Create payment
     paid_at = payment_data.paid_at or datetime.now(timezone.utc)
     payment = Payment(
         invoice_id=invoice_id,
+        invoice_issued_at=invoice.issued_at,
         amount=new_payment_amount,
         paid_at=paid_at
     )
     db.add(payment)
 
     # Business rule: Update invoice status to PAID if fully paid
-    new_total_paid = total_paid + new_payment_amount
-    if new_total_paid >= Decimal(str(invoice.amount)):
-        invoice.status = InvoiceStatus.PAID
+    apply_payment(invoice, new_payment_amount)
+    deltas = {}
+    add_aging_delta(
+        deltas,
+        invoice,
+        -new_payment_amount,
+        -1 if invoice.status == InvoiceStatus.PAID else 0,
+    )
+    apply_aging_deltas(db, deltas)
+
+    db.flush()
+    recorded = _payment_row(payment)
+    add_events(db, [invoice_event(PAYMENT_RECORDED, invoice_state(invoice), recorded)])
     
     db.commit()
-    db.refresh(payment)
+    invalidate_invoices(invoice_id)
+    PAYMENTS_RECORDED.inc()
     
-    return payment
\ No newline at end of file
+    # Built from the flushed row: no reload after commit
+    return PaymentResponse.model_validate(recorded)
+
+
+def _payment_row(payment) -> dict:
+    return {"id": payment.id, "invoice_id": payment.invoice_id, "amount": payment.amount, "paid_at": payment.paid_at}
+
+
+# Keep IN lists and multi-row statements well under driver bind-parameter limits
+BATCH_CHUNK_SIZE = 5000
+
+
+@dataclass
+class _InvoiceState:
+    """Just the columns the payment rules need, tracked in memory across a batch"""
+    id: int
+    amount: Decimal
+    amount_paid: Decimal
+    status: InvoiceStatus
+    customer_id: int
+    currency: str
+    issued_at: datetime
+    due_at: datetime
+    overdue_at: Optional[datetime]
+
+
+def chunked(values: list, size: int = BATCH_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def record_payments_batch(
+    db: Session,
+    items: list[BatchPaymentItem]
+) -> list[BatchPaymentResult]:
+    """
+    Record many payments in one transaction.
+    All target invoices are locked up front in id order (so concurrent batches
+    cannot deadlock), the same rules as record_payment are applied in memory in
+    request order, and the accepted payments are written with one multi-row
+    INSERT plus one UPDATE of the running totals/PAID statuses per chunk.
+    Rejected items do not affect the others; each item gets its own result.
+    """
+    invoice_ids = sorted({item.invoice_id for item in items})
+    invoices: dict[int, _InvoiceState] = {}
+    for chunk in chunked(invoice_ids):
+        rows = db.execute(
+            select(
+                Invoice.id,
+                Invoice.amount,
+                Invoice.amount_paid,
+                Invoice.status,
+                Invoice.customer_id,
+                Invoice.currency,
+                Invoice.issued_at,
+                Invoice.due_at,
+                Invoice.overdue_at,
+            )
+            .where(Invoice.id.in_(chunk))
+            .order_by(Invoice.id)
+            .with_for_update()
+        )
+        for row in rows:
+            invoices[row.id] = _InvoiceState(
+                id=row.id,
+                amount=Decimal(str(row.amount)),
+                amount_paid=Decimal(str(row.amount_paid)),
+                status=row.status,
+                customer_id=row.customer_id,
+                currency=row.currency,
+                issued_at=row.issued_at,
+                due_at=row.due_at,
+                overdue_at=row.overdue_at,
+            )
+
+    now = datetime.now(timezone.utc)
+    results: list[BatchPaymentResult] = []
+    accepted: list[BatchPaymentResult] = []
+    payment_rows = []
+    # Invoice state right after each accepted payment, for its event
+    event_states = []
+    aging_deltas = {}
+    for index, item in enumerate(items):
+        invoice = invoices.get(item.invoice_id)
+        amount = Decimal(str(item.amount))
+        try:
+            if invoice is None:
+                PAYMENT_REJECTIONS.inc(reason="not_found")
+                raise PaymentError(f"Invoice {item.invoice_id} not found")
+            check_payment_allowed(invoice, amount)
+        except PaymentError as e:
+            results.append(BatchPaymentResult(
+                index=index, invoice_id=item.invoice_id, status="rejected", error=str(e)
+            ))
+            continue
+
+        apply_payment(invoice, amount)
+        add_aging_delta(aging_deltas, invoice, -amount, -1 if invoice.status == InvoiceStatus.PAID else 0)
+        result = BatchPaymentResult(index=index, invoice_id=item.invoice_id, status="recorded")
+        results.append(result)
+        accepted.append(result)
+        payment_rows.append({
+            "invoice_id": item.invoice_id,
+            "invoice_issued_at": invoice.issued_at,
+            "amount": amount,
+            "paid_at": item.paid_at or now,
+        })
+        event_states.append(invoice_state(invoice))
+
+    if not payment_rows:
+        db.rollback()
+        return results
+
+    for result_chunk, row_chunk in zip(chunked(accepted), chunked(payment_rows)):
+        payment_ids = db.scalars(
+            insert(Payment).returning(Payment.id, sort_by_parameter_order=True),
+            row_chunk,
+        ).all()
+        for result, payment_id in zip(result_chunk, payment_ids):
+            result.payment_id = payment_id
+
+    touched = [invoices[i] for i in sorted({r.invoice_id for r in accepted})]
+    for chunk in chunked(touched):
+        settled = [inv.id for inv in chunk if inv.status == InvoiceStatus.PAID]
+        stmt = (
+            update(Invoice)
+            .where(Invoice.id.in_([inv.id for inv in chunk]))
+            .values(amount_paid=case(
+                {inv.id: inv.amount_paid for inv in chunk},
+                value=Invoice.id,
+            ))
+        )
+        if settled:
+            stmt = stmt.values(status=case(
+                (Invoice.id.in_(settled), literal(InvoiceStatus.PAID, Invoice.status.type)),
+                else_=Invoice.status,
+            ))
+        db.execute(stmt.execution_options(synchronize_session=False))
+
+    apply_aging_deltas(db, aging_deltas)
+    add_events(db, [
+        invoice_event(PAYMENT_RECORDED, state, {**row, "id": result.payment_id})
+        for state, row, result in zip(event_states, payment_rows, accepted)
+    ])
+    db.commit()
+    invalidate_invoices(*(inv.id for inv in touched))
+    PAYMENTS_RECORDED.inc(len(accepted))
+    return results
+
+
+def _payments_total(total):
+    # SQLite sums NUMERIC as floating point; round back to cents
+    return func.round(func.coalesce(total, 0), 2)
+
+
+def find_amount_paid_mismatches(db: Session) -> list[tuple[int, Decimal, Decimal]]:
+    """
+    Compare each invoice's cached amount_paid with the sum of its payment rows.
+    Returns (invoice_id, amount_paid, actual_total) for every invoice that disagrees.
+    """
+    actual_total = _payments_total(func.sum(Payment.amount))
+    rows = db.execute(
+        select(Invoice.id, Invoice.amount_paid, actual_total)
+        .outerjoin(Payment, and_(Payment.invoice_id == Invoice.id, Payment.invoice_issued_at == Invoice.issued_at))
+        .group_by(Invoice.id, Invoice.amount_paid)
+        .having(Invoice.amount_paid != actual_total)
+        .order_by(Invoice.id)
+    ).all()
+    return [(row[0], Decimal(str(row[1])), Decimal(str(row[2]))) for row in rows]
+
+
+def recalculate_amount_paid(db: Session, invoice_ids: Optional[list[int]] = None) -> int:
+    """
+    Rebuild amount_paid from the payment rows in one set-based UPDATE
+    (all invoices, or only invoice_ids). The same UPDATE settles PENDING/PAID
+    from the new total, as record_payment would have; DRAFT and VOID are kept.
+    Returns the number of rows updated. Does not commit; run rebuild_aging
+    afterwards, since open balances and PENDING counts may have changed.
+    """
+    total_paid = (
+        select(_payments_total(func.sum(Payment.amount)))
+        .where(Payment.invoice_id == Invoice.id, Payment.invoice_issued_at == Invoice.issued_at)
+        .scalar_subquery()
+    )
+    # One flat CASE: its first branch gives PostgreSQL the enum type for the rest
+    settled_status = case(
+        (Invoice.status.not_in([InvoiceStatus.PENDING, InvoiceStatus.PAID]), Invoice.status),
+        (total_paid >= Invoice.amount, literal(InvoiceStatus.PAID, Invoice.status.type)),
+        else_=literal(InvoiceStatus.PENDING, Invoice.status.type),
+    )
+    stmt = update(Invoice).values(amount_paid=total_paid, status=settled_status)
+    if invoice_ids is not None:
+        stmt = stmt.where(Invoice.id.in_(invoice_ids))
+    result = db.execute(stmt.execution_options(synchronize_session=False))
+    return result.rowcount
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import select, case, func, and_
+
+from app.db.models.aging import ReceivableAging
+from app.db.models.invoice import Invoice, InvoiceStatus
+from app.api.services.aging_service import due_on
+from app.api.services.invoice_service import apply_invoice_filters
+
+
+# Invoices that count towards receivables; DRAFT is not yet issued and VOID is cancelled
+RECEIVABLE_STATUSES = (InvoiceStatus.PENDING, InvoiceStatus.PAID)
+CENTS = Decimal("0.01")
+
+# Aging report columns and the days-past-due range each covers (inclusive, None = open-ended)
+AGING_BUCKETS = (
+    ("current", None, 0),
+    ("days_1_30", 1, 30),
+    ("days_31_60", 31, 60),
+    ("days_61_90", 61, 90),
+    ("days_over_90", 91, None),
+)
+
+
+def _sum_where(condition, value):
+    return func.sum(case((condition, value), else_=0))
+
+
+def _money(value) -> Decimal:
+    # A group whose CASE only ever hit the else branch sums to integer 0
+    return Decimal(value or 0).quantize(CENTS)
+
+
+def get_receivables_summary(
+    db: Session,
+    customer_id: Optional[int] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    as_of: Optional[datetime] = None
+) -> list[dict]:
+    """
+    Accounts-receivable totals per (customer, currency) in a single grouped query.
+    Reads only the invoices table: amount_paid is the running payment total,
+    so payments never need to be joined or summed here.
+    """
+    as_of = as_of or datetime.now(timezone.utc)
+    receivable = Invoice.status.in_(RECEIVABLE_STATUSES)
+    pending = Invoice.status == InvoiceStatus.PENDING
+
+    columns = [
+        Invoice.customer_id,
+        Invoice.currency,
+        _sum_where(receivable, Invoice.amount).label("total_invoiced"),
+        _sum_where(receivable, Invoice.amount_paid).label("total_paid"),
+        _sum_where(pending, Invoice.balance_due).label("outstanding"),
+        _sum_where(pending & (Invoice.due_at < as_of), Invoice.balance_due).label("overdue"),
+    ]
+    columns += [
+        _sum_where(Invoice.status == status, 1).label(f"count_{status.value}")
+        for status in InvoiceStatus
+    ]
+
+    query = apply_invoice_filters(
+        select(*columns),
+        customer_id=customer_id,
+        from_date=from_date,
+        to_date=to_date
+    )
+    query = (
+        query.group_by(Invoice.customer_id, Invoice.currency)
+        .order_by(Invoice.customer_id, Invoice.currency)
+    )
+
+    return [
+        {
+            "customer_id": row.customer_id,
+            "currency": row.currency,
+            "total_invoiced": _money(row.total_invoiced),
+            "total_paid": _money(row.total_paid),
+            "outstanding": _money(row.outstanding),
+            "overdue": _money(row.overdue),
+            "invoice_counts": {
+                status: int(getattr(row, f"count_{status.value}") or 0)
+                for status in InvoiceStatus
+            },
+        }
+        for row in db.execute(query)
+    ]
+
+
+def _aging_bucket(today, low: Optional[int], high: Optional[int]):
+    # days past due = today - due_on, so a range of days is a range of due dates
+    conditions = []
+    if low is not None:
+        conditions.append(ReceivableAging.due_on <= today - timedelta(days=low))
+    if high is not None:
+        conditions.append(ReceivableAging.due_on >= today - timedelta(days=high))
+    return and_(*conditions)
+
+
+def get_aging_report(
+    db: Session,
+    customer_id: Optional[int] = None,
+    as_of: Optional[datetime] = None
+) -> list[dict]:
+    """
+    Open balances per (customer, currency) split into days-past-due buckets.
+    Reads only the receivable_aging summary, whose size depends on customers
+    and distinct open due dates, never on the number of invoices.
+    """
+    today = due_on(as_of or datetime.now(timezone.utc))
+    columns = [ReceivableAging.customer_id, ReceivableAging.currency]
+    columns += [
+        _sum_where(_aging_bucket(today, low, high), ReceivableAging.balance).label(name)
+        for name, low, high in AGING_BUCKETS
+    ]
+    columns += [
+        func.sum(ReceivableAging.balance).label("total"),
+        func.sum(ReceivableAging.invoice_count).label("invoice_count"),
+    ]
+
+    query = select(*columns)
+    if customer_id:
+        query = query.where(ReceivableAging.customer_id == customer_id)
+    query = (
+        query.group_by(ReceivableAging.customer_id, ReceivableAging.currency)
+        .order_by(ReceivableAging.customer_id, ReceivableAging.currency)
+    )
+
+    return [
+        {
+            "customer_id": row.customer_id,
+            "currency": row.currency,
+            **{name: _money(getattr(row, name)) for name, _, _ in AGING_BUCKETS},
+            "total": _money(row.total),
+            "invoice_count": int(row.invoice_count or 0),
+        }
+        for row in db.execute(query)
+    ]
@@ -0,0 +1,322 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Each worker process keeps its own registry; when running several uvicorn
+workers, scrape each one (or run a single worker per container).
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+AMOUNT_BUCKETS = (0.01, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> ([count per bucket..., +Inf], sum)
+        self._values: dict[tuple[str, ...], tuple[list[int], float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = self.header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], list[str]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], list[str]]) -> None:
+        """Add a callback that renders extra lines (e.g. gauges read at scrape time)"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# HTTP
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, method and status code",
+    ("method", "route", "status"),
+))
+HTTP_REQUEST_SQL_STATEMENTS = registry.register(Histogram(
+    "http_request_sql_statements",
+    "SQL statements executed per HTTP request",
+    ("method", "route"),
+    buckets=COUNT_BUCKETS,
+))
+HTTP_REQUEST_SQL_DURATION = registry.register(Histogram(
+    "http_request_sql_duration_seconds",
+    "Total time spent in SQL per HTTP request",
+    ("method", "route"),
+))
+
+# SQL
+SQL_STATEMENT_DURATION = registry.register(Histogram(
+    "sql_statement_duration_seconds",
+    "Duration of individual SQL statements by verb",
+    ("verb",),
+))
+
+# Cache
+CACHE_REQUESTS = registry.register(Counter(
+    "invoice_cache_requests_total",
+    "Invoice detail cache lookups by result",
+    ("result",),
+))
+
+# Business
+PAYMENTS_RECORDED = registry.register(Counter(
+    "payments_recorded_total",
+    "Payments recorded",
+))
+PAYMENT_REJECTIONS = registry.register(Counter(
+    "payment_rejections_total",
+    "Payments rejected by business rules, by reason",
+    ("reason",),
+))
+OVERPAYMENT_EXCESS = registry.register(Histogram(
+    "payment_overpayment_excess_amount",
+    "Amount by which rejected overpayments exceeded the remaining balance",
+    buckets=AMOUNT_BUCKETS,
+))
+INVOICES_POSTED = registry.register(Counter(
+    "invoices_posted_total",
+    "Invoices posted (DRAFT -> PENDING)",
+))
+INVOICES_VOIDED = registry.register(Counter(
+    "invoices_voided_total",
+    "Invoices voided (PENDING -> VOID)",
+))
+IDEMPOTENT_REPLAYS = registry.register(Counter(
+    "idempotent_replays_total",
+    "Requests answered from a stored Idempotency-Key response",
+))
+PAYMENT_GROUP_COMMIT_BATCH_SIZE = registry.register(Histogram(
+    "payment_group_commit_batch_size",
+    "Payments recorded per group-commit transaction",
+    buckets=COUNT_BUCKETS,
+))
+INVOICES_MARKED_OVERDUE = registry.register(Counter(
+    "invoices_marked_overdue_total",
+    "PENDING invoices flagged overdue by the sweep",
+))
+
+# Background jobs
+JOB_RUNS = registry.register(Counter(
+    "job_runs_total",
+    "Background job runs by job and outcome",
+    ("job", "outcome"),
+))
+JOB_BATCH_DURATION = registry.register(Histogram(
+    "job_batch_duration_seconds",
+    "Duration of one background job batch (one transaction)",
+    ("job",),
+))
+
+
+# Pool status keys exported by render_pool_metrics: key -> (metric, type, help)
+POOL_METRICS = {
+    "checked_out": ("db_pool_checked_out", "gauge", "Connections currently checked out"),
+    "checked_in": ("db_pool_checked_in", "gauge", "Idle connections in the pool"),
+    "overflow": ("db_pool_overflow", "gauge", "Overflow connections currently open"),
+    "size": ("db_pool_size", "gauge", "Configured pool size"),
+    "checkouts": ("db_pool_checkouts_total", "counter", "Connection checkouts"),
+    "overflow_checkouts": ("db_pool_overflow_checkouts_total", "counter", "Checkouts served from overflow"),
+    "checkout_timeouts": ("db_pool_checkout_timeouts_total", "counter", "Checkouts that timed out waiting"),
+    "checkout_wait_seconds_total": ("db_pool_checkout_wait_seconds_total", "counter", "Time spent waiting for a connection"),
+    "checkout_wait_seconds_max": ("db_pool_checkout_wait_seconds_max", "gauge", "Longest wait for a connection"),
+    "connects": ("db_pool_connects_total", "counter", "New DBAPI connections opened"),
+    "invalidations": ("db_pool_invalidations_total", "counter", "Connections invalidated"),
+    "soft_invalidations": ("db_pool_soft_invalidations_total", "counter", "Connections soft-invalidated"),
+}
+
+
+def render_pool_metrics(statuses: dict[str, dict]) -> list[str]:
+    """Render pool_status() snapshots, keyed by engine name, as Prometheus samples"""
+    lines: list[str] = []
+    for key, (name, type_name, documentation) in POOL_METRICS.items():
+        samples = [
+            f"{name}{_format_labels(('engine',), (engine,))} {_format_value(status[key])}"
+            for engine, status in statuses.items()
+            if key in status
+        ]
+        if samples:
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {type_name}"] + samples
+    return lines
+
+
+class _SqlStats:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Per-request SQL accounting; the middleware installs a fresh _SqlStats, and
+# threadpool/greenlet hops copy the context so the same object is mutated
+_request_sql: ContextVar[Optional[_SqlStats]] = ContextVar("request_sql", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+    SQL_STATEMENT_DURATION.observe(elapsed, verb=verb)
+    stats = _request_sql.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and SQL usage per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = _SqlStats()
+        token = _request_sql.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_sql.reset(token)
+            route = scope.get("route")
+            # Label by template (/invoices/{invoice_id}), never by raw path
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_REQUEST_DURATION.observe(elapsed, method=method, route=template, status=str(status_code))
+            HTTP_REQUEST_SQL_STATEMENTS.observe(stats.statements, method=method, route=template)
+            HTTP_REQUEST_SQL_DURATION.observe(stats.seconds, method=method, route=template)
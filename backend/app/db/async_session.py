@@ -0,0 +1,30 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.pool import pool_options, instrument_pool
+from app.db.session import DATABASE_URL
+
+
+def _default_async_url() -> str:
+    """Same database as DATABASE_URL, reached through asyncpg"""
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = settings.async_database_url or _default_async_url()
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **pool_options(settings, ASYNC_DATABASE_URL, is_async=True)
+)
+async_pool_metrics = instrument_pool(async_engine.sync_engine)
+# expire_on_commit=False: expired attributes would need lazy IO, which AsyncSession cannot do implicitly
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
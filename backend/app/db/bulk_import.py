@@ -0,0 +1,429 @@
+"""
+Streaming bulk import of customers, invoices and payments.
+
+Input is read incrementally (a JSON array, NDJSON, or the seed-data.json
+object of arrays) and written in batches, either with PostgreSQL COPY into a
+staging table or with multi-row INSERT. Rows whose id already exists are
+skipped, so a rerun resumes an interrupted import. Payments are stored with their invoice's
+issued_at (the partition key they share), looked up once per batch. Sequences, invoice running totals and the
+aging summary are brought up to date once at the end.
+
+    python -m app.db.bulk_import seed-data.json
+    python -m app.db.bulk_import --customers c.ndjson --invoices i.ndjson --payments p.ndjson
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from itertools import islice
+from typing import IO, Iterator, Optional
+
+from sqlalchemy import Table, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db.models.customer import Customer
+from app.db.models.invoice import Invoice, InvoiceStatus
+from app.db.models.payment import Payment
+from app.api.services.aging_service import rebuild_aging
+from app.api.services.payment_service import recalculate_amount_paid
+
+
+DEFAULT_BATCH_SIZE = 5000
+READ_CHUNK_SIZE = 64 * 1024
+# Give up on a single value that is still undecodable after this much input
+MAX_VALUE_SIZE = 16 * 1024 * 1024
+PROGRESS_INTERVAL_SECONDS = 2.0
+
+# Load order: each table only references the ones before it
+TABLE_ORDER = ("customers", "invoices", "payments")
+
+
+class BulkImportError(Exception):
+    """Malformed input or unsupported import option"""
+    pass
+
+
+class _JsonStream:
+    """Incremental JSON reader over a text stream, one value at a time"""
+
+    def __init__(self, fp: IO[str], chunk_size: int = READ_CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder(parse_float=Decimal)
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ("" at end of input)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise BulkImportError(f"Expected {char!r}, found {found or 'end of input'!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more input as needed"""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if len(self.buf) - self.pos < MAX_VALUE_SIZE and self._fill():
+                    continue
+                raise BulkImportError("Truncated or invalid JSON input")
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def array(self) -> Iterator:
+        """Yield the elements of the JSON array starting at the current position"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise BulkImportError(f"Expected ',' or ']' in array, found {separator or 'end of input'!r}")
+
+
+def iter_records(fp: IO[str], chunk_size: int = READ_CHUNK_SIZE) -> Iterator[dict]:
+    """Stream records from a JSON array or from NDJSON (one object per line)"""
+    stream = _JsonStream(fp, chunk_size)
+    if stream.peek() == "[":
+        yield from stream.array()
+        return
+    while stream.peek():
+        yield stream.value()
+
+
+def iter_seed_sections(fp: IO[str], chunk_size: int = READ_CHUNK_SIZE) -> Iterator[tuple[str, Iterator[dict]]]:
+    """
+    Stream a {"customers": [...], "invoices": [...], "payments": [...]} document
+    as (table name, records) pairs. Each records iterator must be consumed
+    before advancing; anything left unread is skipped.
+    """
+    stream = _JsonStream(fp, chunk_size)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        name = stream.value()
+        if not isinstance(name, str):
+            raise BulkImportError("Expected a table name")
+        stream.expect(":")
+        records = stream.array()
+        yield name, records
+        for _ in records:
+            pass
+        separator = stream.peek()
+        stream.pos += 1
+        if separator == "}":
+            return
+        if separator != ",":
+            raise BulkImportError(f"Expected ',' or '}}' in object, found {separator or 'end of input'!r}")
+
+
+def _parse_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _customer_row(record: dict) -> dict:
+    return {"id": record["id"], "name": record["name"]}
+
+
+def _invoice_row(record: dict) -> dict:
+    return {
+        "id": record["id"],
+        "customer_id": record["customer_id"],
+        "amount": Decimal(str(record["amount"])),
+        "currency": record["currency"],
+        "issued_at": _parse_datetime(record["issued_at"]),
+        "due_at": _parse_datetime(record["due_at"]),
+        "status": InvoiceStatus[record["status"]],
+    }
+
+
+def _payment_row(record: dict) -> dict:
+    return {
+        "id": record["id"],
+        "invoice_id": record["invoice_id"],
+        "amount": Decimal(str(record["amount"])),
+        "paid_at": _parse_datetime(record["paid_at"]),
+    }
+
+
+TABLES = {
+    "customers": (Customer.__table__, _customer_row),
+    "invoices": (Invoice.__table__, _invoice_row),
+    "payments": (Payment.__table__, _payment_row),
+}
+
+
+def _batches(rows: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class _Progress:
+    """Periodic rows/sec reporting for one table"""
+
+    def __init__(self, name: str, out=sys.stdout):
+        self.name = name
+        self.out = out
+        self.rows = 0
+        self.start = self.last_report = time.perf_counter()
+
+    def add(self, count: int) -> None:
+        self.rows += count
+        now = time.perf_counter()
+        if now - self.last_report >= PROGRESS_INTERVAL_SECONDS:
+            self.last_report = now
+            self._report("…")
+
+    def done(self) -> None:
+        self._report("✓")
+
+    def _report(self, mark: str) -> None:
+        elapsed = time.perf_counter() - self.start
+        rate = self.rows / elapsed if elapsed > 0 else 0
+        print(f"  {mark} {self.name}: {self.rows:,} rows ({rate:,.0f} rows/s)", file=self.out, flush=True)
+
+
+def _add_invoice_issued_at(conn: Connection, rows: list[dict]) -> None:
+    """Fill invoice_issued_at on a batch of payment rows with one lookup"""
+    invoice_ids = {row["invoice_id"] for row in rows}
+    issued_at = dict(conn.execute(
+        select(Invoice.id, Invoice.issued_at).where(Invoice.id.in_(invoice_ids))
+    ).all())
+    for row in rows:
+        # An unknown invoice leaves NULL, rejected like the dangling foreign key it is
+        row["invoice_issued_at"] = issued_at.get(row["invoice_id"])
+
+
+def _new_rows(conn: Connection, table: Table, rows: list[dict]) -> list[dict]:
+    """The rows whose id is neither in the table nor earlier in the batch"""
+    existing = set(conn.scalars(select(table.c.id).where(table.c.id.in_([row["id"] for row in rows]))))
+    new = []
+    for row in rows:
+        if row["id"] not in existing:
+            existing.add(row["id"])
+            new.append(row)
+    return new
+
+
+def _insert_batch(conn: Connection, table: Table, rows: list[dict]) -> None:
+    """
+    Multi-row INSERT of the rows whose id is new. Existing ids are looked up
+    rather than left to the unique key: on partitioned PostgreSQL that key
+    is (id, partition key), so an id whose issued_at changed since the last
+    run would not conflict. ON CONFLICT DO NOTHING still covers a
+    concurrent writer.
+    """
+    rows = _new_rows(conn, table, rows)
+    if not rows:
+        return
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(table)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(table)
+    else:
+        raise BulkImportError(f"INSERT import is not supported for dialect {dialect}")
+    conn.execute(stmt.on_conflict_do_nothing(), rows)
+
+
+def _copy_value(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.name
+    return value
+
+
+def _copy_batch(conn: Connection, table: Table, rows: list[dict]) -> None:
+    """
+    COPY the batch into a per-connection staging table, then move across
+    the rows whose id is not in the table yet (COPY alone cannot skip
+    existing ids, and on partitioned tables neither can ON CONFLICT; see
+    _insert_batch). DISTINCT ON drops ids repeated within the batch.
+    """
+    staging = f"_import_{table.name}"
+    columns = ", ".join(rows[0])
+    conn.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {table.name} INCLUDING DEFAULTS)"
+    ))
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow([_copy_value(value) for value in row.values()])
+    buf.seek(0)
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv)", buf)
+    finally:
+        cursor.close()
+    conn.execute(text(
+        f"INSERT INTO {table.name} ({columns}) "
+        f"SELECT DISTINCT ON (id) {columns} FROM {staging} s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {table.name} t WHERE t.id = s.id) "
+        f"ORDER BY id ON CONFLICT DO NOTHING"
+    ))
+    conn.execute(text(f"TRUNCATE {staging}"))
+
+
+def resolve_method(conn: Connection, method: str) -> str:
+    """Pick COPY on PostgreSQL/psycopg2 for "auto"; reject COPY elsewhere"""
+    can_copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+    if method == "auto":
+        return "copy" if can_copy else "insert"
+    if method == "copy" and not can_copy:
+        raise BulkImportError("COPY import requires PostgreSQL with psycopg2")
+    return method
+
+
+def import_records(
+    conn: Connection,
+    table_name: str,
+    records: Iterator[dict],
+    method: str = "insert",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    out=sys.stdout
+) -> int:
+    """
+    Write records to one table in batches, committing after each batch.
+    Ids that already exist are skipped with one lookup per batch, not per
+    row. Returns the number of records read.
+    """
+    if table_name not in TABLES:
+        raise BulkImportError(f"Unknown table {table_name!r}")
+    table, to_row = TABLES[table_name]
+    write = _copy_batch if method == "copy" else _insert_batch
+    progress = _Progress(table_name, out)
+    for batch in _batches((to_row(record) for record in records), batch_size):
+        if table_name == "payments":
+            _add_invoice_issued_at(conn, batch)
+        write(conn, table, batch)
+        conn.commit()
+        progress.add(len(batch))
+    progress.done()
+    return progress.rows
+
+
+def finish_import(conn: Connection, tables: set[str], out=sys.stdout) -> None:
+    """Reset id sequences and rebuild derived data once, after all batches"""
+    if conn.dialect.name == "postgresql":
+        for name in TABLE_ORDER:
+            if name in tables:
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), "
+                    f"COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {name}"
+                ))
+        conn.commit()
+        print("  ✓ Reset id sequences", file=out)
+
+    if tables & {"invoices", "payments"}:
+        db = Session(bind=conn)
+        try:
+            if "payments" in tables:
+                recalculate_amount_paid(db)
+            rebuild_aging(db)
+            db.commit()
+        finally:
+            db.close()
+        print("  ✓ Recalculated invoice totals and aging summary", file=out)
+
+
+def import_seed_file(
+    conn: Connection,
+    fp: IO[str],
+    method: str = "insert",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    out=sys.stdout
+) -> dict[str, int]:
+    """Stream a seed-data.json style document into the database; returns rows read per table"""
+    counts: dict[str, int] = {}
+    for name, records in iter_seed_sections(fp):
+        if name not in TABLES:
+            raise BulkImportError(f"Unknown table {name!r}")
+        loaded_later = TABLE_ORDER[TABLE_ORDER.index(name) + 1:]
+        if any(later in counts for later in loaded_later):
+            raise BulkImportError(f"{name!r} must come before {', '.join(loaded_later)} in the input")
+        counts[name] = import_records(conn, name, records, method, batch_size, out)
+    finish_import(conn, set(counts), out)
+    return counts
+
+
+def main(argv: Optional[list[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Bulk import customers, invoices and payments")
+    parser.add_argument("seed_file", nargs="?", help="JSON document with customers/invoices/payments arrays")
+    for name in TABLE_ORDER:
+        parser.add_argument(f"--{name}", help=f"JSON array or NDJSON file of {name}")
+    parser.add_argument("--method", choices=["auto", "copy", "insert"], default="auto")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    table_files = {name: getattr(args, name) for name in TABLE_ORDER if getattr(args, name)}
+    if bool(args.seed_file) == bool(table_files):
+        parser.error("pass either a seed file or --customers/--invoices/--payments files")
+
+    from app.db.session import engine
+
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        method = resolve_method(conn, args.method)
+        print(f"Importing with {method.upper()} in batches of {args.batch_size:,}...")
+        if args.seed_file:
+            with open(args.seed_file, encoding="utf-8") as fp:
+                import_seed_file(conn, fp, method, args.batch_size)
+        else:
+            for name, path in table_files.items():
+                with open(path, encoding="utf-8") as fp:
+                    import_records(conn, name, iter_records(fp), method, args.batch_size)
+            finish_import(conn, set(table_files))
+    print(f"✓ Import finished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
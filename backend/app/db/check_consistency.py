@@ -0,0 +1,50 @@
+import argparse
+import sys
+
+from app.db.session import SessionLocal
+from app.api.services.aging_service import rebuild_aging
+from app.api.services.invoice_cache import invalidate_invoices
+from app.api.services.payment_service import (
+    find_amount_paid_mismatches,
+    recalculate_amount_paid,
+)
+
+
+def main():
+    """Compare invoices.amount_paid with the payment rows, optionally repairing drift"""
+    parser = argparse.ArgumentParser(description="Check invoice amount_paid against payments")
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        help="Recalculate amount_paid for the invoices that disagree",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        mismatches = find_amount_paid_mismatches(db)
+        if not mismatches:
+            print("✓ amount_paid matches payments for every invoice")
+            return
+
+        print(f"✗ {len(mismatches)} invoice(s) with amount_paid out of sync:")
+        for invoice_id, cached, actual in mismatches:
+            print(f"  Invoice {invoice_id}: amount_paid={cached} payments={actual}")
+
+        if args.fix:
+            invoice_ids = [m[0] for m in mismatches]
+            updated = recalculate_amount_paid(db, invoice_ids)
+            # Open balances in the aging summary were derived from the bad totals,
+            # and repaired invoices may have moved between PENDING and PAID
+            rebuild_aging(db)
+            db.commit()
+            invalidate_invoices(*invoice_ids)
+            print(f"  ✓ Recalculated amount_paid and status for {updated} invoice(s)")
+        else:
+            sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
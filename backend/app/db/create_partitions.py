@@ -0,0 +1,30 @@
+import argparse
+
+from app.db.session import SessionLocal
+from app.api.services.partition_service import ensure_partitions, partitioned_tables
+
+
+def main():
+    """Create upcoming monthly partitions of invoices and payments"""
+    parser = argparse.ArgumentParser(description="Create upcoming monthly invoice/payment partitions")
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=None,
+        help="Override PARTITION_MONTHS_AHEAD",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not partitioned_tables(db):
+            print("✓ Tables are not partitioned; nothing to do")
+            return
+        created = ensure_partitions(db, args.months_ahead)
+        print(f"✓ Created {created} partition(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 from app.db.models.customer import Customer
 from app.db.models.invoice import Invoice, InvoiceStatus
 from app.db.models.payment import Payment
+from app.db.models.aging import ReceivableAging
+from app.db.models.idempotency import IdempotencyKey
+from app.db.models.event import Event
+from app.db.models.invoice_tombstone import InvoiceTombstone
 
-__all__ = ["Customer", "Invoice", "InvoiceStatus", "Payment"]
\ No newline at end of file
+__all__ = ["Customer", "Invoice", "InvoiceStatus", "Payment", "ReceivableAging", "IdempotencyKey", "Event", "InvoiceTombstone"]
\ No newline at end of file
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import (
+    Date,
+    ForeignKey,
+    Integer,
+    Numeric,
+    String,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ReceivableAging(Base):
+    """
+    Open (PENDING) balance per customer, currency and due date.
+    Maintained incrementally by the invoice and payment services in the same
+    transaction as each change; rebuilt from invoices by app.db.rebuild_aging.
+    Aging buckets are derived at read time, so rows never move as days pass.
+    """
+    __tablename__ = "receivable_aging"
+
+    customer_id: Mapped[int] = mapped_column(
+        ForeignKey("customers.id", ondelete="RESTRICT"),
+        primary_key=True,
+    )
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    due_on: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    balance: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    invoice_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from sqlalchemy import String, Identity
+from sqlalchemy import DDL, String, Identity, Index, event, func
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql.functions import FunctionElement
 
 from app.db.base import Base
 
@@ -17,4 +19,42 @@ class Customer(Base):
         back_populates="customer",
         cascade="all, delete-orphan",
         passive_deletes=True,
-    )
\ No newline at end of file
+    )
+
+
+class name_search_key(FunctionElement):
+    """
+    lower(name), compared bytewise: on PostgreSQL it carries COLLATE "C" so a
+    prefix becomes a plain index range (key >= 'ab' AND key < 'ac') and the
+    same index also serves ORDER BY key. SQLite's default collation is already
+    bytewise.
+    """
+    type = String()
+    inherit_cache = True
+
+
+@compiles(name_search_key)
+def _compile_name_search_key(element, compiler, **kw):
+    return f"lower({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(name_search_key, "postgresql")
+def _compile_name_search_key_postgresql(element, compiler, **kw):
+    return f'lower({compiler.process(element.clauses, **kw)}) COLLATE "C"'
+
+
+# Prefix search and the name-ordered listing, walked in (key, id) order
+Index("ix_customers_name_search_key_id", name_search_key(Customer.name), Customer.id)
+# Substring search (LIKE '%term%') on PostgreSQL via pg_trgm
+Index(
+    "ix_customers_name_trgm",
+    func.lower(Customer.name).label("name_lower"),
+    postgresql_using="gin",
+    postgresql_ops={"name_lower": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+
+event.listen(
+    Customer.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    DateTime,
+    Identity,
+    Index,
+    Integer,
+    String,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class Event(Base):
+    """
+    Outbox row describing one invoice or payment state change, written in the
+    same transaction as the change itself and read through GET /events.
+    """
+    __tablename__ = "events"
+
+    __table_args__ = (
+        # Feed order: GET /events walks (txid, seq) from the consumer's cursor
+        Index("ix_events_txid_seq", "txid", "seq"),
+        # Retention: DELETE ... WHERE created_at < cutoff
+        Index("ix_events_created_at", "created_at"),
+    )
+
+    seq: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), Identity(), primary_key=True)
+    # Writing transaction's id on PostgreSQL (0 elsewhere). Sequence values are
+    # handed out before commit, so seq order alone is not commit order
+    txid: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    type: Mapped[str] = mapped_column(String(40), nullable=False)
+    # Not a foreign key: invoice.deleted outlives its invoice
+    invoice_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import (
+    DateTime,
+    Identity,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Response recorded for a client-supplied Idempotency-Key, replayed on retries.
+    The row is claimed (inserted with no response) in the same transaction as
+    the write it protects, and the response is stored before that commit.
+    """
+    __tablename__ = "idempotency_keys"
+
+    __table_args__ = (
+        Index("ux_idempotency_keys_key", "key", unique=True),
+        # Bulk expiry: DELETE ... WHERE created_at < cutoff
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Identity(), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    # sha256 of the method, path and body; a retry must match it exactly
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    response_body: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
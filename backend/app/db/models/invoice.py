@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import enum
 from datetime import datetime
+from typing import Optional
 
 from sqlalchemy import (
+    BigInteger,
     DateTime,
     Enum,
     ForeignKey,
@@ -11,8 +13,13 @@ from sqlalchemy import (
     Numeric,
     String,
     CheckConstraint,
+    Index,
+    text,
 )
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql.functions import FunctionElement
 
 from app.db.base import Base
 
@@ -24,25 +31,127 @@ class InvoiceStatus(str, enum.Enum):
     VOID = "VOID"
 
 
+# Partial-index predicate of ix_invoices_overdue_sweep. The sweep query repeats
+# it verbatim (not as bound parameters) so the planner can match the index
+OVERDUE_SWEEP_WHERE = "status = 'PENDING' AND overdue_at IS NULL"
+
+
+# Invoice <-> Payment join condition, shared by both sides of the relationship
+INVOICE_PAYMENTS_JOIN = (
+    "and_(Invoice.id == foreign(Payment.invoice_id), "
+    "Invoice.issued_at == foreign(Payment.invoice_issued_at))"
+)
+
+
+class next_row_version(FunctionElement):
+    """
+    Change marker stamped on invoices, payments and invoice tombstones by
+    every insert and update, read by GET /invoices?changed_since=. On
+    PostgreSQL it is the writing transaction's id: every row a transaction
+    touches gets the same marker, and markers below pg_snapshot_xmin belong
+    to finished transactions only. SQLite has a single writer, so one more
+    than the highest marker so far orders its transactions just as well.
+    """
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(next_row_version)
+def _compile_next_row_version(element, compiler, **kw):
+    return (
+        "(SELECT coalesce(max(v), 0) + 1 FROM ("
+        "SELECT max(row_version) AS v FROM invoices "
+        "UNION ALL SELECT max(row_version) FROM payments "
+        "UNION ALL SELECT max(row_version) FROM invoice_tombstones))"
+    )
+
+
+@compiles(next_row_version, "postgresql")
+def _compile_next_row_version_postgresql(element, compiler, **kw):
+    return "pg_current_xact_id()::text::bigint"
+
+
+class row_version_server_default(FunctionElement):
+    """
+    Server default of the row_version columns, as the migrations create it:
+    the transaction id on PostgreSQL, so rows written without the models
+    (COPY, plain SQL) are stamped too. Other databases get DEFAULT NULL,
+    which on a NOT NULL column is the same as no default; the models
+    always supply next_row_version there.
+    """
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(row_version_server_default)
+def _compile_row_version_server_default(element, compiler, **kw):
+    return "NULL"
+
+
+@compiles(row_version_server_default, "postgresql")
+def _compile_row_version_server_default_postgresql(element, compiler, **kw):
+    return "pg_current_xact_id()::text::bigint"
+
+
 class Invoice(Base):
     __tablename__ = "invoices"
 
     __table_args__ = (
         CheckConstraint("amount > 0", name="ck_invoices_amount_positive"),
         CheckConstraint("currency <> ''", name="ck_invoices_currency_nonempty"),
+        CheckConstraint(
+            "amount_paid >= 0 AND amount_paid <= amount",
+            name="ck_invoices_amount_paid_range",
+        ),
+        # Keyset pagination: ORDER BY issued_at DESC, id DESC (scanned backwards)
+        Index("ix_invoices_issued_at_id", "issued_at", "id"),
+        Index("ix_invoices_customer_id_issued_at_id", "customer_id", "issued_at", "id"),
+        # Status filters, alone or per customer, in the same order
+        Index("ix_invoices_status_issued_at_id", "status", "issued_at", "id"),
+        Index("ix_invoices_customer_id_status_issued_at_id", "customer_id", "status", "issued_at", "id"),
+        # Receivables report: GROUP BY customer_id, currency as an index-only scan
+        Index(
+            "ix_invoices_receivables",
+            "customer_id",
+            "currency",
+            "status",
+            postgresql_include=["due_at", "amount", "amount_paid", "issued_at"],
+        ),
+        # Overdue sweep: PENDING invoices not yet flagged, in due_at order.
+        # Rows leave the index once flagged (or paid/voided), so it stays small
+        Index(
+            "ix_invoices_overdue_sweep",
+            "due_at",
+            "id",
+            postgresql_where=text(OVERDUE_SWEEP_WHERE),
+            sqlite_where=text(OVERDUE_SWEEP_WHERE),
+        ),
+        # Incremental sync: changed_since walks (row_version, id) from the token
+        Index("ix_invoices_row_version_id", "row_version", "id"),
     )
 
+    # On partitioned PostgreSQL the primary key is (id, issued_at), with id
+    # drawn from a plain sequence; see the monthly partitioning migration
     id: Mapped[int] = mapped_column(Identity(), primary_key=True)
 
+    # Indexed by the composite indexes that lead with customer_id
     customer_id: Mapped[int] = mapped_column(
         ForeignKey("customers.id", ondelete="RESTRICT"),
         nullable=False,
-        index=True,
     )
 
     amount: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
     currency: Mapped[str] = mapped_column(String(3), nullable=False)
 
+    # Running sum of payments.amount, maintained by payment_service in the
+    # same transaction as each payment insert
+    amount_paid: Mapped[float] = mapped_column(
+        Numeric(12, 2),
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+
     issued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     due_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
@@ -50,15 +159,34 @@ class Invoice(Base):
         Enum(InvoiceStatus, name="invoice_status"),
         nullable=False,
         default=InvoiceStatus.DRAFT,
-        index=True,
+    )
+
+    # Set by the overdue sweep (app.worker) when a PENDING invoice is found
+    # past due_at; kept afterwards as the date it went overdue
+    overdue_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Restamped by every write, including Core UPDATEs (see next_row_version)
+    row_version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=next_row_version(),
+        onupdate=next_row_version(),
+        server_default=row_version_server_default(),
     )
 
     # Relationships
     customer: Mapped["Customer"] = relationship(back_populates="invoices")
 
+    # Joined on the partition key too, so loads of an invoice's payments can
+    # skip the payments partitions of other months
     payments: Mapped[list["Payment"]] = relationship(
         back_populates="invoice",
+        primaryjoin=INVOICE_PAYMENTS_JOIN,
         cascade="all, delete-orphan",
         passive_deletes=True,
         order_by="Payment.paid_at",
-    )
\ No newline at end of file
+    )
+
+    @hybrid_property
+    def balance_due(self):
+        return self.amount - self.amount_paid
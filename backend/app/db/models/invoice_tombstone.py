@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Index,
+    Integer,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.db.models.invoice import next_row_version, row_version_server_default
+
+
+class InvoiceTombstone(Base):
+    """
+    Left behind by delete_invoice so GET /invoices?changed_since= can report
+    deleted drafts. Kept indefinitely: only drafts are ever deleted.
+    """
+    __tablename__ = "invoice_tombstones"
+
+    __table_args__ = (
+        Index("ix_invoice_tombstones_row_version_invoice_id", "row_version", "invoice_id"),
+    )
+
+    # Not a foreign key: the invoice row is gone
+    invoice_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    row_version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=next_row_version(),
+        server_default=row_version_server_default(),
+    )
+
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
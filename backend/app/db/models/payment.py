@@ -3,15 +3,18 @@ from __future__ import annotations
 from datetime import datetime
 
 from sqlalchemy import (
+    BigInteger,
     DateTime,
     ForeignKey,
     Identity,
+    Index,
     Numeric,
     CheckConstraint,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.models.invoice import INVOICE_PAYMENTS_JOIN, next_row_version, row_version_server_default
 
 
 class Payment(Base):
@@ -19,18 +22,36 @@ class Payment(Base):
 
     __table_args__ = (
         CheckConstraint("amount > 0", name="ck_payments_amount_positive"),
+        # Incremental extracts of new payments, in (row_version, id) order
+        Index("ix_payments_row_version_id", "row_version", "id"),
     )
 
     id: Mapped[int] = mapped_column(Identity(), primary_key=True)
 
+    # On partitioned PostgreSQL the table's primary key is (id, invoice_issued_at)
+    # and this foreign key is (invoice_id, invoice_issued_at) -> invoices (id, issued_at);
+    # ids stay unique, so the ORM keeps mapping the single columns
     invoice_id: Mapped[int] = mapped_column(
         ForeignKey("invoices.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
     )
 
+    # Copy of the invoice's issued_at: the partition key, so a payment lives
+    # in the same monthly partition as its invoice. Set by every writer; it
+    # cannot come from a trigger because rows are routed before triggers run
+    invoice_issued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
     amount: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
     paid_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
+    row_version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=next_row_version(),
+        onupdate=next_row_version(),
+        server_default=row_version_server_default(),
+    )
+
     # Relationship
-    invoice: Mapped["Invoice"] = relationship(back_populates="payments")
\ No newline at end of file
+    invoice: Mapped["Invoice"] = relationship(back_populates="payments", primaryjoin=INVOICE_PAYMENTS_JOIN)
\ No newline at end of file
@@ -0,0 +1,27 @@
+import argparse
+
+from app.db.session import SessionLocal
+from app.api.services.idempotency_service import purge_expired_keys
+
+
+def main():
+    """Delete Idempotency-Key records older than the TTL"""
+    parser = argparse.ArgumentParser(description="Purge expired idempotency keys")
+    parser.add_argument(
+        "--ttl-hours",
+        type=float,
+        default=None,
+        help="Override IDEMPOTENCY_KEY_TTL_HOURS",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        deleted = purge_expired_keys(db, args.ttl_hours)
+        print(f"✓ Purged {deleted} expired idempotency key(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import time
+
+from app.db.session import SessionLocal
+from app.api.services.aging_service import rebuild_aging
+
+
+def main():
+    """Rebuild the receivable_aging summary from PENDING invoices"""
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        rows = rebuild_aging(db)
+        db.commit()
+        print(f"✓ Rebuilt receivable_aging: {rows} row(s) in {time.perf_counter() - start:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
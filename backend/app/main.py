@@ -3,8 +3,13 @@ load_dotenv()
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from app.api.routes import invoices, customers
+from app.api.routes import invoices, customers, payments, reports, events
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, registry, render_pool_metrics
+from app.db.pool import pool_status
+from app.db.session import engine
 
 app = FastAPI(
     title="Invoice & Payments API",
@@ -21,9 +26,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and SQL usage, exposed at /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Opt-in async stack (asyncpg): its routers are mounted first so they serve
+# the hot invoice/customer routes; everything else falls through to the sync routers
+if settings.db_async:
+    from app.api.routes import async_invoices, async_customers
+
+    app.include_router(async_invoices.router)
+    app.include_router(async_customers.router)
+
 # Include routers
 app.include_router(invoices.router)
 app.include_router(customers.router)
+app.include_router(payments.router)
+app.include_router(reports.router)
+app.include_router(events.router)
 
 
 @app.get("/")
@@ -33,4 +52,27 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+def _pool_statuses() -> dict:
+    status = {"sync": pool_status(engine)}
+    if settings.db_async:
+        from app.db.async_session import async_engine
+        status["async"] = pool_status(async_engine.sync_engine)
+    return status
+
+
+registry.register_collector(lambda: render_pool_metrics(_pool_statuses()))
+
+
+@app.get("/health/pool")
+def pool_health():
+    """Connection pool occupancy, checkout wait time, overflow use and invalidations"""
+    return _pool_statuses()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of request, SQL, pool and business metrics"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,157 @@
+"""
+Background worker: runs the periodic jobs outside the API processes.
+
+    python -m app.worker                      # every job on its interval, until SIGINT/SIGTERM
+    python -m app.worker --once               # each job once, then exit (e.g. from cron)
+    python -m app.worker --metrics-port 9101  # also serve /metrics for this process
+
+Jobs: the overdue sweep (every OVERDUE_SWEEP_INTERVAL_SECONDS), the
+event retention purge (every EVENTS_PURGE_INTERVAL_SECONDS, hourly by
+default) and, once invoices and payments are partitioned, creation of the
+upcoming monthly partitions (every PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+daily by default). Several workers can run side by side: the
+sweep claims rows with SKIP LOCKED, so workers split the work between them
+and never wait on each other's or record_payment's row locks.
+
+The sweep's cache invalidations only reach the API processes with
+CACHE_BACKEND=redis. With CACHE_BACKEND=memory (opt-in), GET /invoices/{id}
+can show an invoice without its overdue_at for up to CACHE_TTL_SECONDS.
+"""
+import argparse
+import signal
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, TextIO
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import JOB_RUNS, registry
+from app.db.session import SessionLocal
+from app.api.services.event_service import purge_old_events
+from app.api.services.overdue_service import sweep_overdue_invoices
+from app.api.services.partition_service import ensure_partitions
+
+
+@dataclass
+class Job:
+    name: str
+    # (session, should_stop) -> one-line summary of the run
+    run: Callable[[Session, Callable[[], bool]], str]
+    interval: float
+
+
+def _overdue_sweep(db: Session, should_stop: Callable[[], bool]) -> str:
+    result = sweep_overdue_invoices(db, should_stop=should_stop)
+    return f"marked {result.marked} invoice(s) overdue in {result.batches} batch(es)"
+
+
+def _events_purge(db: Session, should_stop: Callable[[], bool]) -> str:
+    return f"deleted {purge_old_events(db)} event(s) past retention"
+
+
+def _partition_maintenance(db: Session, should_stop: Callable[[], bool]) -> str:
+    return f"created {ensure_partitions(db)} monthly partition(s)"
+
+
+JOBS = [
+    Job("overdue_sweep", _overdue_sweep, settings.overdue_sweep_interval_seconds),
+    Job("events_purge", _events_purge, settings.events_purge_interval_seconds),
+    Job("partition_maintenance", _partition_maintenance, settings.partition_maintenance_interval_seconds),
+]
+
+
+class Worker:
+    """Runs each job on its own interval; stop() lets the current batch finish"""
+
+    def __init__(self, jobs: list[Job], session_factory=SessionLocal, out: TextIO = sys.stdout):
+        self.jobs = jobs
+        self.session_factory = session_factory
+        self.out = out
+        self._stopping = threading.Event()
+
+    def stop(self, *_) -> None:
+        self._stopping.set()
+
+    def run_job(self, job: Job) -> bool:
+        db = self.session_factory()
+        started = time.perf_counter()
+        try:
+            summary = job.run(db, self._stopping.is_set)
+        except Exception as e:
+            db.rollback()
+            JOB_RUNS.inc(job=job.name, outcome="error")
+            print(f"✗ {job.name} failed: {e}", file=self.out, flush=True)
+            return False
+        finally:
+            db.close()
+        JOB_RUNS.inc(job=job.name, outcome="ok")
+        print(f"✓ {job.name}: {summary} ({time.perf_counter() - started:.2f}s)", file=self.out, flush=True)
+        return True
+
+    def run_once(self) -> bool:
+        return all([self.run_job(job) for job in self.jobs])
+
+    def run_forever(self) -> None:
+        next_run = {job.name: 0.0 for job in self.jobs}
+        while not self._stopping.is_set():
+            for job in self.jobs:
+                if self._stopping.is_set():
+                    break
+                if time.monotonic() >= next_run[job.name]:
+                    self.run_job(job)
+                    next_run[job.name] = time.monotonic() + job.interval
+            self._stopping.wait(max(0.0, min(next_run.values()) - time.monotonic()))
+
+
+def serve_metrics(port: int) -> ThreadingHTTPServer:
+    """Expose this process's registry at /metrics from a daemon thread"""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv: Optional[list[str]] = None):
+    """Run the background jobs"""
+    parser = argparse.ArgumentParser(description="Run background jobs (overdue sweep, event retention, partitions)")
+    parser.add_argument("--once", action="store_true", help="run each job once and exit")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port")
+    args = parser.parse_args(argv)
+
+    worker = Worker(JOBS)
+    if settings.cache_backend == "memory":
+        print(
+            f"Note: CACHE_BACKEND=memory, so API processes may serve cached invoices "
+            f"without new overdue flags for up to {settings.cache_ttl_seconds:g}s",
+            flush=True,
+        )
+    if args.once:
+        sys.exit(0 if worker.run_once() else 1)
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+    signal.signal(signal.SIGINT, worker.stop)
+    signal.signal(signal.SIGTERM, worker.stop)
+    worker.run_forever()
+
+
+if __name__ == "__main__":
+    main()
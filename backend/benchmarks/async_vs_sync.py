@@ -0,0 +1,132 @@
+"""
+Load benchmark: sync (psycopg2 + threadpool) vs async (asyncpg) stacks.
+
+Starts the API twice with uvicorn - once with DB_ASYNC unset and once with
+DB_ASYNC=1 - against the database in DATABASE_URL, drives each with the same
+closed-loop workload from N concurrent clients and prints p50/p99 latency
+and requests/second as JSON.
+
+    python -m benchmarks.async_vs_sync --concurrency 500 --duration 30
+
+The database should already be migrated and seeded (the detail scenario uses
+invoice ids 1..--max-invoice-id). Run the load generator on a different
+machine/core set than the server for numbers that are not client-bound.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.stats import summarize
+
+
+async def run_load(base_url: str, paths, concurrency: int, duration: float, seed: int) -> dict:
+    """Closed loop: each client issues its next request as soon as the previous one completes"""
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        async def worker(worker_id: int):
+            nonlocal errors
+            rng = random.Random(seed + worker_id)
+            while time.perf_counter() < deadline:
+                path = paths(rng)
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 500:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize(latencies, errors, elapsed)
+
+
+def start_server(port: int, async_mode: bool, workers: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.pop("DB_ASYNC", None)
+    if async_mode:
+        env["DB_ASYNC"] = "1"
+    # Compare the stacks, not the response cache
+    env["CACHE_BACKEND"] = "none"
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+        ],
+        env=env,
+    )
+
+
+def wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sync and async API stacks under load")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers per server")
+    parser.add_argument("--max-invoice-id", type=int, default=7)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results JSON here as well as stdout")
+    args = parser.parse_args()
+
+    scenarios = {
+        "invoice_detail": lambda rng: f"/invoices/{rng.randint(1, args.max_invoice_id)}",
+        "invoice_list": lambda rng: "/invoices?limit=50",
+    }
+
+    results = {"concurrency": args.concurrency, "duration_s": args.duration, "stacks": {}}
+    for offset, (stack, async_mode) in enumerate((("sync", False), ("async", True))):
+        port = args.port + offset
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(port, async_mode, args.workers)
+        try:
+            wait_ready(base_url)
+            stack_results = {}
+            for name, paths in scenarios.items():
+                asyncio.run(run_load(base_url, paths, args.concurrency, args.warmup, args.seed))
+                stack_results[name] = asyncio.run(
+                    run_load(base_url, paths, args.concurrency, args.duration, args.seed)
+                )
+                print(f"{stack:5} {name:15} {stack_results[name]}", file=sys.stderr)
+            results["stacks"][stack] = stack_results
+        finally:
+            server.terminate()
+            server.wait()
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
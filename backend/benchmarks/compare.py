@@ -0,0 +1,86 @@
+"""
+Compare two benchmarks.run result files and fail on regressions.
+
+    python -m benchmarks.compare base.json head.json --threshold 10
+
+A scenario regresses when its throughput drops, or its p99 latency rises,
+by more than --threshold percent. Exits 1 if any scenario regressed, so it
+can gate CI against a stored baseline.
+"""
+import argparse
+import json
+import sys
+from typing import Optional
+
+
+# (metric, True when higher is better)
+METRICS = (("rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False))
+GATED_METRICS = {"rps", "p99_ms"}
+
+
+def _change(base: float, head: float) -> Optional[float]:
+    if not base:
+        return None
+    return (head - base) / base * 100
+
+
+def compare_results(base: dict, head: dict, threshold: float) -> tuple[list[dict], list[str]]:
+    """Per-scenario metric changes (percent) and the names of regressed scenarios"""
+    rows = []
+    regressions = []
+    for name, base_result in base["scenarios"].items():
+        head_result = head["scenarios"].get(name)
+        if head_result is None:
+            continue
+        row = {"scenario": name}
+        regressed = False
+        for metric, higher_is_better in METRICS:
+            change = _change(base_result.get(metric, 0), head_result.get(metric, 0))
+            row[metric] = change
+            if change is None or metric not in GATED_METRICS:
+                continue
+            worse = -change if higher_is_better else change
+            regressed = regressed or worse > threshold
+        if head_result.get("errors", 0) and not base_result.get("errors", 0):
+            regressed = True
+        row["regressed"] = regressed
+        rows.append(row)
+        if regressed:
+            regressions.append(name)
+    return rows, regressions
+
+
+def _format(change: Optional[float]) -> str:
+    return "n/a" if change is None else f"{change:+.1f}%"
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    # Payment scenarios add rows, so only the invoice count identifies the dataset
+    if base["environment"]["dataset"]["invoices"] != head["environment"]["dataset"]["invoices"]:
+        print("! datasets differ; numbers may not be comparable", file=sys.stderr)
+
+    rows, regressions = compare_results(base, head, args.threshold)
+    print(f"{'scenario':20} " + " ".join(f"{metric:>9}" for metric, _ in METRICS))
+    for row in rows:
+        mark = "✗" if row["regressed"] else "✓"
+        print(f"{mark} {row['scenario']:18} " + " ".join(f"{_format(row[m]):>9}" for m, _ in METRICS))
+
+    if regressions:
+        print(f"✗ Regressed beyond {args.threshold}%: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"✓ No regressions beyond {args.threshold}%")
+
+
+if __name__ == "__main__":
+    main()
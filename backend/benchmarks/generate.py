@@ -0,0 +1,230 @@
+"""
+Deterministic synthetic dataset scaled from the shape of seed-data.json.
+
+Status and currency mix, amount range, due-date offsets, how much of a
+PENDING invoice is already paid and how long payments take to arrive are all
+taken from the seed file; the generator reproduces them at any size. The
+same --seed always yields the same rows, so results are comparable across
+commits.
+
+    python -m benchmarks.generate --invoices 1000000 --payments 5000000 --load
+    python -m benchmarks.generate --invoices 100000 --out-dir /tmp/bench-data
+
+--load streams straight into DATABASE_URL through app.db.bulk_import
+(an empty, migrated database is expected); --out-dir writes NDJSON files
+that bulk_import can load later.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+SEED_FILE = Path(__file__).resolve().parents[2] / "seed-data.json"
+DEFAULT_SEED = 42
+# Invoices are issued uniformly over this many days before the newest seed invoice
+DEFAULT_SPAN_DAYS = 3 * 365
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _isoformat(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass
+class DatasetShape:
+    """Distributions measured from a seed file"""
+    statuses: list[str]
+    currencies: list[str]
+    amount_min_cents: int
+    amount_max_cents: int
+    due_offsets_days: list[int]
+    pending_paid_ratios: list[float]
+    payment_delays_days: list[int]
+    invoices_per_customer: float
+    payments_per_invoice: float
+    latest_issued_at: datetime
+
+    @classmethod
+    def from_seed(cls, path: Path = SEED_FILE) -> "DatasetShape":
+        with open(path, encoding="utf-8") as f:
+            seed = json.load(f)
+        invoices = {i["id"]: i for i in seed["invoices"]}
+        paid_by_invoice: dict[int, Decimal] = {}
+        delays = []
+        for p in seed["payments"]:
+            invoice = invoices[p["invoice_id"]]
+            paid_by_invoice[p["invoice_id"]] = paid_by_invoice.get(p["invoice_id"], Decimal(0)) + Decimal(str(p["amount"]))
+            delays.append((_parse(p["paid_at"]) - _parse(invoice["issued_at"])).days)
+        amounts = [int(Decimal(str(i["amount"])) * 100) for i in invoices.values()]
+        return cls(
+            statuses=[i["status"] for i in invoices.values()],
+            currencies=[i["currency"] for i in invoices.values()],
+            amount_min_cents=min(amounts),
+            amount_max_cents=max(amounts),
+            due_offsets_days=[(_parse(i["due_at"]) - _parse(i["issued_at"])).days for i in invoices.values()],
+            pending_paid_ratios=[
+                float(paid_by_invoice.get(i["id"], 0) / Decimal(str(i["amount"])))
+                for i in invoices.values()
+                if i["status"] == "PENDING"
+            ] or [0.0],
+            payment_delays_days=delays or [14],
+            invoices_per_customer=len(invoices) / max(1, len(seed["customers"])),
+            payments_per_invoice=len(seed["payments"]) / max(1, len(invoices)),
+            latest_issued_at=max(_parse(i["issued_at"]) for i in invoices.values()),
+        )
+
+
+class DatasetGenerator:
+    """
+    Streams customers, invoices and payments as bulk_import records.
+    Every invoice is derived from its own RNG (seed, id), so the invoice and
+    payment passes can run independently without holding the dataset in memory.
+    """
+
+    def __init__(
+        self,
+        invoices: int,
+        payments: Optional[int] = None,
+        customers: Optional[int] = None,
+        seed: int = DEFAULT_SEED,
+        span_days: int = DEFAULT_SPAN_DAYS,
+        shape: Optional[DatasetShape] = None
+    ):
+        self.shape = shape or DatasetShape.from_seed()
+        self.invoices = invoices
+        self.customers = customers or max(1, round(invoices / self.shape.invoices_per_customer))
+        self.payments = round(invoices * self.shape.payments_per_invoice) if payments is None else payments
+        self.seed = seed
+        self.span_days = span_days
+        self.start = self.shape.latest_issued_at - timedelta(days=span_days)
+        # Payments go to PAID and PENDING invoices only, spread evenly
+        payable = sum(1 for s in self.shape.statuses if s in ("PAID", "PENDING")) / len(self.shape.statuses)
+        self.payments_per_payable = self.payments / max(1, invoices * payable)
+
+    def _rng(self, invoice_id: int) -> random.Random:
+        return random.Random(self.seed * 1_000_003 + invoice_id)
+
+    def _invoice(self, invoice_id: int) -> tuple[dict, random.Random]:
+        rng = self._rng(invoice_id)
+        shape = self.shape
+        issued_at = self.start + timedelta(seconds=rng.randrange(self.span_days * 86_400))
+        cents = rng.randint(shape.amount_min_cents, shape.amount_max_cents)
+        record = {
+            "id": invoice_id,
+            "customer_id": rng.randint(1, self.customers),
+            "amount": f"{cents / 100:.2f}",
+            "currency": rng.choice(shape.currencies),
+            "issued_at": _isoformat(issued_at),
+            "due_at": _isoformat(issued_at + timedelta(days=rng.choice(shape.due_offsets_days))),
+            "status": rng.choice(shape.statuses),
+        }
+        return record, rng
+
+    def iter_customers(self) -> Iterator[dict]:
+        for customer_id in range(1, self.customers + 1):
+            yield {"id": customer_id, "name": f"Customer {customer_id:07d}"}
+
+    def iter_invoices(self) -> Iterator[dict]:
+        for invoice_id in range(1, self.invoices + 1):
+            yield self._invoice(invoice_id)[0]
+
+    def iter_payments(self) -> Iterator[dict]:
+        payment_id = 0
+        base = int(self.payments_per_payable)
+        extra = self.payments_per_payable - base
+        for invoice_id in range(1, self.invoices + 1):
+            invoice, rng = self._invoice(invoice_id)
+            if invoice["status"] not in ("PAID", "PENDING"):
+                continue
+            amount_cents = int(Decimal(invoice["amount"]) * 100)
+            if invoice["status"] == "PAID":
+                total = amount_cents
+            else:
+                ratio = rng.choice(self.shape.pending_paid_ratios)
+                total = min(int(amount_cents * ratio), amount_cents - 1)
+            count = min(base + (1 if rng.random() < extra else 0), total)
+            if count <= 0:
+                continue
+            cuts = sorted(rng.sample(range(1, total), count - 1)) if count > 1 else []
+            issued_at = _parse(invoice["issued_at"])
+            for part in (b - a for a, b in zip([0] + cuts, cuts + [total])):
+                payment_id += 1
+                delay = timedelta(days=rng.choice(self.shape.payment_delays_days), seconds=rng.randrange(86_400))
+                yield {
+                    "id": payment_id,
+                    "invoice_id": invoice_id,
+                    "amount": f"{part / 100:.2f}",
+                    "paid_at": _isoformat(issued_at + delay),
+                }
+
+
+def write_ndjson(records: Iterator[dict], path: Path) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic benchmark dataset")
+    parser.add_argument("--invoices", type=int, required=True)
+    parser.add_argument("--payments", type=int, default=None, help="total payments (default: seed ratio)")
+    parser.add_argument("--customers", type=int, default=None, help="default: seed ratio")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--span-days", type=int, default=DEFAULT_SPAN_DAYS)
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--load", action="store_true", help="load into DATABASE_URL")
+    target.add_argument("--out-dir", help="write customers/invoices/payments .ndjson here")
+    args = parser.parse_args()
+
+    generator = DatasetGenerator(
+        invoices=args.invoices,
+        payments=args.payments,
+        customers=args.customers,
+        seed=args.seed,
+        span_days=args.span_days,
+    )
+    sources = {
+        "customers": generator.iter_customers,
+        "invoices": generator.iter_invoices,
+        "payments": generator.iter_payments,
+    }
+    print(
+        f"Dataset: {generator.customers:,} customers, {generator.invoices:,} invoices, "
+        f"~{generator.payments:,} payments (seed {args.seed})",
+        file=sys.stderr,
+    )
+
+    if args.out_dir:
+        out_dir = Path(args.out_dir)
+        os.makedirs(out_dir, exist_ok=True)
+        for name, source in sources.items():
+            count = write_ndjson(source(), out_dir / f"{name}.ndjson")
+            print(f"  ✓ {name}: {count:,} rows -> {out_dir / f'{name}.ndjson'}", file=sys.stderr)
+        return
+
+    from app.db.bulk_import import import_records, finish_import, resolve_method
+    from app.db.session import engine
+
+    with engine.connect() as conn:
+        method = resolve_method(conn, "auto")
+        for name, source in sources.items():
+            import_records(conn, name, source(), method, args.batch_size)
+        finish_import(conn, set(sources))
+
+
+if __name__ == "__main__":
+    main()
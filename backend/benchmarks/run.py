@@ -0,0 +1,170 @@
+"""
+Run service-level benchmark scenarios and write comparable JSON results.
+
+    python -m benchmarks.run --duration 30 --output results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.run --scenarios detail,list --concurrency 8
+    python -m benchmarks.compare results/base.json results/head.json
+
+Targets DATABASE_URL, which should hold a dataset from benchmarks.generate.
+Payment scenarios add 0.01 payments to existing PENDING invoices; reload the
+dataset between runs when comparing commits strictly. Each scenario runs a
+warmup, then a closed loop of --concurrency worker threads (default: the
+scenario's own) for --duration seconds.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.models.customer import Customer
+from app.db.models.invoice import Invoice
+from app.db.models.payment import Payment
+from app.db.pool import instrument_pool, pool_options
+from benchmarks.scenarios import SCENARIOS, Scenario
+from benchmarks.stats import summarize
+
+
+def make_engine(url: str, concurrency: int) -> Engine:
+    """The app's pool settings, sized so workers never queue for a connection"""
+    options = pool_options(settings, url)
+    if "pool_size" in options:
+        options["pool_size"] = max(options["pool_size"], concurrency)
+    if make_url(url).get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    engine = create_engine(url, **options)
+    instrument_pool(engine)
+    return engine
+
+
+def run_scenario(
+    session_factory: sessionmaker,
+    scenario: Scenario,
+    concurrency: int,
+    duration: float,
+    seed: int
+) -> dict:
+    """Closed loop: each worker starts its next operation as soon as the previous one returns"""
+    with session_factory() as db:
+        state = scenario.setup(db)
+
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_id: int):
+        nonlocal errors
+        rng = random.Random(seed + worker_id)
+        local: list[float] = []
+        local_errors = 0
+        with session_factory() as db:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    scenario.op(db, rng, state)
+                except Exception:
+                    db.rollback()
+                    local_errors += 1
+                    continue
+                local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {"concurrency": concurrency, **summarize(latencies, errors, elapsed)}
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def describe_environment(engine: Engine) -> dict:
+    """Commit, host and dataset size, recorded alongside every result"""
+    with Session(engine) as db:
+        dataset = {
+            name: db.scalar(select(func.count()).select_from(model))
+            for name, model in (("customers", Customer), ("invoices", Invoice), ("payments", Payment))
+        }
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "host": platform.node(),
+        "database": make_url(engine.url).render_as_string(hide_password=True),
+        "dataset": dataset,
+    }
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Run service-level benchmark scenarios")
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help=f"comma-separated subset of: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--concurrency", type=int, default=None, help="override every scenario's workers")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--output", help="write results JSON here as well as stdout")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    concurrency = {name: args.concurrency or SCENARIOS[name].concurrency for name in names}
+    engine = make_engine(args.database_url, max(concurrency.values()))
+    session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    try:
+        results = {
+            "environment": describe_environment(engine),
+            "config": {"duration_s": args.duration, "warmup_s": args.warmup, "seed": args.seed},
+            "scenarios": {},
+        }
+        for name in names:
+            scenario = SCENARIOS[name]
+            if args.warmup:
+                run_scenario(session_factory, scenario, concurrency[name], args.warmup, args.seed)
+            result = run_scenario(session_factory, scenario, concurrency[name], args.duration, args.seed)
+            results["scenarios"][name] = {"description": scenario.description, **result}
+            print(f"{name:20} {result}", file=sys.stderr)
+    finally:
+        engine.dispose()
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Service-level workloads for benchmarks.run.
+
+Each scenario calls the same service functions the routes use, against the
+database in DATABASE_URL, so the numbers isolate query and locking cost from
+HTTP overhead (benchmarks.async_vs_sync covers the HTTP stacks). setup()
+runs once and picks target ids; op() is one timed operation and gets its
+own Session and RNG per worker thread.
+"""
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Callable
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.models.invoice import Invoice, InvoiceStatus
+from app.api.schemas.payment import PaymentCreate
+from app.api.services.invoice_service import get_invoice_detail, list_invoice_summaries, parse_invoice_fields
+from app.api.services.payment_service import record_payment
+
+
+# Payments small enough that target invoices stay PENDING for the whole run
+PAYMENT_AMOUNT = Decimal("0.01")
+PAYMENT_TARGETS = 10_000
+HOT_INVOICES = 8
+LIST_PAGE_SIZE = 50
+LIST_PAGES_PER_WALK = 5
+LIST_FIELDS = parse_invoice_fields(None)
+
+
+@dataclass
+class Scenario:
+    description: str
+    setup: Callable[[Session], Any]
+    op: Callable[[Session, random.Random, Any], None]
+    concurrency: int = 1
+
+
+def _id_range(db: Session) -> tuple[int, int]:
+    low, high = db.execute(select(func.min(Invoice.id), func.max(Invoice.id))).one()
+    if high is None:
+        raise RuntimeError("No invoices found; load a dataset with benchmarks.generate first")
+    return low, high
+
+
+def _pending_ids(db: Session, limit: int) -> list[int]:
+    ids = list(db.scalars(
+        select(Invoice.id)
+        .where(Invoice.status == InvoiceStatus.PENDING)
+        .order_by(Invoice.issued_at.desc(), Invoice.id.desc())
+        .limit(limit)
+    ))
+    if not ids:
+        raise RuntimeError("No PENDING invoices to record payments against")
+    return ids
+
+
+def _list_setup(db: Session) -> dict:
+    low, high = db.execute(select(func.min(Invoice.issued_at), func.max(Invoice.issued_at))).one()
+    customers = db.scalar(select(func.max(Invoice.customer_id)))
+    return {"first_issued": low, "last_issued": high, "customers": customers}
+
+
+def _list_op(db: Session, rng: random.Random, state: dict) -> None:
+    """A random filter combination, walked a few pages deep by cursor"""
+    filters = {}
+    if rng.random() < 0.5:
+        filters["status"] = rng.choice([InvoiceStatus.PENDING, InvoiceStatus.PAID])
+    if rng.random() < 0.3:
+        filters["customer_id"] = rng.randint(1, state["customers"])
+    if rng.random() < 0.3:
+        span = (state["last_issued"] - state["first_issued"]).total_seconds()
+        start = state["first_issued"] + timedelta(seconds=rng.uniform(0, span))
+        filters["from_date"] = start
+        filters["to_date"] = start + timedelta(days=90)
+
+    cursor = None
+    for _ in range(LIST_PAGES_PER_WALK):
+        page = list_invoice_summaries(db, LIST_FIELDS, limit=LIST_PAGE_SIZE, cursor=cursor, **filters)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    db.rollback()
+
+
+def _detail_op(db: Session, rng: random.Random, id_range: tuple[int, int]) -> None:
+    get_invoice_detail(db, rng.randint(*id_range))
+    db.rollback()
+
+
+def _payment_op(db: Session, rng: random.Random, invoice_ids: list[int]) -> None:
+    record_payment(db, rng.choice(invoice_ids), PaymentCreate(amount=PAYMENT_AMOUNT))
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "list": Scenario(
+        "list_invoice_summaries: random filters, cursor walk of up to 5 pages",
+        _list_setup,
+        _list_op,
+    ),
+    "detail": Scenario(
+        "get_invoice_detail on uniformly random ids (no response cache)",
+        _id_range,
+        _detail_op,
+    ),
+    "record_payment": Scenario(
+        f"record_payment spread over the {PAYMENT_TARGETS} newest PENDING invoices",
+        lambda db: _pending_ids(db, PAYMENT_TARGETS),
+        _payment_op,
+    ),
+    "concurrent_payments": Scenario(
+        f"record_payment from many workers on the {HOT_INVOICES} newest PENDING invoices (row-lock contention)",
+        lambda db: _pending_ids(db, HOT_INVOICES),
+        _payment_op,
+        concurrency=16,
+    ),
+}
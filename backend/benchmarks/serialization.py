@@ -0,0 +1,175 @@
+"""
+CPU cost per row of the invoice read paths, ORM + model validation vs Core rows + TypeAdapter.
+
+    python -m benchmarks.serialization --invoices 20000 --page-size 200
+    python -m benchmarks.serialization --database-url postgresql://... --output serialization.json
+
+Without --database-url an in-memory SQLite database is filled from
+benchmarks.generate, so the numbers mostly reflect Python-side work: building
+entities and validating models versus zipping row tuples into dicts and
+serializing them in one pass. Each path walks the same pages and produces the
+same JSON; process CPU time is divided by the number of invoice rows.
+"""
+import argparse
+import io
+import json
+import sys
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.db.models.invoice import Invoice
+from app.db.bulk_import import import_records, finish_import
+from app.api.schemas.invoice import InvoicePage, InvoiceResponse, InvoiceSummary, invoice_json, invoice_page_json
+from app.api.services.invoice_service import (
+    get_invoice_detail,
+    list_invoice_summaries,
+    paginate_invoices,
+    parse_invoice_fields,
+    split_invoice_page,
+)
+from benchmarks.generate import DatasetGenerator
+from benchmarks.run import describe_environment
+
+
+ALL_FIELDS = parse_invoice_fields(None)
+
+
+def _orm_page(db: Session, limit: int, cursor: Optional[str]) -> tuple[bytes, Optional[str]]:
+    """The pre-fast-path list: entities with selectin payments, validated into models"""
+    query = paginate_invoices(select(Invoice), limit=limit + 1, cursor=cursor)
+    invoices = list(db.scalars(query.options(selectinload(Invoice.payments))))
+    page, next_cursor = split_invoice_page(invoices, limit)
+    payload = InvoicePage(
+        items=[InvoiceSummary.model_validate(invoice, from_attributes=True) for invoice in page],
+        next_cursor=next_cursor,
+    ).model_dump_json().encode()
+    db.expunge_all()
+    return payload, next_cursor
+
+
+def _core_page(include_payments: bool):
+    def page(db: Session, limit: int, cursor: Optional[str]) -> tuple[bytes, Optional[str]]:
+        result = list_invoice_summaries(
+            db, ALL_FIELDS, include_payments=include_payments, limit=limit, cursor=cursor
+        )
+        return invoice_page_json.dump_json(result), result["next_cursor"]
+    return page
+
+
+def _orm_detail(db: Session, invoice_id: int) -> bytes:
+    """The pre-fast-path detail: the entity with selectin payments, validated into InvoiceResponse"""
+    invoice = db.scalar(select(Invoice).where(Invoice.id == invoice_id).options(selectinload(Invoice.payments)))
+    payload = InvoiceResponse.model_validate(invoice).model_dump_json().encode()
+    db.expunge_all()
+    return payload
+
+
+def _core_detail(db: Session, invoice_id: int) -> bytes:
+    return invoice_json.dump_json(get_invoice_detail(db, invoice_id))
+
+
+def measure_pages(db: Session, fetch_page: Callable, page_size: int, max_rows: int) -> dict:
+    """Walk list pages from the newest invoice; CPU and wall time per row"""
+    rows = 0
+    payload_bytes = 0
+    cursor = None
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    while rows < max_rows:
+        payload, cursor = fetch_page(db, page_size, cursor)
+        rows += min(page_size, max_rows - rows)
+        payload_bytes += len(payload)
+        if cursor is None:
+            break
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    return _per_row(rows, cpu, wall, payload_bytes)
+
+
+def measure_details(db: Session, fetch: Callable, invoice_ids: list[int]) -> dict:
+    payload_bytes = 0
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for invoice_id in invoice_ids:
+        payload_bytes += len(fetch(db, invoice_id))
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    return _per_row(len(invoice_ids), cpu, wall, payload_bytes)
+
+
+def _per_row(rows: int, cpu: float, wall: float, payload_bytes: int) -> dict:
+    return {
+        "rows": rows,
+        "cpu_us_per_row": round(cpu / rows * 1e6, 2) if rows else 0.0,
+        "wall_us_per_row": round(wall / rows * 1e6, 2) if rows else 0.0,
+        "bytes_per_row": round(payload_bytes / rows, 1) if rows else 0.0,
+    }
+
+
+def build_sqlite_dataset(invoices: int, seed: int) -> Engine:
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    generator = DatasetGenerator(invoices=invoices, payments=invoices * 2, seed=seed)
+    quiet = io.StringIO()
+    with engine.connect() as conn:
+        import_records(conn, "customers", generator.iter_customers(), out=quiet)
+        import_records(conn, "invoices", generator.iter_invoices(), out=quiet)
+        import_records(conn, "payments", generator.iter_payments(), out=quiet)
+        finish_import(conn, {"customers", "invoices", "payments"}, out=quiet)
+    return engine
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare ORM and Core read-path CPU per row")
+    parser.add_argument("--database-url", help="use an existing dataset instead of in-memory SQLite")
+    parser.add_argument("--invoices", type=int, default=20_000, help="in-memory dataset size")
+    parser.add_argument("--rows", type=int, default=10_000, help="list rows to walk per path")
+    parser.add_argument("--details", type=int, default=2_000, help="detail reads per path")
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs per path")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results JSON here as well as stdout")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url) if args.database_url else build_sqlite_dataset(args.invoices, args.seed)
+    list_paths = {
+        "orm_with_payments": _orm_page,
+        "core_with_payments": _core_page(include_payments=True),
+        "core_summary": _core_page(include_payments=False),
+    }
+    detail_paths = {"orm": _orm_detail, "core": _core_detail}
+
+    results = {"environment": describe_environment(engine), "list": {}, "detail": {}}
+    with Session(engine) as db:
+        invoice_ids = list(db.scalars(select(Invoice.id).order_by(Invoice.id).limit(args.details)))
+        for name, fetch_page in list_paths.items():
+            runs = [measure_pages(db, fetch_page, args.page_size, args.rows) for _ in range(args.repeat)]
+            results["list"][name] = min(runs, key=lambda r: r["cpu_us_per_row"])
+            print(f"list   {name:20} {results['list'][name]}", file=sys.stderr)
+        for name, fetch in detail_paths.items():
+            runs = [measure_details(db, fetch, invoice_ids) for _ in range(args.repeat)]
+            results["detail"][name] = min(runs, key=lambda r: r["cpu_us_per_row"])
+            print(f"detail {name:20} {results['detail'][name]}", file=sys.stderr)
+    engine.dispose()
+
+    baseline = results["list"]["orm_with_payments"]["cpu_us_per_row"]
+    results["list_cpu_reduction"] = {
+        name: round(1 - r["cpu_us_per_row"] / baseline, 3) if baseline else 0.0
+        for name, r in results["list"].items() if name != "orm_with_payments"
+    }
+    detail_baseline = results["detail"]["orm"]["cpu_us_per_row"]
+    results["detail_cpu_reduction"] = (
+        round(1 - results["detail"]["core"]["cpu_us_per_row"] / detail_baseline, 3) if detail_baseline else 0.0
+    )
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
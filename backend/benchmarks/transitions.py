@@ -0,0 +1,245 @@
+"""
+Round trips and latency of the single-invoice write endpoints, ORM load-modify-refresh vs compare-and-set.
+
+    python -m benchmarks.transitions --cycles 2000
+    python -m benchmarks.transitions --rtt-ms 0.5
+    python -m benchmarks.transitions --database-url postgresql://... --output transitions.json
+
+Each cycle creates a draft, updates it, posts it and voids it, then creates
+and deletes a second draft, once through each path: "orm" is the service
+code before the compare-and-set rewrite (SELECT + selectin payments, flush,
+COMMIT, refresh, lazy payments for the response model), "cas" is
+invoice_service as it is now. Every call runs in its own session, as a
+request would, and is timed up to a validated InvoiceResponse. Statements
+and commits are counted per call from engine events.
+
+Without --database-url an in-memory SQLite database is filled from
+benchmarks.generate, so each round trip costs almost nothing; --rtt-ms adds
+a simulated network delay to every statement and commit to show what the
+saved round trips are worth against a remote server. Against a real
+database the cycles write (and void or delete) invoices for the first
+customer.
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Optional
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, selectinload
+
+from app.db.models.customer import Customer
+from app.db.models.invoice import Invoice, InvoiceStatus
+from app.db.models.invoice_tombstone import InvoiceTombstone
+from app.api.schemas.invoice import InvoiceCreate, InvoiceDraftUpdate, InvoiceResponse
+from app.api.services import invoice_service
+from app.api.services.aging_service import add_aging_delta, apply_aging_deltas
+from app.api.services.event_service import (
+    INVOICE_CREATED,
+    INVOICE_DELETED,
+    INVOICE_POSTED,
+    INVOICE_UPDATED,
+    INVOICE_VOIDED,
+    add_events,
+    invoice_event,
+    invoice_state,
+)
+from app.api.services.invoice_service import InvoiceError, check_can_post, check_can_void
+from benchmarks.run import describe_environment
+from benchmarks.serialization import build_sqlite_dataset
+from benchmarks.stats import summarize
+
+
+OPERATIONS = ("create", "update", "post", "void", "delete")
+
+
+class RoundTrips:
+    """Counts statements and commits on an engine, optionally sleeping rtt seconds for each"""
+
+    def __init__(self, engine: Engine, rtt: float = 0.0):
+        self.count = 0
+        self.rtt = rtt
+        event.listen(engine, "before_cursor_execute", self._hit)
+        event.listen(engine, "commit", self._hit)
+
+    def _hit(self, *args) -> None:
+        self.count += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+
+def _orm_load(db: Session, invoice_id: int) -> Invoice:
+    invoice = db.scalar(
+        select(Invoice)
+        .where(Invoice.id == invoice_id)
+        .options(selectinload(Invoice.payments))
+    )
+    if not invoice:
+        raise InvoiceError(f"Invoice {invoice_id} not found")
+    return invoice
+
+
+def _orm_open_balance(db: Session, invoice: Invoice, sign: int) -> None:
+    deltas = {}
+    balance = Decimal(str(invoice.amount)) - Decimal(str(invoice.amount_paid or 0))
+    add_aging_delta(deltas, invoice, sign * balance, sign)
+    apply_aging_deltas(db, deltas)
+
+
+def _orm_create(db: Session, data: InvoiceCreate) -> InvoiceResponse:
+    invoice = Invoice(**data.model_dump())
+    db.add(invoice)
+    db.flush()
+    add_events(db, [invoice_event(INVOICE_CREATED, invoice_state(invoice))])
+    db.commit()
+    db.refresh(invoice)
+    return InvoiceResponse.model_validate(invoice)
+
+
+def _orm_update(db: Session, invoice_id: int, data: InvoiceDraftUpdate) -> InvoiceResponse:
+    invoice = _orm_load(db, invoice_id)
+    if invoice.status != InvoiceStatus.DRAFT:
+        raise InvoiceError("Only draft invoices can be updated")
+    for key, value in data.model_dump(exclude_unset=True).items():
+        setattr(invoice, key, value)
+    add_events(db, [invoice_event(INVOICE_UPDATED, invoice_state(invoice))])
+    db.commit()
+    db.refresh(invoice)
+    return InvoiceResponse.model_validate(invoice)
+
+
+def _orm_transition(db: Session, invoice_id: int, check, to_status: InvoiceStatus, sign: int, event_type: str):
+    invoice = _orm_load(db, invoice_id)
+    check(invoice.status)
+    invoice.status = to_status
+    _orm_open_balance(db, invoice, sign)
+    add_events(db, [invoice_event(event_type, invoice_state(invoice))])
+    db.commit()
+    db.refresh(invoice)
+    return InvoiceResponse.model_validate(invoice)
+
+
+def _orm_delete(db: Session, invoice_id: int) -> None:
+    invoice = _orm_load(db, invoice_id)
+    if invoice.status != InvoiceStatus.DRAFT:
+        raise InvoiceError("Only draft invoices can be deleted. Use void to cancel a pending invoice.")
+    add_events(db, [invoice_event(INVOICE_DELETED, invoice_state(invoice))])
+    db.add(InvoiceTombstone(invoice_id=invoice.id))
+    db.delete(invoice)
+    db.commit()
+
+
+PATHS: dict[str, dict[str, Callable]] = {
+    "orm": {
+        "create": _orm_create,
+        "update": _orm_update,
+        "post": lambda db, invoice_id: _orm_transition(
+            db, invoice_id, check_can_post, InvoiceStatus.PENDING, 1, INVOICE_POSTED
+        ),
+        "void": lambda db, invoice_id: _orm_transition(
+            db, invoice_id, check_can_void, InvoiceStatus.VOID, -1, INVOICE_VOIDED
+        ),
+        "delete": _orm_delete,
+    },
+    "cas": {
+        "create": invoice_service.create_invoice,
+        "update": invoice_service.update_invoice,
+        "post": invoice_service.post_invoice,
+        "void": invoice_service.void_invoice,
+        "delete": invoice_service.delete_invoice,
+    },
+}
+
+
+def run_cycles(engine: Engine, counter: RoundTrips, path: dict[str, Callable], customer_id: int, cycles: int) -> dict:
+    """Time and count round trips of each operation over `cycles` invoice lifecycles"""
+    latencies = {name: [] for name in OPERATIONS}
+    round_trips = {name: 0 for name in OPERATIONS}
+
+    def call(name: str, *args):
+        with Session(engine) as db:
+            before = counter.count
+            start = time.perf_counter()
+            result = path[name](db, *args)
+            latencies[name].append(time.perf_counter() - start)
+            round_trips[name] += counter.count - before
+        return result
+
+    issued_at = datetime.now(timezone.utc)
+    draft = InvoiceCreate(
+        customer_id=customer_id,
+        amount=Decimal("100.00"),
+        currency="USD",
+        issued_at=issued_at,
+        due_at=issued_at + timedelta(days=30),
+    )
+    change = InvoiceDraftUpdate(amount=Decimal("150.00"))
+    for _ in range(cycles):
+        invoice_id = call("create", draft).id
+        call("update", invoice_id, change)
+        call("post", invoice_id)
+        call("void", invoice_id)
+        call("delete", call("create", draft).id)
+
+    results = {}
+    for name in OPERATIONS:
+        samples = latencies[name]
+        results[name] = {
+            "round_trips": round(round_trips[name] / len(samples), 2),
+            **summarize(samples, 0, sum(samples)),
+        }
+    return results
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare round trips and latency of the invoice write paths")
+    parser.add_argument("--database-url", help="use an existing dataset instead of in-memory SQLite")
+    parser.add_argument("--invoices", type=int, default=5_000, help="in-memory dataset size")
+    parser.add_argument("--cycles", type=int, default=1_000, help="invoice lifecycles measured per path")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured lifecycles per path first")
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="simulated delay per statement and commit")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results JSON here as well as stdout")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url) if args.database_url else build_sqlite_dataset(args.invoices, args.seed)
+    with Session(engine) as db:
+        customer_id = db.scalar(select(func.min(Customer.id)))
+    results = {
+        "environment": describe_environment(engine),
+        "config": {"cycles": args.cycles, "rtt_ms": args.rtt_ms},
+        "paths": {},
+    }
+    counter = RoundTrips(engine)
+    for name, path in PATHS.items():
+        if args.warmup:
+            run_cycles(engine, counter, path, customer_id, args.warmup)
+        counter.rtt = args.rtt_ms / 1000
+        results["paths"][name] = run_cycles(engine, counter, path, customer_id, args.cycles)
+        counter.rtt = 0.0
+        for operation, result in results["paths"][name].items():
+            print(f"{name:4} {operation:7} {result}", file=sys.stderr)
+    engine.dispose()
+
+    orm, cas = results["paths"]["orm"], results["paths"]["cas"]
+    results["round_trips_saved"] = {
+        name: round(orm[name]["round_trips"] - cas[name]["round_trips"], 2) for name in OPERATIONS
+    }
+    results["p99_reduction"] = {
+        name: round(1 - cas[name]["p99_ms"] / orm[name]["p99_ms"], 3) if orm[name]["p99_ms"] else 0.0
+        for name in OPERATIONS
+    }
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
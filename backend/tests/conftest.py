@@ -1,15 +1,24 @@
+import os
+
+# One process, so the per-process cache is coherent; exercise it (set before app imports)
+os.environ.setdefault("CACHE_BACKEND", "memory")
+
 import pytest
+import pytest_asyncio
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
-from app.api.routes import invoices, customers
+from app.api.routes import invoices, customers, payments, reports, events
+from app.api.services.invoice_cache import invoice_cache
 from app.db.base import Base
 from app.main import app
 
 
 # Test database URL (use in-memory SQLite for speed, or separate test DB)
 TEST_DATABASE_URL = "sqlite:///./test.db"
+TEST_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
 
 @pytest.fixture(scope="function")
@@ -20,6 +29,8 @@ def db_session():
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     
     session = TestingSessionLocal()
+    # Ids restart with every fresh schema, so cached payloads must not leak between tests
+    invoice_cache.clear()
     try:
         yield session
     finally:
@@ -38,11 +49,29 @@ def client(db_session):
     
     app.dependency_overrides[invoices.get_db] = override_get_db
     app.dependency_overrides[customers.get_db] = override_get_db
+    app.dependency_overrides[payments.get_db] = override_get_db
+    app.dependency_overrides[reports.get_db] = override_get_db
+    app.dependency_overrides[events.get_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest_asyncio.fixture
+async def async_db_session(db_session):
+    """Async session on the same test database (tables are created by db_session)"""
+    engine = create_async_engine(TEST_ASYNC_DATABASE_URL)
+    TestingAsyncSessionLocal = async_sessionmaker(
+        bind=engine, autoflush=False, expire_on_commit=False
+    )
+    session = TestingAsyncSessionLocal()
+    try:
+        yield session
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
 @pytest.fixture
 def sample_customer(db_session):
     """Create a sample customer for testing"""
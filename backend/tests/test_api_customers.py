@@ -12,21 +12,92 @@ def test_create_customer(client):
 
 
 def test_list_customers(client, sample_customer):
-    """Test listing all customers"""
+    """Test listing customers returns a page"""
     response = client.get("/customers")
     assert response.status_code == 200
     data = response.json()
-    assert isinstance(data, list)
-    assert len(data) >= 1
-    names = [c["name"] for c in data]
+    assert data["next_cursor"] is None
+    names = [c["name"] for c in data["items"]]
     assert sample_customer.name in names
 
 
 def test_list_customers_empty(client):
-    """Test listing customers when none exist (empty list)"""
+    """Test listing customers when none exist (empty page)"""
     response = client.get("/customers")
     assert response.status_code == 200
-    assert response.json() == []
+    assert response.json() == {"items": [], "next_cursor": None}
+
+
+def _create_customers(client, *names):
+    return {name: client.post("/customers", json={"name": name}).json()["id"] for name in names}
+
+
+def test_list_customers_pages_in_name_order(client):
+    """Test customers are listed by name, case-insensitively, across cursor pages"""
+    _create_customers(client, "delta", "Bravo", "alpha", "Charlie", "echo")
+    first = client.get("/customers?limit=2").json()
+    assert [c["name"] for c in first["items"]] == ["alpha", "Bravo"]
+    second = client.get(f"/customers?limit=2&cursor={first['next_cursor']}").json()
+    assert [c["name"] for c in second["items"]] == ["Charlie", "delta"]
+    third = client.get(f"/customers?limit=2&cursor={second['next_cursor']}").json()
+    assert [c["name"] for c in third["items"]] == ["echo"]
+    assert third["next_cursor"] is None
+
+
+def test_search_customers_ranks_prefix_matches_first(client):
+    """Test names starting with q come before names containing it, each tier in name order"""
+    _create_customers(client, "Northwind", "Acme North", "north star", "Southern", "Barnorth Ltd")
+    response = client.get("/customers?q=NORTH")
+    assert response.status_code == 200
+    assert [c["name"] for c in response.json()["items"]] == [
+        "north star", "Northwind", "Acme North", "Barnorth Ltd",
+    ]
+
+
+def test_search_customers_pages_across_tiers(client):
+    """Test cursor pages continue from the prefix tier into the contains tier without repeats"""
+    _create_customers(client, "Acme A", "Acme B", "Big Acme", "Old Acme", "Zeta")
+    seen = []
+    cursor = ""
+    while True:
+        page = client.get(f"/customers?q=acme&limit=1{cursor}").json()
+        seen += [c["name"] for c in page["items"]]
+        if not page["next_cursor"]:
+            break
+        cursor = f"&cursor={page['next_cursor']}"
+    assert seen == ["Acme A", "Acme B", "Big Acme", "Old Acme"]
+
+
+def test_search_customers_short_query_matches_prefix_only(client):
+    """Test queries under three characters only match the start of the name"""
+    _create_customers(client, "Abbott", "Cabot")
+    assert [c["name"] for c in client.get("/customers?q=ab").json()["items"]] == ["Abbott"]
+    assert [c["name"] for c in client.get("/customers?q=abo").json()["items"]] == ["Cabot"]
+
+
+def test_search_customers_treats_wildcards_literally(client):
+    """Test % and _ in q are matched as characters, not LIKE wildcards"""
+    _create_customers(client, "100% Cotton", "100 Cotton", "a_b Corp", "axb Corp")
+    assert [c["name"] for c in client.get("/customers?q=0%25 c").json()["items"]] == ["100% Cotton"]
+    assert [c["name"] for c in client.get("/customers?q=a_b").json()["items"]] == ["a_b Corp"]
+
+
+def test_lookup_customers_by_ids(client):
+    """Test ids= returns just those customers, ignoring unknown ids"""
+    ids = _create_customers(client, "Acme", "Globex", "Initech")
+    response = client.get(f"/customers?ids={ids['Initech']},{ids['Acme']},99999")
+    assert response.status_code == 200
+    assert response.json() == {
+        "items": [{"id": ids["Acme"], "name": "Acme"}, {"id": ids["Initech"], "name": "Initech"}],
+        "next_cursor": None,
+    }
+
+
+def test_list_customers_rejects_bad_ids_and_cursor(client):
+    """Test malformed ids= or cursor returns 400"""
+    assert client.get("/customers?ids=1,x").status_code == 400
+    assert client.get("/customers?ids=" + ",".join(str(i) for i in range(1, 202))).status_code == 400
+    assert client.get("/customers?cursor=not-a-cursor").status_code == 400
 
 
 def test_create_customer_validation_empty_name(client):
@@ -45,7 +116,7 @@ def test_get_customer_invoices(client, sample_customer, sample_invoice):
     """Test listing invoices for a customer"""
     response = client.get(f"/customers/{sample_customer.id}/invoices")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert isinstance(data, list)
     assert len(data) >= 1
     assert any(inv["customer_id"] == sample_customer.id for inv in data)
@@ -55,12 +126,23 @@ def test_get_customer_invoices_filter_by_status(client, sample_customer, sample_
     """Test filtering customer invoices by status"""
     response = client.get(f"/customers/{sample_customer.id}/invoices?status=PENDING")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert all(inv["status"] == "PENDING" for inv in data)
 
 
+def test_get_customer_invoices_fields_and_include(client, sample_customer, sample_invoice):
+    """Test customer invoice lists accept the same fields= and include= parameters"""
+    client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "10.00"})
+    response = client.get(f"/customers/{sample_customer.id}/invoices?fields=amount_paid&include=payments")
+    assert response.status_code == 200
+    [item] = response.json()["items"]
+    assert item["amount_paid"] == "10.00"
+    assert [p["amount"] for p in item["payments"]] == ["10.00"]
+    assert set(item) == {"id", "amount_paid", "payments"}
+
+
 def test_get_customer_invoices_nonexistent_returns_empty(client):
     """Test customer invoices for non-existent customer returns empty list"""
     response = client.get("/customers/99999/invoices")
     assert response.status_code == 200
-    assert response.json() == []
+    assert response.json() == {"items": [], "next_cursor": None}
@@ -0,0 +1,152 @@
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from app.api.services.event_service import purge_old_events, stream_events
+from app.api.services.overdue_service import sweep_overdue_invoices
+from app.db.models.event import Event
+
+
+def _invoice_payload(customer_id, **overrides):
+    payload = {
+        "customer_id": customer_id,
+        "amount": "100.00",
+        "currency": "USD",
+        "issued_at": "2025-01-01T00:00:00Z",
+        "due_at": "2025-02-01T00:00:00Z",
+    }
+    return {**payload, **overrides}
+
+
+def _events(client, after=None):
+    response = client.get("/events", params={"after": after} if after else {})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_invoice_lifecycle_writes_events_in_order(client, sample_customer):
+    """Test each invoice mutation and payment adds one event carrying the state after the change"""
+    invoice_id = client.post("/invoices", json=_invoice_payload(sample_customer.id)).json()["id"]
+    client.patch(f"/invoices/{invoice_id}", json={"amount": "150.00"})
+    client.post(f"/invoices/{invoice_id}/post")
+    payment_id = client.post(f"/invoices/{invoice_id}/payments", json={"amount": "50.00"}).json()["id"]
+    client.post(f"/invoices/{invoice_id}/void")
+    draft_id = client.post("/invoices", json=_invoice_payload(sample_customer.id)).json()["id"]
+    client.delete(f"/invoices/{draft_id}")
+
+    page = _events(client)
+    assert [(e["type"], e["invoice_id"]) for e in page["items"]] == [
+        ("invoice.created", invoice_id),
+        ("invoice.updated", invoice_id),
+        ("invoice.posted", invoice_id),
+        ("payment.recorded", invoice_id),
+        ("invoice.voided", invoice_id),
+        ("invoice.created", draft_id),
+        ("invoice.deleted", draft_id),
+    ]
+    seqs = [e["seq"] for e in page["items"]]
+    assert seqs == sorted(seqs)
+
+    updated, payment, voided = page["items"][1], page["items"][3], page["items"][4]
+    assert updated["payload"]["invoice"]["amount"] == "150.00"
+    assert payment["payload"]["payment"]["id"] == payment_id
+    assert payment["payload"]["payment"]["amount"] == "50.00"
+    assert payment["payload"]["invoice"]["amount_paid"] == "50.00"
+    assert payment["payload"]["invoice"]["balance_due"] == "100.00"
+    assert voided["payload"]["invoice"]["status"] == "VOID"
+
+
+def test_events_feed_returns_only_new_events(client, sample_customer):
+    """Test polling with next_cursor returns just the changes since the last call"""
+    invoice_id = client.post("/invoices", json=_invoice_payload(sample_customer.id)).json()["id"]
+    first = _events(client)
+    assert len(first["items"]) == 1
+
+    idle = _events(client, first["next_cursor"])
+    assert idle == {"items": [], "next_cursor": first["next_cursor"]}
+
+    client.post(f"/invoices/{invoice_id}/post")
+    later = _events(client, first["next_cursor"])
+    assert [e["type"] for e in later["items"]] == ["invoice.posted"]
+
+
+def test_events_feed_pages_with_limit(client, sample_customer):
+    """Test limit splits the feed and the cursors walk it without gaps or repeats"""
+    for _ in range(3):
+        client.post("/invoices", json=_invoice_payload(sample_customer.id))
+    first = client.get("/events?limit=2").json()
+    rest = client.get(f"/events?limit=2&after={first['next_cursor']}").json()
+    assert [e["seq"] for e in first["items"] + rest["items"]] == [1, 2, 3]
+
+
+def test_rejected_changes_write_no_events(client, sample_invoice):
+    """Test an overpayment or an invalid transition leaves the feed unchanged"""
+    assert client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "5000.00"}).status_code == 400
+    assert client.post(f"/invoices/{sample_invoice.id}/post").status_code == 400
+    assert _events(client)["items"] == []
+
+
+def test_batch_payments_write_one_event_per_payment(client, sample_invoice):
+    """Test a batch adds a payment.recorded event per accepted item, with the running state"""
+    payload = {"items": [
+        {"invoice_id": sample_invoice.id, "amount": "400.00"},
+        {"invoice_id": sample_invoice.id, "amount": "9999.00"},
+        {"invoice_id": sample_invoice.id, "amount": "600.00"},
+    ]}
+    results = client.post("/payments/batch", json=payload).json()["results"]
+
+    events = _events(client)["items"]
+    assert [e["payload"]["payment"]["id"] for e in events] == [results[0]["payment_id"], results[2]["payment_id"]]
+    assert [e["payload"]["invoice"]["amount_paid"] for e in events] == ["400.00", "1000.00"]
+    assert [e["payload"]["invoice"]["status"] for e in events] == ["PENDING", "PAID"]
+
+
+def test_overdue_sweep_writes_events(client, db_session, sample_invoice):
+    """Test the overdue sweep adds an invoice.overdue event per invoice it flags"""
+    sweep_overdue_invoices(db_session, now=datetime.now(timezone.utc) + timedelta(days=1), pause=0)
+    [event] = _events(client)["items"]
+    assert event["type"] == "invoice.overdue"
+    assert event["invoice_id"] == sample_invoice.id
+    assert event["payload"]["invoice"]["overdue_at"] is not None
+
+
+def test_events_rejects_bad_cursor(client):
+    """Test a malformed cursor returns 400 on the feed and the stream"""
+    assert client.get("/events?after=garbage").status_code == 400
+    assert client.get("/events/stream", headers={"Last-Event-ID": "garbage"}).status_code == 400
+
+
+async def _collect(stream):
+    return [message async for message in stream]
+
+
+@pytest.mark.asyncio
+async def test_stream_events_resumes_from_message_id(client, db_session, sample_customer):
+    """Test SSE messages carry the event and an id that resumes after it"""
+    for _ in range(2):
+        client.post("/invoices", json=_invoice_payload(sample_customer.id))
+
+    polls = iter([False, True])
+    messages = await _collect(stream_events(db_session, poll_interval=0, should_stop=lambda: next(polls)))
+    assert len(messages) == 2
+    fields = dict(line.split(": ", 1) for line in messages[0].strip().split("\n"))
+    assert fields["event"] == "invoice.created"
+    assert json.loads(fields["data"])["seq"] == 1
+
+    polls = iter([False, True])
+    resumed = await _collect(
+        stream_events(db_session, after=fields["id"], poll_interval=0, should_stop=lambda: next(polls))
+    )
+    assert [json.loads(m.split("data: ", 1)[1])["seq"] for m in resumed] == [2]
+
+
+def test_purge_old_events(client, db_session, sample_customer):
+    """Test events past the retention window are deleted and recent ones kept"""
+    for _ in range(3):
+        client.post("/invoices", json=_invoice_payload(sample_customer.id))
+    old = datetime.now(timezone.utc) - timedelta(days=30)
+    db_session.query(Event).filter(Event.seq <= 2).update({"created_at": old})
+    db_session.commit()
+
+    assert purge_old_events(db_session, retention_days=7, batch_size=1) == 2
+    assert [e["seq"] for e in _events(client)["items"]] == [3]
@@ -49,6 +49,10 @@ def test_create_payment(client, sample_invoice):
     assert data["amount"] == "500.00"
     assert data["invoice_id"] == sample_invoice.id
 
+    invoice = client.get(f"/invoices/{sample_invoice.id}").json()
+    assert invoice["amount_paid"] == "500.00"
+    assert invoice["balance_due"] == "500.00"
+
 
 def test_create_payment_overpayment_rejected(client, sample_invoice):
     """Test that API rejects overpayment"""
@@ -65,7 +69,7 @@ def test_list_invoices(client, sample_invoice):
     """Test listing all invoices"""
     response = client.get("/invoices")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert isinstance(data, list)
     assert len(data) >= 1
 
@@ -74,10 +78,59 @@ def test_list_invoices_filter_by_status(client, sample_invoice):
     """Test filtering invoices by status"""
     response = client.get("/invoices?status=PENDING")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert all(inv["status"] == "PENDING" for inv in data)
 
 
+def test_list_invoices_omits_payments_by_default(client, sample_invoice):
+    """Test list rows carry the header columns and balance, but no payments"""
+    client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "333.33"})
+
+    item = client.get("/invoices").json()["items"][0]
+    assert "payments" not in item
+    assert item["amount_paid"] == "333.33"
+    assert item["balance_due"] == "666.67"
+    assert item["status"] == "PENDING"
+
+
+def test_list_invoices_include_payments(client, sample_invoice):
+    """Test include=payments embeds each invoice's payments in paid_at order"""
+    client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "100.00", "paid_at": "2025-02-01T00:00:00Z"})
+    client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "50.00", "paid_at": "2025-01-01T00:00:00Z"})
+
+    item = client.get("/invoices?include=payments").json()["items"][0]
+    assert [p["amount"] for p in item["payments"]] == ["50.00", "100.00"]
+    assert item["amount_paid"] == "150.00"
+
+
+def test_list_invoices_sparse_fields(client, sample_invoice):
+    """Test fields= returns only the requested columns plus id, and still paginates"""
+    client.post("/invoices", json={
+        "customer_id": sample_invoice.customer_id,
+        "amount": "10.00",
+        "currency": "USD",
+        "issued_at": "2020-01-01T00:00:00Z",
+        "due_at": "2020-02-01T00:00:00Z",
+    })
+    response = client.get("/invoices?fields=status,balance_due&limit=1")
+    assert response.status_code == 200
+    page = response.json()
+    assert page["items"] == [{"id": sample_invoice.id, "status": "PENDING", "balance_due": "1000.00"}]
+    assert page["next_cursor"] is not None
+
+    rest = client.get(f"/invoices?fields=status,balance_due&limit=1&cursor={page['next_cursor']}").json()
+    assert list(rest["items"][0]) == ["id", "status", "balance_due"]
+    assert rest["items"][0]["id"] != sample_invoice.id
+
+
+def test_list_invoices_unknown_field_rejected(client):
+    """Test an unknown column in fields= returns 400 and unknown include= returns 422"""
+    response = client.get("/invoices?fields=amount,secret")
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
+    assert client.get("/invoices?include=customer").status_code == 422
+
+
 def test_create_invoice_validation_invalid_currency(client, sample_customer):
     """Test that invalid currency (not 3 chars) returns 422"""
     from datetime import datetime, timezone
@@ -213,7 +266,7 @@ def test_list_invoices_filter_by_customer(client, sample_invoice, sample_custome
     """Test filtering invoices by customer_id"""
     response = client.get(f"/invoices?customer_id={sample_customer.id}")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert all(inv["customer_id"] == sample_customer.id for inv in data)
 
 
@@ -225,7 +278,7 @@ def test_list_invoices_filter_by_dates(client, sample_invoice):
     to_str = now.isoformat().replace("+00:00", "Z")
     response = client.get(f"/invoices?from={from_str}&to={to_str}")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert isinstance(data, list)
 
 
@@ -254,4 +307,486 @@ def test_create_payment_not_found(client, sample_customer):
         "/invoices/99999/payments",
         json={"amount": "100.00"}
     )
-    assert response.status_code == 400
\ No newline at end of file
+    assert response.status_code == 400
+
+def test_list_invoices_paginates_with_cursor(client, db_session, sample_customer):
+    """Test walking all pages with next_cursor returns every invoice exactly once, newest first"""
+    from app.db.models.invoice import Invoice, InvoiceStatus
+    from datetime import timedelta
+    base = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    for i in range(7):
+        db_session.add(Invoice(
+            customer_id=sample_customer.id,
+            amount=100 + i,
+            currency="USD",
+            # Pairs of invoices share issued_at so the id tie-breaker is exercised
+            issued_at=base + timedelta(days=i // 2),
+            due_at=base + timedelta(days=30),
+            status=InvoiceStatus.PENDING,
+        ))
+    db_session.commit()
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/invoices", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 3
+        seen.extend(page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len({inv["id"] for inv in seen}) == 7
+    keys = [(inv["issued_at"], inv["id"]) for inv in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_list_invoices_invalid_cursor(client):
+    """Test that a malformed cursor returns 400"""
+    response = client.get("/invoices?cursor=not-a-cursor")
+    assert response.status_code == 400
+    assert "cursor" in response.json()["detail"].lower()
+
+
+def test_list_invoices_limit_above_max_rejected(client):
+    """Test that limit above the server maximum returns 422"""
+    from app.api.services.pagination import MAX_PAGE_SIZE
+    response = client.get(f"/invoices?limit={MAX_PAGE_SIZE + 1}")
+    assert response.status_code == 422
+
+
+def test_export_invoices_ndjson(client, sample_invoice, sample_draft_invoice):
+    """Test NDJSON export streams one invoice per line with payments embedded"""
+    import json
+    client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "250.00"})
+    response = client.get("/invoices/export?format=ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert {row["id"] for row in rows} == {sample_invoice.id, sample_draft_invoice.id}
+    paid = next(row for row in rows if row["id"] == sample_invoice.id)
+    assert [p["amount"] for p in paid["payments"]] == ["250.00"]
+
+
+def test_export_invoices_csv_with_filter(client, sample_invoice, sample_draft_invoice):
+    """Test CSV export applies the list filters and writes one row per payment"""
+    import csv
+    import io
+    client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "100.00"})
+    client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "200.00"})
+    response = client.get("/invoices/export?format=csv&status=PENDING")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 2
+    assert all(row["invoice_id"] == str(sample_invoice.id) for row in rows)
+    assert sorted(row["payment_amount"] for row in rows) == ["100.00", "200.00"]
+
+
+def test_export_invoices_invalid_format(client):
+    """Test that an unknown export format returns 422"""
+    response = client.get("/invoices/export?format=xml")
+    assert response.status_code == 422
+
+
+def test_get_invoice_etag_not_modified(client, sample_invoice):
+    """Test repeated GETs carry an ETag and If-None-Match returns 304 with no body"""
+    first = client.get(f"/invoices/{sample_invoice.id}")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    second = client.get(f"/invoices/{sample_invoice.id}", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+
+def test_get_invoice_cache_invalidated_by_writes(client, sample_invoice, sample_draft_invoice):
+    """Test every mutating path invalidates the cached invoice so the ETag changes"""
+    def etag(invoice_id):
+        return client.get(f"/invoices/{invoice_id}").headers["etag"]
+
+    before = etag(sample_invoice.id)
+    client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "10.00"})
+    after_payment = client.get(f"/invoices/{sample_invoice.id}", headers={"If-None-Match": before})
+    assert after_payment.status_code == 200
+    assert after_payment.json()["amount_paid"] == "10.00"
+
+    before = etag(sample_invoice.id)
+    client.post("/payments/batch", json={"items": [{"invoice_id": sample_invoice.id, "amount": "5.00"}]})
+    assert etag(sample_invoice.id) != before
+
+    before = etag(sample_invoice.id)
+    client.post(f"/invoices/{sample_invoice.id}/void")
+    assert client.get(f"/invoices/{sample_invoice.id}").json()["status"] == "VOID"
+    assert etag(sample_invoice.id) != before
+
+    before = etag(sample_draft_invoice.id)
+    client.patch(f"/invoices/{sample_draft_invoice.id}", json={"amount": "42.00"})
+    assert client.get(f"/invoices/{sample_draft_invoice.id}").json()["amount"] == "42.00"
+    assert etag(sample_draft_invoice.id) != before
+
+    client.post(f"/invoices/{sample_draft_invoice.id}/post")
+    assert client.get(f"/invoices/{sample_draft_invoice.id}").json()["status"] == "PENDING"
+
+
+def test_get_invoice_cache_invalidated_by_delete(client, sample_draft_invoice):
+    """Test a deleted invoice is not served from the cache"""
+    assert client.get(f"/invoices/{sample_draft_invoice.id}").status_code == 200
+    client.delete(f"/invoices/{sample_draft_invoice.id}")
+    assert client.get(f"/invoices/{sample_draft_invoice.id}").status_code == 404
+
+
+def test_create_payment_idempotency_key_replays(client, sample_invoice):
+    """Test a retried payment with the same Idempotency-Key is recorded once and replayed"""
+    headers = {"Idempotency-Key": "webhook-123"}
+    payload = {"amount": "400.00"}
+    first = client.post(f"/invoices/{sample_invoice.id}/payments", json=payload, headers=headers)
+    assert first.status_code == 201
+    assert "idempotent-replayed" not in first.headers
+
+    # A retry would otherwise be a second partial payment
+    retry = client.post(f"/invoices/{sample_invoice.id}/payments", json=payload, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+
+    invoice = client.get(f"/invoices/{sample_invoice.id}").json()
+    assert invoice["amount_paid"] == "400.00"
+    assert len(invoice["payments"]) == 1
+
+
+def test_create_payment_idempotency_key_reused_for_other_request(client, sample_invoice):
+    """Test reusing a key with a different body is rejected with 422"""
+    headers = {"Idempotency-Key": "webhook-456"}
+    client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "10.00"}, headers=headers)
+    response = client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "20.00"}, headers=headers)
+    assert response.status_code == 422
+
+
+def test_create_payment_idempotency_key_not_stored_on_failure(client, sample_invoice):
+    """Test a rejected payment does not consume its key"""
+    headers = {"Idempotency-Key": "webhook-789"}
+    rejected = client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "5000.00"}, headers=headers)
+    assert rejected.status_code == 400
+    response = client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "5000.00"}, headers=headers)
+    assert response.status_code == 400
+    assert "idempotent-replayed" not in response.headers
+
+
+def test_create_invoice_idempotency_key(client, sample_customer):
+    """Test a retried invoice create returns the first invoice instead of a duplicate"""
+    payload = {
+        "customer_id": sample_customer.id,
+        "amount": "250.00",
+        "currency": "USD",
+        "issued_at": "2025-01-01T00:00:00Z",
+        "due_at": "2025-02-01T00:00:00Z",
+    }
+    headers = {"Idempotency-Key": "create-1"}
+    first = client.post("/invoices", json=payload, headers=headers)
+    retry = client.post("/invoices", json=payload, headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.json()["id"] == first.json()["id"]
+    assert len(client.get("/invoices").json()["items"]) == 1
+
+
+def test_purge_expired_idempotency_keys(client, db_session, sample_invoice):
+    """Test expired keys are deleted in batches and can then be reused"""
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import update
+    from app.db.models.idempotency import IdempotencyKey
+    from app.api.services.idempotency_service import purge_expired_keys
+
+    for i in range(5):
+        client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "1.00"}, headers={"Idempotency-Key": f"k{i}"})
+    old = datetime.now(timezone.utc) - timedelta(days=2)
+    db_session.execute(update(IdempotencyKey).where(IdempotencyKey.key != "k4").values(created_at=old))
+    db_session.commit()
+
+    assert purge_expired_keys(db_session, ttl_hours=24, batch_size=2) == 4
+    assert [k.key for k in db_session.query(IdempotencyKey)] == ["k4"]
+
+
+def test_expired_idempotency_key_is_reused(client, db_session, sample_invoice):
+    """Test a key past the TTL runs the new request instead of replaying the expired response"""
+    from datetime import timedelta
+    from sqlalchemy import update
+    from app.db.models.idempotency import IdempotencyKey
+
+    headers = {"Idempotency-Key": "webhook-expired"}
+    client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "10.00"}, headers=headers)
+    db_session.execute(update(IdempotencyKey).values(created_at=datetime.now(timezone.utc) - timedelta(days=2)))
+    db_session.commit()
+
+    response = client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "20.00"}, headers=headers)
+    assert response.status_code == 201
+    assert "idempotent-replayed" not in response.headers
+    assert client.get(f"/invoices/{sample_invoice.id}").json()["amount_paid"] == "30.00"
+
+
+def test_idempotent_write_commits_with_its_response(db_session, sample_customer):
+    """Test the operation's writes do not outlive a failure to store its response"""
+    from app.api.schemas.customer import CustomerCreate
+    from app.api.services.idempotency_service import run_idempotent
+    from app.db.models.customer import Customer
+    from app.db.models.idempotency import IdempotencyKey
+
+    class Crashing(CustomerCreate):
+        def model_dump_json(self, **kwargs):
+            raise RuntimeError("crashed before the response was stored")
+
+    def operation(session):
+        session.add(Customer(name="Written once"))
+        session.commit()
+        return Crashing(name="Written once")
+
+    with pytest.raises(RuntimeError):
+        run_idempotent(db_session, "crash-1", "POST /customers", CustomerCreate(name="x"), operation)
+    db_session.rollback()
+    assert db_session.query(Customer).filter_by(name="Written once").count() == 0
+    assert db_session.query(IdempotencyKey).count() == 0
+
+
+def test_idempotent_write_invalidates_cache_after_commit(client, db_session, sample_invoice):
+    """Test a detail read cached between the savepoint release and the commit is evicted by the commit"""
+    from sqlalchemy.orm import Session
+    from app.api.schemas.payment import PaymentCreate
+    from app.api.services.idempotency_service import run_idempotent
+    from app.api.services.invoice_cache import cache_invoice, get_cached_invoice
+    from app.api.services.invoice_service import get_invoice_detail
+    from app.api.services.payment_service import record_payment
+
+    def operation(session):
+        payment = record_payment(session, sample_invoice.id, PaymentCreate(amount=Decimal("10.00")))
+        # A concurrent GET in this window reads the last committed state and caches it
+        with Session(bind=db_session.get_bind()) as reader:
+            stale = cache_invoice(get_invoice_detail(reader, sample_invoice.id))
+        assert b'"amount_paid":"0.00"' in stale.payload
+        assert get_cached_invoice(sample_invoice.id) == stale
+        return payment
+
+    payment = PaymentCreate(amount=Decimal("10.00"))
+    run_idempotent(db_session, "pay-1", f"POST /invoices/{sample_invoice.id}/payments", payment, operation)
+    assert get_cached_invoice(sample_invoice.id) is None
+    assert client.get(f"/invoices/{sample_invoice.id}").json()["amount_paid"] == "10.00"
+
+
+def _changes(client, token, **params):
+    response = client.get("/invoices", params={"changed_since": token, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_list_invoices_changed_since(client, sample_invoice, sample_draft_invoice):
+    """Test changed_since returns only invoices written after the token, and deleted drafts as tombstones"""
+    first = _changes(client, "0")
+    assert [i["id"] for i in first["items"]] == [sample_invoice.id, sample_draft_invoice.id]
+    assert (first["deleted"], first["has_more"]) == ([], False)
+
+    idle = _changes(client, first["next_token"])
+    assert idle == {"items": [], "deleted": [], "next_token": first["next_token"], "has_more": False}
+
+    client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "100.00"})
+    client.delete(f"/invoices/{sample_draft_invoice.id}")
+    delta = _changes(client, first["next_token"], include="payments")
+    [paid] = delta["items"]
+    assert paid["id"] == sample_invoice.id
+    assert paid["amount_paid"] == "100.00"
+    assert [p["amount"] for p in paid["payments"]] == ["100.00"]
+    assert [d["id"] for d in delta["deleted"]] == [sample_draft_invoice.id]
+    assert _changes(client, delta["next_token"])["items"] == []
+
+
+def test_list_invoices_changed_since_pages_with_limit(client, sample_customer):
+    """Test a sync walks every change once across pages, each write moving its invoice to the end"""
+    payload = {
+        "customer_id": sample_customer.id,
+        "amount": "100.00",
+        "currency": "USD",
+        "issued_at": "2025-01-01T00:00:00Z",
+        "due_at": "2025-02-01T00:00:00Z",
+    }
+    ids = [client.post("/invoices", json=payload).json()["id"] for _ in range(3)]
+    client.post(f"/invoices/{ids[0]}/post")
+
+    first = _changes(client, "0", limit=2, fields="status")
+    assert [i["id"] for i in first["items"]] == ids[1:]
+    assert first["has_more"] is True
+    rest = _changes(client, first["next_token"], limit=2, fields="status")
+    assert rest["items"] == [{"id": ids[0], "status": "PENDING"}]
+    assert rest["has_more"] is False
+
+
+def test_list_invoices_changed_since_rejects_filters_and_bad_token(client):
+    """Test changed_since with a filter or cursor, or a malformed token, returns 400"""
+    assert client.get("/invoices?changed_since=0&status=PENDING").status_code == 400
+    assert client.get("/invoices?changed_since=0&cursor=abc").status_code == 400
+    assert client.get("/invoices?changed_since=garbage").status_code == 400
+
+
+def test_row_version_server_default_matches_migration():
+    """Test row_version columns declare the migrations' transaction-id default on PostgreSQL only"""
+    from sqlalchemy.dialects import postgresql, sqlite
+    from sqlalchemy.schema import CreateTable
+    from app.db.models.invoice import Invoice
+    from app.db.models.invoice_tombstone import InvoiceTombstone
+    from app.db.models.payment import Payment
+
+    for table in (Invoice.__table__, Payment.__table__, InvoiceTombstone.__table__):
+        pg_ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+        assert "row_version BIGINT DEFAULT pg_current_xact_id()::text::bigint NOT NULL" in pg_ddl
+        sqlite_ddl = str(CreateTable(table).compile(dialect=sqlite.dialect()))
+        assert "row_version BIGINT DEFAULT NULL NOT NULL" in sqlite_ddl
+
+
+def _batch_item(customer_id, amount="100.00", status="PENDING"):
+    return {
+        "customer_id": customer_id,
+        "amount": amount,
+        "currency": "USD",
+        "issued_at": "2025-01-01T00:00:00Z",
+        "due_at": "2025-02-01T00:00:00Z",
+        "status": status,
+    }
+
+
+def test_create_invoices_batch_per_item(client, sample_customer):
+    """Test a batch creates the valid items in order and rejects unknown customers on their own"""
+    payload = {"items": [
+        _batch_item(sample_customer.id, "100.00"),
+        _batch_item(99999),
+        _batch_item(sample_customer.id, "300.00", status="DRAFT"),
+    ]}
+    response = client.post("/invoices/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["rejected"]) == (2, 1)
+    assert [r["status"] for r in data["results"]] == ["created", "rejected", "created"]
+    assert data["results"][1]["error"] == "Customer 99999 not found"
+
+    first = client.get(f"/invoices/{data['results'][0]['invoice_id']}").json()
+    assert (first["amount"], first["status"], first["amount_paid"]) == ("100.00", "PENDING", "0.00")
+    third = client.get(f"/invoices/{data['results'][2]['invoice_id']}").json()
+    assert (third["amount"], third["status"]) == ("300.00", "DRAFT")
+
+
+def test_create_invoices_batch_all_or_nothing(client, sample_customer):
+    """Test all_or_nothing creates nothing when any item is rejected, and everything otherwise"""
+    payload = {"mode": "all_or_nothing", "items": [_batch_item(sample_customer.id), _batch_item(99999)]}
+    response = client.post("/invoices/batch", json=payload)
+    assert response.status_code == 400
+    assert "item 1: Customer 99999 not found" in response.json()["detail"]
+    assert client.get("/invoices").json()["items"] == []
+
+    payload["items"].pop()
+    assert client.post("/invoices/batch", json=payload).json()["created"] == 1
+
+
+def test_create_invoices_batch_updates_aging_and_events(client, db_session, sample_customer):
+    """Test batch-created invoices feed the aging summary and the event feed like single creates"""
+    from app.api.services.aging_service import rebuild_aging
+    from app.db.models.aging import ReceivableAging
+
+    payload = {"items": [
+        _batch_item(sample_customer.id, "100.00"),
+        _batch_item(sample_customer.id, "250.00"),
+        _batch_item(sample_customer.id, "75.00", status="DRAFT"),
+    ]}
+    ids = [r["invoice_id"] for r in client.post("/invoices/batch", json=payload).json()["results"]]
+
+    [row] = db_session.query(ReceivableAging).all()
+    assert (row.balance, row.invoice_count) == (Decimal("350.00"), 2)
+    rebuild_aging(db_session)
+    db_session.commit()
+    [rebuilt] = db_session.query(ReceivableAging).all()
+    assert (rebuilt.balance, rebuilt.invoice_count) == (Decimal("350.00"), 2)
+
+    events = client.get("/events").json()["items"]
+    assert [(e["type"], e["invoice_id"]) for e in events] == [("invoice.created", i) for i in ids]
+    assert events[1]["payload"]["invoice"]["balance_due"] == "250.00"
+
+
+def test_create_invoices_batch_empty_rejected(client):
+    """Test an empty batch returns 422"""
+    assert client.post("/invoices/batch", json={"items": []}).status_code == 422
+
+
+def test_post_invoices_batch_by_ids(client, sample_invoice, sample_draft_invoice, sample_customer):
+    """Test post-batch posts the drafts and skips other ids with the single-post reason"""
+    other_draft = client.post("/invoices/batch", json={"items": [
+        _batch_item(sample_customer.id, status="DRAFT")
+    ]}).json()["results"][0]["invoice_id"]
+    client.get(f"/invoices/{sample_draft_invoice.id}")  # cached as DRAFT
+
+    ids = [other_draft, sample_invoice.id, 99999, sample_draft_invoice.id]
+    response = client.post("/invoices/post-batch", json={"ids": ids})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["updated_ids"] == sorted([sample_draft_invoice.id, other_draft])
+    assert data["skipped"] == [
+        {"invoice_id": sample_invoice.id, "error": "Invoice must be DRAFT to post (current: PENDING)"},
+        {"invoice_id": 99999, "error": "Invoice 99999 not found"},
+    ]
+    assert client.get(f"/invoices/{sample_draft_invoice.id}").json()["status"] == "PENDING"
+    events = client.get("/events").json()["items"]
+    assert sorted(e["invoice_id"] for e in events if e["type"] == "invoice.posted") == data["updated_ids"]
+
+
+def test_void_invoices_batch_by_filter(client, db_session, sample_customer):
+    """Test void-batch with a filter voids only matching PENDING invoices and keeps aging exact"""
+    from app.api.services.aging_service import rebuild_aging
+    from app.db.models.aging import ReceivableAging
+
+    items = [
+        _batch_item(sample_customer.id, "100.00"),
+        _batch_item(sample_customer.id, "200.00"),
+        _batch_item(sample_customer.id, "300.00", status="DRAFT"),
+        {**_batch_item(sample_customer.id, "400.00"), "issued_at": "2025-06-01T00:00:00Z", "due_at": "2025-07-01T00:00:00Z"},
+    ]
+    ids = [r["invoice_id"] for r in client.post("/invoices/batch", json={"items": items}).json()["results"]]
+    client.post(f"/invoices/{ids[1]}/payments", json={"amount": "50.00"})
+
+    response = client.post("/invoices/void-batch", json={
+        "filter": {"customer_id": sample_customer.id, "to": "2025-03-01T00:00:00Z"}
+    })
+    assert response.json() == {"updated_ids": ids[:2], "skipped": [], "has_more": False}
+    assert [client.get(f"/invoices/{i}").json()["status"] for i in ids] == ["VOID", "VOID", "DRAFT", "PENDING"]
+
+    [row] = db_session.query(ReceivableAging).all()
+    assert (row.balance, row.invoice_count) == (Decimal("400.00"), 1)
+    rebuild_aging(db_session)
+    db_session.commit()
+    [rebuilt] = db_session.query(ReceivableAging).all()
+    assert (rebuilt.balance, rebuilt.invoice_count) == (Decimal("400.00"), 1)
+
+
+def test_invoices_batch_transition_requires_ids_or_filter(client):
+    """Test a transition batch with neither or both of ids and filter returns 422"""
+    assert client.post("/invoices/post-batch", json={}).status_code == 422
+    assert client.post("/invoices/void-batch", json={"ids": [1], "filter": {}}).status_code == 422
+    # An empty filter would match every invoice in the expected status
+    assert client.post("/invoices/void-batch", json={"filter": {}}).status_code == 422
+
+
+def test_invoices_batch_transition_filter_is_capped(client, sample_customer, monkeypatch):
+    """Test a filter moves at most the cap per request and has_more lets the same request continue"""
+    from app.api.services import invoice_service
+
+    monkeypatch.setattr(invoice_service, "MAX_BATCH_TRANSITION", 2)
+    items = [_batch_item(sample_customer.id, status="DRAFT") for _ in range(3)]
+    ids = [r["invoice_id"] for r in client.post("/invoices/batch", json={"items": items}).json()["results"]]
+    batch = {"filter": {"customer_id": sample_customer.id}}
+
+    first = client.post("/invoices/post-batch", json=batch).json()
+    assert (first["updated_ids"], first["has_more"]) == (ids[:2], True)
+    rest = client.post("/invoices/post-batch", json=batch).json()
+    assert (rest["updated_ids"], rest["has_more"]) == (ids[2:], False)
@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+
+def test_batch_payments_records_all(client, sample_invoice):
+    """Test a batch of valid payments is recorded and settles the invoice"""
+    payload = {"items": [
+        {"invoice_id": sample_invoice.id, "amount": "400.00"},
+        {"invoice_id": sample_invoice.id, "amount": "600.00", "paid_at": "2025-03-01T00:00:00Z"},
+    ]}
+    response = client.post("/payments/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["recorded"] == 2
+    assert data["rejected"] == 0
+    assert [r["index"] for r in data["results"]] == [0, 1]
+    assert all(r["payment_id"] is not None for r in data["results"])
+
+    invoice = client.get(f"/invoices/{sample_invoice.id}").json()
+    assert invoice["status"] == "PAID"
+    assert invoice["amount_paid"] == "1000.00"
+    assert sorted(p["amount"] for p in invoice["payments"]) == ["400.00", "600.00"]
+
+
+def test_batch_payments_per_item_rejections(client, sample_invoice, sample_draft_invoice):
+    """Test rules are applied per item, in order, without failing the whole batch"""
+    payload = {"items": [
+        {"invoice_id": sample_invoice.id, "amount": "900.00"},
+        # Would exceed the balance left by the first item
+        {"invoice_id": sample_invoice.id, "amount": "200.00"},
+        {"invoice_id": sample_draft_invoice.id, "amount": "10.00"},
+        {"invoice_id": 99999, "amount": "10.00"},
+        {"invoice_id": sample_invoice.id, "amount": "100.00"},
+    ]}
+    response = client.post("/payments/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["recorded"] == 2
+    assert data["rejected"] == 3
+    statuses = [r["status"] for r in data["results"]]
+    assert statuses == ["recorded", "rejected", "rejected", "rejected", "recorded"]
+    assert "exceeds" in data["results"][1]["error"].lower()
+    assert "draft" in data["results"][2]["error"].lower()
+    assert "not found" in data["results"][3]["error"].lower()
+
+    invoice = client.get(f"/invoices/{sample_invoice.id}").json()
+    assert invoice["status"] == "PAID"
+    assert Decimal(invoice["amount_paid"]) == Decimal("1000.00")
+
+
+def test_batch_payments_after_paid_rejected(client, sample_invoice):
+    """Test items after the invoice is settled within the batch are rejected as PAID"""
+    payload = {"items": [
+        {"invoice_id": sample_invoice.id, "amount": "1000.00"},
+        {"invoice_id": sample_invoice.id, "amount": "1.00"},
+    ]}
+    data = client.post("/payments/batch", json=payload).json()
+    assert data["results"][1]["status"] == "rejected"
+    assert "paid" in data["results"][1]["error"].lower()
+
+
+def test_batch_payments_empty_rejected(client):
+    """Test an empty batch returns 422"""
+    response = client.post("/payments/batch", json={"items": []})
+    assert response.status_code == 422
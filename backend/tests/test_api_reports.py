@@ -0,0 +1,181 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.db.models.customer import Customer
+from app.db.models.invoice import Invoice, InvoiceStatus
+
+
+def _invoice(db, customer_id, amount, currency, status, issued_at, due_at, amount_paid=0):
+    invoice = Invoice(
+        customer_id=customer_id,
+        amount=amount,
+        currency=currency,
+        status=status,
+        issued_at=issued_at,
+        due_at=due_at,
+        amount_paid=amount_paid,
+    )
+    db.add(invoice)
+    return invoice
+
+
+def test_receivables_report_groups_by_customer_and_currency(client, db_session, sample_customer):
+    """Test totals, overdue balance and status counts per customer and currency"""
+    other = Customer(name="Other Customer")
+    db_session.add(other)
+    db_session.commit()
+
+    jan = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    feb = datetime(2025, 2, 1, tzinfo=timezone.utc)
+    jun = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    # Overdue on 2025-03-01, partially paid
+    _invoice(db_session, sample_customer.id, 100, "USD", InvoiceStatus.PENDING, jan, feb, amount_paid=30)
+    # Not yet due on 2025-03-01
+    _invoice(db_session, sample_customer.id, 200, "USD", InvoiceStatus.PENDING, jan, jun)
+    _invoice(db_session, sample_customer.id, 50, "USD", InvoiceStatus.PAID, jan, feb, amount_paid=50)
+    # Excluded from money totals, but counted
+    _invoice(db_session, sample_customer.id, 70, "USD", InvoiceStatus.DRAFT, jan, feb)
+    _invoice(db_session, sample_customer.id, 80, "USD", InvoiceStatus.VOID, jan, feb, amount_paid=10)
+    _invoice(db_session, sample_customer.id, 40, "EUR", InvoiceStatus.PENDING, jan, feb)
+    _invoice(db_session, other.id, 10, "USD", InvoiceStatus.PENDING, feb, jun)
+    db_session.commit()
+
+    response = client.get("/reports/receivables", params={"as_of": "2025-03-01T00:00:00Z"})
+    assert response.status_code == 200
+    data = response.json()
+    rows = {(r["customer_id"], r["currency"]): r for r in data["items"]}
+    assert list(rows) == [
+        (sample_customer.id, "EUR"),
+        (sample_customer.id, "USD"),
+        (other.id, "USD"),
+    ]
+
+    usd = rows[(sample_customer.id, "USD")]
+    assert usd["total_invoiced"] == "350.00"
+    assert usd["total_paid"] == "80.00"
+    assert usd["outstanding"] == "270.00"
+    assert usd["overdue"] == "70.00"
+    assert usd["invoice_counts"] == {"DRAFT": 1, "PENDING": 2, "PAID": 1, "VOID": 1}
+
+    eur = rows[(sample_customer.id, "EUR")]
+    assert eur["outstanding"] == "40.00"
+    assert eur["overdue"] == "40.00"
+
+    assert rows[(other.id, "USD")]["overdue"] == "0.00"
+
+
+def test_receivables_report_date_filters(client, db_session, sample_customer):
+    """Test from/to filter on issued_at like the list endpoints"""
+    jan = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    jun = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    _invoice(db_session, sample_customer.id, 100, "USD", InvoiceStatus.PENDING, jan, jun)
+    _invoice(db_session, sample_customer.id, 300, "USD", InvoiceStatus.PENDING, jun, jun)
+    db_session.commit()
+
+    response = client.get("/reports/receivables", params={"from": "2025-03-01T00:00:00Z"})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert len(items) == 1
+    assert items[0]["total_invoiced"] == "300.00"
+    assert items[0]["invoice_counts"]["PENDING"] == 1
+
+    response = client.get("/reports/receivables", params={"to": "2024-12-31T00:00:00Z"})
+    assert response.json()["items"] == []
+
+
+def _create_invoice(client, customer_id, amount, due_at, status="PENDING", currency="USD"):
+    response = client.post("/invoices", json={
+        "customer_id": customer_id,
+        "amount": amount,
+        "currency": currency,
+        "issued_at": "2025-01-01T00:00:00Z",
+        "due_at": due_at,
+        "status": status,
+    })
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _aging_rows(db):
+    from app.db.models.aging import ReceivableAging
+    from sqlalchemy import select
+    return sorted(
+        (r.customer_id, r.currency, r.due_on, str(r.balance), r.invoice_count)
+        for r in db.scalars(select(ReceivableAging))
+    )
+
+
+def test_aging_report_buckets(client, sample_customer):
+    """Test open balances land in the right days-past-due bucket"""
+    as_of = "2025-06-30T12:00:00Z"
+    _create_invoice(client, sample_customer.id, "10.00", "2025-07-15T00:00:00Z")  # current
+    _create_invoice(client, sample_customer.id, "20.00", "2025-06-30T00:00:00Z")  # due today: current
+    _create_invoice(client, sample_customer.id, "30.00", "2025-06-29T00:00:00Z")  # 1 day
+    _create_invoice(client, sample_customer.id, "40.00", "2025-05-31T00:00:00Z")  # 30 days
+    _create_invoice(client, sample_customer.id, "50.00", "2025-05-30T00:00:00Z")  # 31 days
+    _create_invoice(client, sample_customer.id, "60.00", "2025-04-01T00:00:00Z")  # 90 days
+    _create_invoice(client, sample_customer.id, "70.00", "2025-03-31T00:00:00Z")  # 91 days
+    _create_invoice(client, sample_customer.id, "99.00", "2025-03-31T00:00:00Z", status="DRAFT")
+
+    response = client.get("/reports/aging", params={"as_of": as_of})
+    assert response.status_code == 200
+    [row] = response.json()["items"]
+    assert row["customer_id"] == sample_customer.id
+    assert row["currency"] == "USD"
+    assert row["current"] == "30.00"
+    assert row["days_1_30"] == "70.00"
+    assert row["days_31_60"] == "50.00"
+    assert row["days_61_90"] == "60.00"
+    assert row["days_over_90"] == "70.00"
+    assert row["total"] == "280.00"
+    assert row["invoice_count"] == 7
+
+
+def test_aging_summary_tracks_writes_incrementally(client, db_session, sample_customer):
+    """Test post, payments (single and batch) and void keep the summary equal to a full rebuild"""
+    from app.api.services.aging_service import rebuild_aging
+
+    due = "2025-05-01T00:00:00Z"
+    paid_off = _create_invoice(client, sample_customer.id, "100.00", due)
+    partial = _create_invoice(client, sample_customer.id, "200.00", due)
+    voided = _create_invoice(client, sample_customer.id, "300.00", due)
+    draft = _create_invoice(client, sample_customer.id, "400.00", due, status="DRAFT")
+
+    client.post(f"/invoices/{paid_off}/payments", json={"amount": "100.00"})
+    client.post(f"/invoices/{partial}/payments", json={"amount": "50.00"})
+    client.post("/payments/batch", json={"items": [
+        {"invoice_id": partial, "amount": "25.00"},
+        {"invoice_id": voided, "amount": "10.00"},
+    ]})
+    client.post(f"/invoices/{voided}/void")
+    client.post(f"/invoices/{draft}/post")
+
+    [row] = client.get("/reports/aging", params={"as_of": "2025-06-30T00:00:00Z"}).json()["items"]
+    assert row["days_31_60"] == "525.00"  # 125 left on partial + 400 posted
+    assert row["invoice_count"] == 2
+
+    incremental = _aging_rows(db_session)
+    rebuild_aging(db_session)
+    db_session.commit()
+    assert _aging_rows(db_session) == incremental
+
+
+def test_aging_summary_drops_settled_rows(client, db_session, sample_customer):
+    """Test a due date with no open invoices left disappears from the summary"""
+    invoice_id = _create_invoice(client, sample_customer.id, "100.00", "2025-05-01T00:00:00Z")
+    assert len(_aging_rows(db_session)) == 1
+
+    client.post(f"/invoices/{invoice_id}/payments", json={"amount": "100.00"})
+    assert _aging_rows(db_session) == []
+    assert client.get("/reports/aging").json()["items"] == []
+
+
+def test_aging_upsert_rejects_unsupported_dialect(db_session, monkeypatch):
+    """Test aging deltas on a database without an ON CONFLICT upsert raise AgingError"""
+    from app.api.services.aging_service import AgingError, apply_aging_deltas
+
+    monkeypatch.setattr(db_session.get_bind().dialect, "name", "mysql")
+    with pytest.raises(AgingError, match="mysql"):
+        apply_aging_deltas(db_session, {(1, "USD", datetime(2025, 5, 1).date()): [Decimal("10.00"), 1]})
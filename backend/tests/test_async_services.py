@@ -0,0 +1,119 @@
+import pytest
+import httpx
+from decimal import Decimal
+from datetime import datetime, timezone
+from fastapi import FastAPI
+
+from app.api.routes import async_invoices, async_customers
+from app.api.services import async_invoice_service, async_payment_service
+from app.api.services.invoice_service import InvoiceError
+from app.api.services.payment_service import PaymentError
+from app.api.schemas.invoice import InvoiceCreate
+from app.api.schemas.payment import PaymentCreate
+from app.db.async_session import get_async_db
+from app.db.models.invoice import InvoiceStatus
+
+
+@pytest.mark.asyncio
+async def test_async_create_and_get_invoice(async_db_session, sample_customer):
+    """Test creating an invoice and reading it back through the async service"""
+    data = InvoiceCreate(
+        customer_id=sample_customer.id,
+        amount="99.99",
+        currency="USD",
+        issued_at=datetime.now(timezone.utc),
+        due_at=datetime.now(timezone.utc),
+    )
+    invoice = await async_invoice_service.create_invoice(async_db_session, data)
+    assert invoice.id is not None
+    assert invoice.payments == []
+
+    fetched = await async_invoice_service.get_invoice_detail(async_db_session, invoice.id)
+    assert fetched["amount"] == Decimal("99.99")
+
+
+@pytest.mark.asyncio
+async def test_async_post_and_void_invoice(async_db_session, sample_draft_invoice):
+    """Test the DRAFT → PENDING → VOID transitions through the async service"""
+    invoice = await async_invoice_service.post_invoice(async_db_session, sample_draft_invoice.id)
+    assert invoice.status == InvoiceStatus.PENDING
+    invoice = await async_invoice_service.void_invoice(async_db_session, sample_draft_invoice.id)
+    assert invoice.status == InvoiceStatus.VOID
+    with pytest.raises(InvoiceError):
+        await async_invoice_service.void_invoice(async_db_session, sample_draft_invoice.id)
+
+
+@pytest.mark.asyncio
+async def test_async_record_payment(async_db_session, sample_invoice):
+    """Test async record_payment enforces the same rules and maintains totals"""
+    payment = await async_payment_service.record_payment(
+        async_db_session, sample_invoice.id, PaymentCreate(amount=Decimal("1000.00"))
+    )
+    assert payment.id is not None
+    with pytest.raises(PaymentError):
+        await async_payment_service.record_payment(
+            async_db_session, sample_invoice.id, PaymentCreate(amount=Decimal("1.00"))
+        )
+    invoice = await async_invoice_service.get_invoice_detail(async_db_session, sample_invoice.id)
+    assert invoice["status"] == InvoiceStatus.PAID
+    assert invoice["amount_paid"] == Decimal("1000.00")
+
+
+@pytest.mark.asyncio
+async def test_async_list_invoices_paginates(async_db_session, sample_invoice, sample_draft_invoice):
+    """Test async list honours limit and cursor like the sync service"""
+    from app.api.services.invoice_service import parse_invoice_fields
+    fields = parse_invoice_fields(None)
+    page = await async_invoice_service.list_invoice_summaries(async_db_session, fields, limit=1)
+    assert len(page["items"]) == 1 and page["next_cursor"] is not None
+    rest = await async_invoice_service.list_invoice_summaries(
+        async_db_session, fields, limit=2, cursor=page["next_cursor"]
+    )
+    assert rest["next_cursor"] is None
+    assert {row["id"] for row in page["items"] + rest["items"]} == {sample_invoice.id, sample_draft_invoice.id}
+
+
+@pytest.mark.asyncio
+async def test_async_routes(async_db_session, sample_invoice):
+    """Test the async routers serve detail, list and payment requests"""
+    app = FastAPI()
+    app.include_router(async_invoices.router)
+    app.include_router(async_customers.router)
+
+    async def override_get_async_db():
+        yield async_db_session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            f"/invoices/{sample_invoice.id}/payments", json={"amount": "100.00"}
+        )
+        assert response.status_code == 201
+
+        response = await client.get(f"/invoices/{sample_invoice.id}")
+        assert response.status_code == 200
+        assert response.json()["amount_paid"] == "100.00"
+
+        response = await client.get(f"/customers/{sample_invoice.customer_id}/invoices")
+        assert response.status_code == 200
+        assert [inv["id"] for inv in response.json()["items"]] == [sample_invoice.id]
+
+        response = await client.get("/invoices?fields=balance_due&include=payments")
+        assert response.status_code == 200
+        assert response.json()["items"][0]["balance_due"] == "900.00"
+        assert [p["amount"] for p in response.json()["items"][0]["payments"]] == ["100.00"]
+
+        response = await client.get("/invoices?changed_since=0&fields=amount_paid")
+        assert response.status_code == 200
+        assert response.json()["items"] == [{"id": sample_invoice.id, "amount_paid": "100.00"}]
+
+        response = await client.get("/invoices/99999")
+        assert response.status_code == 404
+
+        response = await client.get("/customers?q=test")
+        assert response.status_code == 200
+        assert [c["id"] for c in response.json()["items"]] == [sample_invoice.customer_id]
+
+        response = await client.get(f"/customers?ids={sample_invoice.customer_id}")
+        assert [c["id"] for c in response.json()["items"]] == [sample_invoice.customer_id]
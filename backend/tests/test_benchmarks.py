@@ -0,0 +1,137 @@
+import json
+import random
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from benchmarks.compare import compare_results
+from benchmarks import serialization, transitions
+from benchmarks.generate import DatasetGenerator, DatasetShape
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.stats import summarize
+
+
+def _dataset(**kwargs) -> tuple[list[dict], list[dict], list[dict]]:
+    generator = DatasetGenerator(**kwargs)
+    return (
+        list(generator.iter_customers()),
+        list(generator.iter_invoices()),
+        list(generator.iter_payments()),
+    )
+
+
+def test_generator_is_deterministic_per_seed():
+    """Test the same seed reproduces the same rows and a different seed does not"""
+    first = _dataset(invoices=300, payments=600, seed=7)
+    assert first == _dataset(invoices=300, payments=600, seed=7)
+    assert first[1] != _dataset(invoices=300, payments=600, seed=8)[1]
+
+
+def test_generator_follows_seed_shape():
+    """Test generated rows stay within the seed file's statuses, currencies and amounts"""
+    shape = DatasetShape.from_seed()
+    customers, invoices, _ = _dataset(invoices=2000, seed=1)
+
+    assert {i["status"] for i in invoices} == set(shape.statuses)
+    assert {i["currency"] for i in invoices} == set(shape.currencies)
+    assert all(
+        shape.amount_min_cents <= Decimal(i["amount"]) * 100 <= shape.amount_max_cents
+        for i in invoices
+    )
+    assert all(1 <= i["customer_id"] <= len(customers) for i in invoices)
+    assert all(i["due_at"] > i["issued_at"] for i in invoices)
+
+
+def test_generator_payments_are_consistent_with_statuses():
+    """Test PAID invoices are paid in full, PENDING partially, others not at all"""
+    _, invoices, payments = _dataset(invoices=2000, payments=5000, seed=3)
+    paid = defaultdict(Decimal)
+    for p in payments:
+        assert Decimal(p["amount"]) > 0
+        paid[p["invoice_id"]] += Decimal(p["amount"])
+
+    for invoice in invoices:
+        amount = Decimal(invoice["amount"])
+        if invoice["status"] == "PAID":
+            assert paid[invoice["id"]] == amount
+        elif invoice["status"] == "PENDING":
+            assert paid[invoice["id"]] < amount
+        else:
+            assert invoice["id"] not in paid
+
+    assert [p["id"] for p in payments] == list(range(1, len(payments) + 1))
+    assert abs(len(payments) - 5000) < 250
+
+
+def test_summarize_percentiles():
+    """Test throughput and percentiles are reported in requests/s and ms"""
+    result = summarize([i / 1000 for i in range(1, 101)], errors=2, elapsed=2.0)
+    assert result["requests"] == 100
+    assert result["errors"] == 2
+    assert result["rps"] == 50.0
+    assert result["p50_ms"] == 50.0
+    assert result["p99_ms"] == 99.0
+    assert result["max_ms"] == 100.0
+
+
+def test_compare_flags_throughput_and_latency_regressions():
+    """Test only changes past the threshold in rps or p99 count as regressions"""
+    def result(rps, p99):
+        return {"rps": rps, "p50_ms": 1.0, "p95_ms": 2.0, "p99_ms": p99, "errors": 0}
+
+    base = {"scenarios": {"a": result(100, 10), "b": result(100, 10), "c": result(100, 10)}}
+    head = {"scenarios": {"a": result(95, 10.5), "b": result(80, 10), "c": result(100, 13)}}
+
+    rows, regressions = compare_results(base, head, threshold=10)
+    assert regressions == ["b", "c"]
+    assert rows[0]["rps"] == -5.0
+
+
+def test_serialization_benchmark_paths_produce_same_payload(capsys):
+    """Test the ORM and Core read paths walk the same rows and emit the same bytes"""
+    serialization.main(["--invoices", "300", "--rows", "250", "--details", "20", "--page-size", "50", "--repeat", "1"])
+    result = json.loads(capsys.readouterr().out)
+    assert result["list"]["orm_with_payments"]["rows"] == result["list"]["core_with_payments"]["rows"] == 250
+
+    engine = serialization.build_sqlite_dataset(invoices=300, seed=42)
+    core_page = serialization._core_page(include_payments=True)
+    try:
+        with Session(engine) as db:
+            orm_cursor = core_cursor = None
+            pages = 0
+            while pages == 0 or orm_cursor is not None:
+                orm_payload, orm_cursor = serialization._orm_page(db, 50, orm_cursor)
+                core_payload, core_cursor = core_page(db, 50, core_cursor)
+                assert orm_payload == core_payload
+                assert orm_cursor == core_cursor
+                pages += 1
+            assert pages == 6
+            for invoice_id in (1, 150, 300):
+                assert serialization._orm_detail(db, invoice_id) == serialization._core_detail(db, invoice_id)
+    finally:
+        engine.dispose()
+
+
+def test_transitions_benchmark_cas_path_saves_round_trips(capsys):
+    """Test the compare-and-set write paths take fewer round trips than the ORM ones for every operation"""
+    transitions.main(["--invoices", "200", "--cycles", "10", "--warmup", "0"])
+    result = json.loads(capsys.readouterr().out)
+    orm, cas = result["paths"]["orm"], result["paths"]["cas"]
+    assert set(cas) == set(transitions.OPERATIONS)
+    assert all(cas[name]["round_trips"] < orm[name]["round_trips"] for name in transitions.OPERATIONS)
+    assert all(cas[name]["errors"] == 0 and cas[name]["requests"] == 10 for name in ("update", "post", "void"))
+
+
+def test_every_scenario_runs():
+    """Test each benchmarks.run scenario sets up and runs its operation on a generated dataset"""
+    engine = serialization.build_sqlite_dataset(invoices=300, seed=5)
+    rng = random.Random(5)
+    try:
+        for scenario in SCENARIOS.values():
+            with Session(engine) as db:
+                state = scenario.setup(db)
+                for _ in range(5):
+                    scenario.op(db, rng, state)
+    finally:
+        engine.dispose()
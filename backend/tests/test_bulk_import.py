@@ -0,0 +1,113 @@
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.bulk_import import (
+    BulkImportError,
+    import_records,
+    import_seed_file,
+    finish_import,
+    iter_records,
+    iter_seed_sections,
+)
+from app.db.models.aging import ReceivableAging
+from app.db.models.customer import Customer
+from app.db.models.invoice import Invoice
+from app.db.models.payment import Payment
+from app.api.services.payment_service import find_amount_paid_mismatches
+
+
+SEED_FILE = Path(__file__).resolve().parents[2] / "seed-data.json"
+
+
+def test_iter_records_json_array_across_chunk_boundaries():
+    """Test records split across tiny read chunks are decoded intact"""
+    records = [{"id": i, "amount": 1234.5 + i, "name": "x" * i} for i in range(20)]
+    parsed = list(iter_records(io.StringIO(json.dumps(records, indent=2)), chunk_size=7))
+    assert [r["id"] for r in parsed] == list(range(20))
+    assert str(parsed[3]["amount"]) == "1237.5"
+    assert parsed[19]["name"] == "x" * 19
+
+
+def test_iter_records_ndjson():
+    """Test NDJSON input is streamed one object per line"""
+    text = "\n".join(json.dumps({"id": i}) for i in range(5)) + "\n"
+    assert [r["id"] for r in iter_records(io.StringIO(text), chunk_size=4)] == list(range(5))
+
+
+def test_iter_records_rejects_truncated_input():
+    """Test a truncated array is reported rather than silently accepted"""
+    with pytest.raises(BulkImportError):
+        list(iter_records(io.StringIO('[{"id": 1}, {"id": 2'), chunk_size=4))
+
+
+def test_iter_seed_sections_skips_unread_sections():
+    """Test sections are streamed in order and an unread section is skipped"""
+    text = json.dumps({"customers": [{"id": 1}, {"id": 2}], "invoices": [{"id": 9}]})
+    sections = iter_seed_sections(io.StringIO(text), chunk_size=3)
+    name, _ = next(sections)
+    assert name == "customers"
+    name, records = next(sections)
+    assert name == "invoices"
+    assert [r["id"] for r in records] == [9]
+    assert list(sections) == []
+
+
+def test_import_seed_file_is_idempotent(db_session):
+    """Test the seed file loads in batches, derived totals are rebuilt and a rerun skips existing ids"""
+    out = io.StringIO()
+    with db_session.get_bind().connect() as conn:
+        with open(SEED_FILE, encoding="utf-8") as fp:
+            counts = import_seed_file(conn, fp, method="insert", batch_size=2, out=out)
+        with open(SEED_FILE, encoding="utf-8") as fp:
+            assert import_seed_file(conn, fp, method="insert", batch_size=2, out=out) == counts
+
+    seed = json.loads(SEED_FILE.read_text())
+    assert counts == {name: len(rows) for name, rows in seed.items()}
+    assert db_session.scalar(select(func.count()).select_from(Customer)) == len(seed["customers"])
+    assert db_session.scalar(select(func.count()).select_from(Invoice)) == len(seed["invoices"])
+    assert db_session.scalar(select(func.count()).select_from(Payment)) == len(seed["payments"])
+    assert find_amount_paid_mismatches(db_session) == []
+    pending = [i for i in seed["invoices"] if i["status"] == "PENDING"]
+    open_count = db_session.scalar(select(func.sum(ReceivableAging.invoice_count)))
+    assert (open_count or 0) == len(pending)
+    assert "rows/s" in out.getvalue()
+
+
+def test_import_records_from_ndjson_per_table(db_session):
+    """Test per-table NDJSON files are imported and finished once"""
+    customers = "\n".join(json.dumps({"id": i, "name": f"Customer {i}"}) for i in range(1, 8))
+    with db_session.get_bind().connect() as conn:
+        read = import_records(conn, "customers", iter_records(io.StringIO(customers)), batch_size=3, out=io.StringIO())
+        finish_import(conn, {"customers"}, out=io.StringIO())
+    assert read == 7
+    assert db_session.scalar(select(func.count()).select_from(Customer)) == 7
+
+
+def test_import_seed_file_requires_dependency_order(db_session):
+    """Test a table that others reference cannot come after them"""
+    text = json.dumps({"invoices": [], "customers": []})
+    with db_session.get_bind().connect() as conn:
+        with pytest.raises(BulkImportError):
+            import_seed_file(conn, io.StringIO(text), out=io.StringIO())
+
+
+def test_import_skips_existing_ids_whose_row_changed(db_session, sample_customer):
+    """Test a rerun skips an invoice id already present even if its issued_at has since changed"""
+    record = {
+        "id": 500, "customer_id": sample_customer.id, "amount": "10.00", "currency": "USD",
+        "issued_at": "2025-01-15T00:00:00Z", "due_at": "2025-02-15T00:00:00Z", "status": "DRAFT",
+    }
+    with db_session.get_bind().connect() as conn:
+        import_records(conn, "invoices", iter([record]), out=io.StringIO())
+        conn.execute(Invoice.__table__.update().values(issued_at=datetime(2025, 3, 1, tzinfo=timezone.utc)))
+        conn.commit()
+        import_records(conn, "invoices", iter([record, {**record, "amount": "20.00"}]), out=io.StringIO())
+
+    [invoice] = db_session.scalars(select(Invoice)).all()
+    assert (invoice.id, invoice.amount, invoice.issued_at.month) == (500, Decimal("10.00"), 3)
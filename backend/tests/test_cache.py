@@ -0,0 +1,43 @@
+import time
+
+from app.core.cache import InMemoryLRUCache
+from app.core.config import Settings
+from app.api.services.invoice_cache import etag_matches
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test the in-process cache evicts the least recently used entry"""
+    cache = InMemoryLRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"  # "b" is now least recently used
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+
+
+def test_lru_cache_expires_entries():
+    """Test entries expire after the TTL"""
+    cache = InMemoryLRUCache(max_entries=10, ttl_seconds=0.01)
+    cache.set("a", b"1")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_etag_matches():
+    """Test If-None-Match parsing: lists, weak validators and *"""
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"x"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_cache_backend_defaults_to_redis_or_none(monkeypatch):
+    """Test the per-process cache is never the default: redis when REDIS_URL is set, else none"""
+    monkeypatch.delenv("CACHE_BACKEND", raising=False)
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    assert Settings().cache_backend == "none"
+    assert Settings(redis_url="redis://cache:6379/0").cache_backend == "redis"
+    assert Settings(cache_backend="memory").cache_backend == "memory"
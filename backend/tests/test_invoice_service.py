@@ -1,17 +1,26 @@
+import json
 import pytest
 from datetime import datetime, timezone
 
 from app.api.services.invoice_service import (
     create_invoice,
-    get_invoice,
-    get_all_invoices,
     update_invoice,
     post_invoice,
     void_invoice,
     delete_invoice,
+    get_invoice_detail,
+    list_invoice_summaries,
+    parse_invoice_fields,
     InvoiceError,
 )
-from app.api.schemas.invoice import InvoiceCreate, InvoiceDraftUpdate
+from app.api.schemas.invoice import (
+    InvoiceCreate,
+    InvoiceDraftUpdate,
+    InvoiceResponse,
+    InvoiceSummary,
+    invoice_json,
+    invoice_page_json,
+)
 from app.db.models.invoice import InvoiceStatus
 
 
@@ -32,17 +41,17 @@ def test_create_invoice(db_session, sample_customer):
     assert invoice.status == InvoiceStatus.DRAFT
 
 
-def test_get_invoice(db_session, sample_invoice):
+def test_get_invoice_detail(db_session, sample_invoice):
     """Test getting an invoice by ID"""
-    inv = get_invoice(db_session, sample_invoice.id)
+    inv = get_invoice_detail(db_session, sample_invoice.id)
     assert inv is not None
-    assert inv.id == sample_invoice.id
-    assert inv.amount == sample_invoice.amount
+    assert inv["id"] == sample_invoice.id
+    assert inv["amount"] == sample_invoice.amount
 
 
-def test_get_invoice_not_found(db_session):
-    """Test get_invoice returns None for missing ID"""
-    assert get_invoice(db_session, 99999) is None
+def test_get_invoice_detail_not_found(db_session):
+    """Test get_invoice_detail returns None for missing ID"""
+    assert get_invoice_detail(db_session, 99999) is None
 
 
 def test_post_invoice_success(db_session, sample_draft_invoice):
@@ -119,7 +128,7 @@ def test_void_invoice_draft_rejected(db_session, sample_draft_invoice):
 def test_delete_invoice_success(db_session, sample_draft_invoice):
     """Test delete_invoice removes a DRAFT invoice from the DB"""
     delete_invoice(db_session, sample_draft_invoice.id)
-    assert get_invoice(db_session, sample_draft_invoice.id) is None
+    assert get_invoice_detail(db_session, sample_draft_invoice.id) is None
 
 
 def test_delete_invoice_pending_rejected(db_session, sample_invoice):
@@ -152,26 +161,69 @@ def test_update_invoice_pending_rejected(db_session, sample_invoice):
     assert "draft" in str(exc_info.value).lower()
 
 
-def test_get_all_invoices_filter_by_status(db_session, sample_invoice):
-    """Test get_all_invoices filters by status"""
-    result = get_all_invoices(db_session, status=InvoiceStatus.PENDING)
-    assert all(inv.status == InvoiceStatus.PENDING for inv in result)
+def test_update_invoice_reports_why_nothing_matched(db_session, sample_draft_invoice, sample_invoice):
+    """Test a conditional update that matches no row reports not found, wrong status or bad dates"""
+    early = InvoiceDraftUpdate(due_at=datetime(2000, 1, 1, tzinfo=timezone.utc))
+    with pytest.raises(InvoiceError, match="on or after issued date"):
+        update_invoice(db_session, sample_draft_invoice.id, early)
+    with pytest.raises(InvoiceError, match="Only draft"):
+        update_invoice(db_session, sample_invoice.id, early)
+    with pytest.raises(InvoiceError, match="not found"):
+        update_invoice(db_session, 99999, InvoiceDraftUpdate(amount="1.00"))
+
+    unchanged = update_invoice(db_session, sample_draft_invoice.id, InvoiceDraftUpdate())
+    assert unchanged.id == sample_draft_invoice.id
+    assert unchanged.payments == []
+
 
+def test_list_invoice_summaries_filter_by_status(db_session, sample_invoice, sample_draft_invoice):
+    """Test list_invoice_summaries filters by status"""
+    result = list_invoice_summaries(db_session, parse_invoice_fields(None), status=InvoiceStatus.PENDING)
+    assert [inv["id"] for inv in result["items"]] == [sample_invoice.id]
+    assert all(inv["status"] == InvoiceStatus.PENDING for inv in result["items"])
 
-def test_get_all_invoices_filter_by_customer(db_session, sample_invoice, sample_customer):
-    """Test get_all_invoices filters by customer_id"""
-    result = get_all_invoices(db_session, customer_id=sample_customer.id)
-    assert all(inv.customer_id == sample_customer.id for inv in result)
 
+def test_list_invoice_summaries_filter_by_customer(db_session, sample_invoice, sample_customer):
+    """Test list_invoice_summaries filters by customer_id"""
+    result = list_invoice_summaries(db_session, parse_invoice_fields(None), customer_id=sample_customer.id)
+    assert result["items"]
+    assert all(inv["customer_id"] == sample_customer.id for inv in result["items"])
+    assert list_invoice_summaries(db_session, parse_invoice_fields(None), customer_id=99999)["items"] == []
 
-def test_get_all_invoices_filter_by_dates(db_session, sample_invoice):
-    """Test get_all_invoices filters by from_date and to_date"""
+
+def test_list_invoice_summaries_filter_by_dates(db_session, sample_invoice):
+    """Test list_invoice_summaries filters by from_date and to_date"""
     from datetime import timedelta
     now = datetime.now(timezone.utc)
     from_date = now - timedelta(days=30)
     to_date = now + timedelta(days=1)
-    result = get_all_invoices(db_session, from_date=from_date, to_date=to_date)
-    assert isinstance(result, list)
+    result = list_invoice_summaries(db_session, parse_invoice_fields(None), from_date=from_date, to_date=to_date)
     # sample_invoice was created with issued_at=now, so it should be in range
-    ids = [inv.id for inv in result]
+    ids = [inv["id"] for inv in result["items"]]
     assert sample_invoice.id in ids
+
+
+def test_invoice_detail_fast_path_matches_model_json(db_session, sample_invoice):
+    """Test the Core detail payload is byte-identical to serializing InvoiceResponse"""
+    from app.api.schemas.payment import PaymentCreate
+    from app.api.services.payment_service import record_payment
+    record_payment(db_session, sample_invoice.id, PaymentCreate(amount="125.50"))
+    record_payment(db_session, sample_invoice.id, PaymentCreate(amount="0.01"))
+
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+    from app.db.models.invoice import Invoice
+    invoice = db_session.scalar(
+        select(Invoice).where(Invoice.id == sample_invoice.id).options(selectinload(Invoice.payments))
+    )
+    orm_json = InvoiceResponse.model_validate(invoice).model_dump_json()
+    assert invoice_json.dump_json(get_invoice_detail(db_session, sample_invoice.id)).decode() == orm_json
+    assert get_invoice_detail(db_session, 99999) is None
+
+
+def test_invoice_summary_fast_path_matches_model_json(db_session, sample_invoice, sample_draft_invoice):
+    """Test list rows serialize exactly as the InvoiceSummary model would"""
+    page = list_invoice_summaries(db_session, parse_invoice_fields(None), include_payments=True, limit=10)
+    items = json.loads(invoice_page_json.dump_json(page))["items"]
+    assert items == [json.loads(InvoiceSummary(**row).model_dump_json(exclude_unset=True)) for row in page["items"]]
+    assert {item["id"] for item in items} == {sample_invoice.id, sample_draft_invoice.id}
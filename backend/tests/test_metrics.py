@@ -0,0 +1,65 @@
+from app.core.metrics import (
+    Counter,
+    Histogram,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUEST_SQL_STATEMENTS,
+    INVOICES_POSTED,
+    PAYMENTS_RECORDED,
+    PAYMENT_REJECTIONS,
+)
+
+
+def test_histogram_exposition_is_cumulative():
+    """Test histogram buckets, sum and count render in Prometheus text format"""
+    histogram = Histogram("demo_seconds", "Demo", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5, route="/a")
+    lines = histogram.collect()
+    assert "# TYPE demo_seconds histogram" in lines
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+
+
+def test_counter_escapes_label_values():
+    """Test label values are escaped"""
+    counter = Counter("demo_total", "Demo", ("reason",))
+    counter.inc(reason='say "hi"')
+    assert 'demo_total{reason="say \\"hi\\""} 1' in counter.collect()
+
+
+def test_metrics_endpoint_records_routes_and_sql(client, sample_invoice):
+    """Test requests are recorded per route template with their SQL statement counts"""
+    route = "/invoices/{invoice_id}"
+    before = HTTP_REQUEST_DURATION.count(method="GET", route=route, status="200")
+    client.get(f"/invoices/{sample_invoice.id}")
+    assert HTTP_REQUEST_DURATION.count(method="GET", route=route, status="200") == before + 1
+    assert HTTP_REQUEST_SQL_STATEMENTS.count(method="GET", route=route) >= 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/invoices/{invoice_id}",status="200"' in body
+    assert "sql_statement_duration_seconds_count" in body
+    assert 'db_pool_checked_out{engine="sync"}' in body
+
+
+def test_business_counters(client, sample_invoice, sample_draft_invoice):
+    """Test payment, rejection and posting counters move with the service calls"""
+    recorded = PAYMENTS_RECORDED.value()
+    overpayments = PAYMENT_REJECTIONS.value(reason="overpayment")
+    drafts = PAYMENT_REJECTIONS.value(reason="draft")
+    posted = INVOICES_POSTED.value()
+
+    client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "100.00"})
+    client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "5000.00"})
+    client.post(f"/invoices/{sample_draft_invoice.id}/payments", json={"amount": "1.00"})
+    client.post(f"/invoices/{sample_draft_invoice.id}/post")
+
+    assert PAYMENTS_RECORDED.value() == recorded + 1
+    assert PAYMENT_REJECTIONS.value(reason="overpayment") == overpayments + 1
+    assert PAYMENT_REJECTIONS.value(reason="draft") == drafts + 1
+    assert INVOICES_POSTED.value() == posted + 1
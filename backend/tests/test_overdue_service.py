@@ -0,0 +1,95 @@
+import io
+from datetime import datetime, timedelta, timezone
+
+from app.api.services.overdue_service import sweep_overdue_invoices
+from app.core.metrics import INVOICES_MARKED_OVERDUE, JOB_RUNS
+from app.db.models.invoice import Invoice, InvoiceStatus
+from app.worker import Job, Worker
+
+
+NOW = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def _invoice(db_session, customer, status=InvoiceStatus.PENDING, due_in_days=-1):
+    invoice = Invoice(
+        customer_id=customer.id,
+        amount=100,
+        currency="USD",
+        issued_at=NOW - timedelta(days=60),
+        due_at=NOW + timedelta(days=due_in_days),
+        status=status,
+    )
+    db_session.add(invoice)
+    db_session.commit()
+    return invoice.id
+
+
+def _overdue_ids(db_session) -> set[int]:
+    db_session.expire_all()
+    return {i.id for i in db_session.query(Invoice).filter(Invoice.overdue_at.is_not(None))}
+
+
+def test_sweep_flags_only_pending_invoices_past_due(db_session, sample_customer):
+    """Test the sweep sets overdue_at on PENDING invoices past due_at and nothing else"""
+    overdue = _invoice(db_session, sample_customer)
+    _invoice(db_session, sample_customer, due_in_days=1)
+    for status in (InvoiceStatus.DRAFT, InvoiceStatus.PAID, InvoiceStatus.VOID):
+        _invoice(db_session, sample_customer, status=status)
+
+    result = sweep_overdue_invoices(db_session, now=NOW, pause=0)
+    assert (result.marked, result.batches) == (1, 1)
+    assert _overdue_ids(db_session) == {overdue}
+
+    again = sweep_overdue_invoices(db_session, now=NOW, pause=0)
+    assert again.marked == 0
+
+
+def test_sweep_works_in_batches_and_resumes(db_session, sample_customer):
+    """Test each batch commits on its own, so a stopped sweep resumes where it left off"""
+    ids = [_invoice(db_session, sample_customer, due_in_days=-d) for d in range(1, 6)]
+    before = INVOICES_MARKED_OVERDUE.value()
+
+    # Stop requested after the first batch
+    stop_checks = iter([False, True])
+    stopped = sweep_overdue_invoices(
+        db_session, now=NOW, batch_size=2, pause=0, should_stop=lambda: next(stop_checks)
+    )
+    assert (stopped.marked, stopped.batches) == (2, 1)
+    # Oldest due dates first
+    assert _overdue_ids(db_session) == set(ids[3:])
+
+    resumed = sweep_overdue_invoices(db_session, now=NOW, batch_size=2, pause=0)
+    assert (resumed.marked, resumed.batches) == (3, 2)
+    assert _overdue_ids(db_session) == set(ids)
+    assert INVOICES_MARKED_OVERDUE.value() - before == 5
+
+
+def test_sweep_evicts_cached_invoice_detail(client, db_session, sample_customer):
+    """Test a cached GET /invoices/{id} reflects overdue_at after the sweep"""
+    invoice_id = _invoice(db_session, sample_customer)
+    assert client.get(f"/invoices/{invoice_id}").json()["overdue_at"] is None
+
+    sweep_overdue_invoices(db_session, now=NOW, pause=0)
+    detail = client.get(f"/invoices/{invoice_id}").json()
+    assert detail["overdue_at"] is not None
+    [row] = client.get("/invoices?fields=overdue_at").json()["items"]
+    assert row["overdue_at"] == detail["overdue_at"]
+
+
+def test_worker_run_once_reports_each_job(db_session):
+    """Test a failing job is reported and counted without stopping the others"""
+    def broken(db, should_stop):
+        raise RuntimeError("boom")
+
+    out = io.StringIO()
+    worker = Worker(
+        [Job("broken", broken, 60), Job("fine", lambda db, should_stop: "nothing to do", 60)],
+        session_factory=lambda: db_session,
+        out=out,
+    )
+    errors = JOB_RUNS.value(job="broken", outcome="error")
+
+    assert worker.run_once() is False
+    assert "✗ broken failed: boom" in out.getvalue()
+    assert "✓ fine: nothing to do" in out.getvalue()
+    assert JOB_RUNS.value(job="broken", outcome="error") == errors + 1
@@ -0,0 +1,227 @@
+import os
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, selectinload
+
+from app.api.schemas.invoice import InvoiceCreate
+from app.api.schemas.payment import BatchPaymentItem, PaymentCreate
+from app.api.services.invoice_service import (
+    apply_invoice_filters,
+    create_invoice,
+    get_invoice_detail,
+    invoice_detail_query,
+    paginate_invoices,
+    payments_for_invoices_query,
+)
+from app.api.services.pagination import encode_cursor
+from app.api.services.partition_service import ensure_partitions, partitioned_tables
+from app.api.services.payment_service import record_payment, record_payments_batch
+from app.db.models.invoice import Invoice, InvoiceStatus
+from app.db.models.payment import Payment
+
+
+# An empty scratch PostgreSQL database; the migration test empties it again
+MIGRATION_URL = os.environ.get("MIGRATION_TEST_DATABASE_URL")
+ALEMBIC_DIR = Path(__file__).resolve().parent.parent / "alembic"
+BEFORE_PARTITIONING = "3e1b7f9a4c62"
+PARTITIONING = "4a6c2e8d1b73"
+# Two invoices a month, January to April 2025, each with one payment
+SEED_MONTHS = (1, 2, 3, 4)
+
+
+def test_ensure_partitions_is_a_noop_when_unpartitioned(db_session):
+    """Test partition maintenance does nothing on a database without partitioned tables"""
+    assert partitioned_tables(db_session) == []
+    assert ensure_partitions(db_session, months_ahead=3) == 0
+
+
+def test_invoice_cursor_bounds_partition_key(db_session):
+    """Test a keyset page carries a plain issued_at bound, which partition pruning can use"""
+    cursor = encode_cursor(datetime(2025, 3, 1, tzinfo=timezone.utc), 42)
+    sql = str(paginate_invoices(select(Invoice.id), limit=10, cursor=cursor).compile(dialect=postgresql.dialect()))
+    assert "invoices.issued_at <= %(issued_at_1)s" in sql
+    assert "(invoices.issued_at, invoices.id) < (" in sql
+
+
+def test_payments_carry_invoice_issued_at(db_session, sample_invoice):
+    """Test single and batch payments are stored with their invoice's issued_at, the shared partition key"""
+    record_payment(db_session, sample_invoice.id, PaymentCreate(amount=Decimal("10.00")))
+    record_payments_batch(db_session, [BatchPaymentItem(invoice_id=sample_invoice.id, amount=Decimal("20.00"))])
+
+    issued_at = db_session.scalars(select(Payment.invoice_issued_at)).all()
+    assert issued_at == [sample_invoice.issued_at] * 2
+
+
+def test_payment_loads_join_on_partition_key(db_session, sample_invoice):
+    """Test relationship loads, the detail join and page payment queries filter payments on the partition key"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        db_session.expunge_all()
+        db_session.scalars(select(Invoice).options(selectinload(Invoice.payments))).all()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert "invoices_1.issued_at = payments.invoice_issued_at" in statements[-1]
+
+    detail = str(invoice_detail_query(sample_invoice.id))
+    assert "payments.invoice_issued_at = invoices.issued_at" in detail
+    page = str(payments_for_invoices_query([sample_invoice.id], [sample_invoice.issued_at]))
+    assert "payments.invoice_issued_at IN" in page
+
+
+@pytest.fixture
+def migration_db(monkeypatch):
+    """An Alembic config and engine on MIGRATION_TEST_DATABASE_URL"""
+    if not MIGRATION_URL:
+        pytest.skip("MIGRATION_TEST_DATABASE_URL not set")
+    # env.py takes the URL from DATABASE_URL; no ini file, so test logging is left alone
+    monkeypatch.setenv("DATABASE_URL", MIGRATION_URL)
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    engine = create_engine(MIGRATION_URL)
+    try:
+        yield config, engine
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA public CASCADE"))
+            conn.execute(text("CREATE SCHEMA public"))
+        engine.dispose()
+
+
+def _seed_unpartitioned(conn) -> None:
+    customer_id = conn.scalar(text("INSERT INTO customers (name) VALUES ('Partitioned') RETURNING id"))
+    for month in SEED_MONTHS:
+        for day in (5, 20):
+            invoice_id = conn.scalar(
+                text("""
+                    INSERT INTO invoices (customer_id, amount, currency, amount_paid, issued_at, due_at, status)
+                    VALUES (:customer_id, 100, 'USD', 10, :issued_at, :issued_at + interval '30 days', 'PENDING')
+                    RETURNING id
+                """),
+                {"customer_id": customer_id, "issued_at": datetime(2025, month, day, tzinfo=timezone.utc)},
+            )
+            conn.execute(
+                text("INSERT INTO payments (invoice_id, amount, paid_at) VALUES (:invoice_id, 10, now())"),
+                {"invoice_id": invoice_id},
+            )
+
+
+def _counts(conn) -> tuple[int, int]:
+    return conn.execute(text("SELECT (SELECT count(*) FROM invoices), (SELECT count(*) FROM payments)")).one()
+
+
+def _plan_relations(conn, query) -> set[str]:
+    """The tables and partitions a query's plan reads"""
+    compiled = query.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    nodes = [plan[0]["Plan"]]
+    relations = set()
+    while nodes:
+        node = nodes.pop()
+        if "Relation Name" in node:
+            relations.add(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return relations
+
+
+def _partition_of(conn, table: str, row_id: int) -> str:
+    return conn.scalar(text(f"SELECT tableoid::regclass::text FROM {table} WHERE id = :id"), {"id": row_id})
+
+
+def test_partition_migration_round_trip(migration_db):
+    """Test the partitioning migration on PostgreSQL: data moves, pruning, cascades, new partitions and downgrade"""
+    config, engine = migration_db
+    command.upgrade(config, BEFORE_PARTITIONING)
+    with engine.begin() as conn:
+        _seed_unpartitioned(conn)
+
+    command.upgrade(config, PARTITIONING)
+    with Session(engine) as db:
+        assert partitioned_tables(db) == ["invoices", "payments"]
+        conn = db.connection()
+        assert _counts(conn) == (8, 8)
+        assert conn.scalar(text(
+            "SELECT count(*) FROM payments p JOIN invoices i"
+            " ON i.id = p.invoice_id AND i.issued_at = p.invoice_issued_at"
+        )) == 8
+        this_month = datetime.now(timezone.utc).replace(day=1)
+        last_created = (this_month + timedelta(days=31 * 3)).strftime("%Y%m")
+        for name in ("invoices_p202501", "payments_p202504", f"invoices_p{last_created}", "payments_default"):
+            assert conn.scalar(text("SELECT to_regclass(:name)"), {"name": name}) is not None
+
+        # A February list page and its payments read February's partitions only
+        page = paginate_invoices(
+            apply_invoice_filters(
+                select(Invoice.id),
+                from_date=datetime(2025, 2, 1, tzinfo=timezone.utc),
+                to_date=datetime(2025, 2, 28, 23, 59, tzinfo=timezone.utc),
+            ),
+            limit=50,
+        )
+        assert _plan_relations(conn, page) == {"invoices_p202502"}
+        february = [datetime(2025, 2, 5, tzinfo=timezone.utc), datetime(2025, 2, 20, tzinfo=timezone.utc)]
+        assert _plan_relations(conn, payments_for_invoices_query([1, 2, 3], february)) == {"payments_p202502"}
+
+        # Writes through the services land in the invoice's month, or the default partition
+        customer_id = conn.scalar(text("SELECT min(id) FROM customers"))
+        march = datetime(2025, 3, 10, tzinfo=timezone.utc)
+        created = create_invoice(db, InvoiceCreate(
+            customer_id=customer_id, amount="50.00", currency="USD", status=InvoiceStatus.PENDING,
+            issued_at=march, due_at=march + timedelta(days=30),
+        ))
+        payment = record_payment(db, created.id, PaymentCreate(amount=Decimal("20.00")))
+        old = datetime(2019, 6, 1, tzinfo=timezone.utc)
+        stray = create_invoice(db, InvoiceCreate(
+            customer_id=customer_id, amount="50.00", currency="USD", issued_at=old, due_at=old + timedelta(days=30),
+        ))
+        conn = db.connection()
+        assert _partition_of(conn, "invoices", created.id) == "invoices_p202503"
+        assert _partition_of(conn, "payments", payment.id) == "payments_p202503"
+        assert _partition_of(conn, "invoices", stray.id) == "invoices_default"
+        assert get_invoice_detail(db, created.id)["amount_paid"] == Decimal("20.00")
+
+        # issued_at changes carry payments to the new month; deletes take them along
+        moved_id, deleted_id = conn.execute(text(
+            "SELECT min(id), max(id) FROM invoices WHERE issued_at >= '2025-01-01' AND issued_at < '2025-02-01'"
+        )).one()
+        conn.execute(text("UPDATE invoices SET issued_at = '2025-04-25+00' WHERE id = :id"), {"id": moved_id})
+        moved = conn.execute(
+            text("SELECT tableoid::regclass::text, invoice_issued_at FROM payments WHERE invoice_id = :id"),
+            {"id": moved_id},
+        ).one()
+        assert moved == ("payments_p202504", datetime(2025, 4, 25, tzinfo=timezone.utc))
+        conn.execute(text("DELETE FROM invoices WHERE id = :id"), {"id": deleted_id})
+        assert conn.scalar(text("SELECT count(*) FROM payments WHERE invoice_id = :id"), {"id": deleted_id}) == 0
+        db.commit()
+
+        assert ensure_partitions(db, months_ahead=3) == 0
+        assert ensure_partitions(db, months_ahead=4) == 2
+        counts = _counts(db.connection())
+        assert counts == (9, 8)
+
+    command.downgrade(config, BEFORE_PARTITIONING)
+    with Session(engine) as db:
+        assert partitioned_tables(db) == []
+        conn = db.connection()
+        assert _counts(conn) == counts
+        assert conn.scalar(text("SELECT to_regproc('create_monthly_partitions')")) is None
+        assert conn.scalar(text(
+            "SELECT confdeltype FROM pg_constraint WHERE conname = 'payments_invoice_id_fkey'"
+        )) == "c"
+
+    command.upgrade(config, PARTITIONING)
+    with engine.connect() as conn:
+        assert _counts(conn) == counts
+        assert _partition_of(conn, "invoices", stray.id) == "invoices_p201906"
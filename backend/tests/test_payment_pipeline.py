@@ -0,0 +1,99 @@
+import time
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import invoices
+from app.api.schemas.payment import PaymentCreate
+from app.api.services.payment_pipeline import PaymentPipeline
+from app.api.services.payment_service import PaymentError
+from app.core.config import settings
+from app.core.metrics import PAYMENT_GROUP_COMMIT_BATCH_SIZE
+from app.db.models.invoice import InvoiceStatus
+
+
+def _pipeline(db_session, **kwargs) -> PaymentPipeline:
+    return PaymentPipeline(sessionmaker(bind=db_session.get_bind(), autoflush=False), **kwargs)
+
+
+def test_pipeline_records_a_full_batch_in_one_commit(db_session, sample_invoice):
+    """Test payments queued together are applied in order under one commit, each caller getting its own result"""
+    pipeline = _pipeline(db_session, flush_interval=10.0, max_batch=12)
+    batches = PAYMENT_GROUP_COMMIT_BATCH_SIZE.count()
+    futures = [pipeline.submit(sample_invoice.id, PaymentCreate(amount=Decimal("100.00"))) for _ in range(12)]
+
+    recorded = [f.result(timeout=5) for f in futures[:10]]
+    assert len({payment.id for payment in recorded}) == 10
+    for future in futures[10:]:
+        with pytest.raises(PaymentError, match="status PAID"):
+            future.result(timeout=5)
+    pipeline.close()
+
+    assert PAYMENT_GROUP_COMMIT_BATCH_SIZE.count() - batches == 1
+    db_session.refresh(sample_invoice)
+    assert sample_invoice.amount_paid == Decimal("1000.00")
+    assert sample_invoice.status == InvoiceStatus.PAID
+
+
+def test_pipeline_flushes_after_interval(db_session, sample_invoice):
+    """Test a lone payment waits at most the flush interval, and close() stops the flusher"""
+    pipeline = _pipeline(db_session, flush_interval=0.02, max_batch=100)
+    started = time.monotonic()
+    payment = pipeline.record(sample_invoice.id, PaymentCreate(amount=Decimal("5.00")))
+    assert time.monotonic() - started < 2
+    assert payment.invoice_id == sample_invoice.id
+    assert payment.paid_at is not None
+
+    with pytest.raises(PaymentError, match="not found"):
+        pipeline.record(99999, PaymentCreate(amount=Decimal("5.00")))
+    pipeline.close()
+    with pytest.raises(RuntimeError):
+        pipeline.submit(sample_invoice.id, PaymentCreate(amount=Decimal("5.00")))
+
+
+def test_payment_endpoint_uses_pipeline_when_enabled(client, db_session, sample_invoice, monkeypatch):
+    """Test POST /invoices/{id}/payments goes through the pipeline with group commit on"""
+    pipeline = _pipeline(db_session, flush_interval=0.001)
+    monkeypatch.setattr(settings, "payment_group_commit", True)
+    monkeypatch.setattr(invoices, "payment_pipeline", pipeline)
+    batches = PAYMENT_GROUP_COMMIT_BATCH_SIZE.count()
+
+    response = client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "250.00"})
+    assert response.status_code == 201
+    assert response.json()["amount"] == "250.00"
+    overpaid = client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "5000.00"})
+    assert overpaid.status_code == 400
+    pipeline.close()
+
+    assert PAYMENT_GROUP_COMMIT_BATCH_SIZE.count() - batches == 2
+    assert client.get(f"/invoices/{sample_invoice.id}").json()["amount_paid"] == "250.00"
+
+
+def test_pipeline_fails_the_batch_and_keeps_flushing(db_session, sample_invoice):
+    """Test an error outside record_payments_batch fails that batch's callers, not later ones"""
+    factory = sessionmaker(bind=db_session.get_bind(), autoflush=False)
+    calls = []
+
+    def flaky_factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("no connection")
+        return factory()
+
+    pipeline = PaymentPipeline(flaky_factory, flush_interval=0.001)
+    with pytest.raises(RuntimeError, match="no connection"):
+        pipeline.record(sample_invoice.id, PaymentCreate(amount=Decimal("5.00")))
+    assert pipeline.record(sample_invoice.id, PaymentCreate(amount=Decimal("5.00"))).amount == Decimal("5.00")
+    pipeline.close()
+
+
+def test_payment_endpoint_times_out_with_503(client, db_session, sample_invoice, monkeypatch):
+    """Test a request whose batch does not finish within the timeout gets 503"""
+    pipeline = _pipeline(db_session, flush_interval=10.0, timeout=0.01)
+    monkeypatch.setattr(settings, "payment_group_commit", True)
+    monkeypatch.setattr(invoices, "payment_pipeline", pipeline)
+
+    response = client.post(f"/invoices/{sample_invoice.id}/payments", json={"amount": "250.00"})
+    assert response.status_code == 503
+    pipeline.close()
@@ -2,15 +2,15 @@ import pytest
 from decimal import Decimal
 from pydantic import ValidationError
 
-from app.api.services.payment_service import record_payment, PaymentError, calculate_total_paid
+from app.api.services.payment_service import record_payment, PaymentError, find_amount_paid_mismatches
 from app.api.schemas.payment import PaymentCreate
 from app.db.models.invoice import InvoiceStatus
 
 
-def test_calculate_total_paid_empty(db_session, sample_invoice):
-    """Test calculating total paid when no payments exist"""
-    total = calculate_total_paid(db_session, sample_invoice.id)
-    assert total == Decimal("0")
+def test_amount_paid_starts_at_zero(db_session, sample_invoice):
+    """Test an invoice with no payments has nothing paid and its full amount due"""
+    assert sample_invoice.amount_paid == Decimal("0")
+    assert sample_invoice.balance_due == sample_invoice.amount
 
 
 def test_record_payment_success(db_session, sample_invoice):
@@ -137,5 +137,82 @@ def test_record_payment_multiple_partial_payments(db_session, sample_invoice):
     db_session.refresh(sample_invoice)
     assert sample_invoice.status == InvoiceStatus.PAID
     
-    total = calculate_total_paid(db_session, sample_invoice.id)
-    assert total == Decimal("1000.00")
\ No newline at end of file
+    assert sample_invoice.amount_paid == Decimal("1000.00")
+
+def test_record_payment_maintains_amount_paid(db_session, sample_invoice):
+    """Test that amount_paid and balance_due track recorded payments"""
+    record_payment(db_session, sample_invoice.id, PaymentCreate(amount=Decimal("300.00")))
+    record_payment(db_session, sample_invoice.id, PaymentCreate(amount=Decimal("200.00")))
+
+    db_session.refresh(sample_invoice)
+    assert sample_invoice.amount_paid == Decimal("500.00")
+    assert sample_invoice.balance_due == Decimal("500.00")
+    assert find_amount_paid_mismatches(db_session) == []
+
+
+def test_find_amount_paid_mismatches_and_recalculate(db_session, sample_invoice):
+    """Test the consistency checker detects and repairs drift between amount_paid and payments"""
+    from app.db.models.payment import Payment
+    from app.api.services.payment_service import recalculate_amount_paid
+    from datetime import datetime, timezone
+
+    record_payment(db_session, sample_invoice.id, PaymentCreate(amount=Decimal("100.00")))
+    assert find_amount_paid_mismatches(db_session) == []
+
+    # A payment written behind the service's back leaves the cached total stale
+    db_session.add(Payment(
+        invoice_id=sample_invoice.id,
+        invoice_issued_at=sample_invoice.issued_at,
+        amount=Decimal("50.00"),
+        paid_at=datetime.now(timezone.utc),
+    ))
+    db_session.commit()
+    assert find_amount_paid_mismatches(db_session) == [
+        (sample_invoice.id, Decimal("100.00"), Decimal("150.00"))
+    ]
+
+    assert recalculate_amount_paid(db_session) >= 1
+    db_session.commit()
+    assert find_amount_paid_mismatches(db_session) == []
+    db_session.refresh(sample_invoice)
+    assert sample_invoice.amount_paid == Decimal("150.00")
+
+
+def test_recalculate_amount_paid_settles_status_and_aging(db_session, sample_invoice):
+    """Test a repaired total moves the invoice between PENDING and PAID, and the rebuilt aging follows"""
+    from app.db.models.aging import ReceivableAging
+    from app.db.models.payment import Payment
+    from app.api.services.aging_service import rebuild_aging
+    from app.api.services.payment_service import recalculate_amount_paid
+    from datetime import datetime, timezone
+
+    record_payment(db_session, sample_invoice.id, PaymentCreate(amount=Decimal("100.00")))
+    # The rest of the invoice paid behind the service's back
+    missing = Payment(
+        invoice_id=sample_invoice.id,
+        invoice_issued_at=sample_invoice.issued_at,
+        amount=Decimal("900.00"),
+        paid_at=datetime.now(timezone.utc),
+    )
+    db_session.add(missing)
+    db_session.commit()
+
+    recalculate_amount_paid(db_session, [sample_invoice.id])
+    rebuild_aging(db_session)
+    db_session.commit()
+    db_session.refresh(sample_invoice)
+    assert sample_invoice.amount_paid == Decimal("1000.00")
+    assert sample_invoice.status == InvoiceStatus.PAID
+    assert db_session.query(ReceivableAging).all() == []
+
+    # And back: the payment is removed, leaving a balance due
+    db_session.delete(missing)
+    db_session.commit()
+    recalculate_amount_paid(db_session, [sample_invoice.id])
+    rebuild_aging(db_session)
+    db_session.commit()
+    db_session.refresh(sample_invoice)
+    assert sample_invoice.amount_paid == Decimal("100.00")
+    assert sample_invoice.status == InvoiceStatus.PENDING
+    [row] = db_session.query(ReceivableAging).all()
+    assert (row.balance, row.invoice_count) == (Decimal("900.00"), 1)
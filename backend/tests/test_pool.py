@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool
+
+from app.core.config import Settings
+from app.db.pool import (
+    InstrumentedQueuePool,
+    instrument_pool,
+    pool_options,
+    pool_status,
+)
+
+
+TEST_POOL_URL = "sqlite:///./test.db"
+
+
+def test_pool_options_from_settings():
+    """Test pool sizing, timeout, recycle and pre-ping strategy come from settings"""
+    settings = Settings(
+        db_pool_size=3,
+        db_max_overflow=1,
+        db_pool_timeout=2.5,
+        db_pool_recycle=600,
+        db_pool_pre_ping="optimistic",
+    )
+    options = pool_options(settings, TEST_POOL_URL)
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == 1
+    assert options["pool_timeout"] == 2.5
+    assert options["pool_recycle"] == 600
+    assert options["pool_pre_ping"] is False
+
+
+def test_pool_options_null_pool_and_pgbouncer():
+    """Test null pool mode and PgBouncer-safe asyncpg connect args"""
+    settings = Settings(db_pool_mode="null", db_pgbouncer=True)
+    options = pool_options(settings, "postgresql+asyncpg://u:p@localhost/db", is_async=True)
+    assert options["poolclass"] is NullPool
+    assert "pool_size" not in options
+    assert options["connect_args"]["statement_cache_size"] == 0
+    name_func = options["connect_args"]["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+    sync_options = pool_options(settings, "postgresql+psycopg2://u:p@localhost/db")
+    assert "connect_args" not in sync_options
+
+
+def test_pool_metrics_track_checkouts_overflow_and_timeouts(db_session):
+    """Test checkout counts, overflow use, wait time and timeouts are recorded"""
+    settings = Settings(db_pool_size=1, db_max_overflow=1, db_pool_timeout=0.05)
+    engine = create_engine(TEST_POOL_URL, **pool_options(settings, TEST_POOL_URL))
+    metrics = instrument_pool(engine)
+    try:
+        first = engine.connect()
+        second = engine.connect()  # uses the single overflow slot
+        status = pool_status(engine)
+        assert status["checked_out"] == 2
+        assert status["overflow"] == 1
+        assert status["overflow_checkouts"] == 1
+
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        assert metrics.checkout_timeouts == 1
+        assert metrics.checkout_wait_seconds_max >= 0.05
+
+        second.close()
+        first.invalidate()
+        first.close()
+        status = pool_status(engine)
+        assert status["checkouts"] == 2
+        assert status["checkins"] == 2
+        assert status["invalidations"] == 1
+        assert status["checked_out"] == 0
+    finally:
+        engine.dispose()
+
+
+def test_pool_health_endpoint(client):
+    """Test the pool health endpoint reports the application pool"""
+    response = client.get("/health/pool")
+    assert response.status_code == 200
+    assert "checked_out" in response.json()["sync"]
@@ -0,0 +1,262 @@
+"""
+Query-plan regression tests for the invoice list filters and customer search.
+
+Every combination of status / customer / issued_at range, first page and
+cursor page, must be answered by walking an index in ORDER BY order: no full
+table scan, no sort step, and when anything is filtered the index range must
+be bounded by a filter (not a full index walk discarding rows one by one).
+The same holds for customer listing and prefix search, the overdue sweep
+and changed_since sync.
+
+PostgreSQL costs plans, so two cheaper shapes are accepted there: a bounded
+index range estimated at no more than a page, fetched by bitmap and then
+sorted, and an ordered walk whose filter keeps most rows (status=PAID).
+Plans are checked on SQLite always, and on PostgreSQL when
+PLAN_TEST_DATABASE_URL points at an empty scratch database (its tables are
+created and dropped by the test).
+"""
+import itertools
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.db.models.customer import Customer
+from app.db.models.invoice import Invoice, InvoiceStatus
+from app.db.models.invoice_tombstone import InvoiceTombstone
+from app.api.services.customer_service import PREFIX_TIER, customer_search_queries
+from app.api.services.invoice_service import (
+    apply_invoice_filters,
+    invoice_changes_queries,
+    paginate_invoices,
+    transition_targets_query,
+)
+from app.api.services.overdue_service import overdue_batch_query
+from app.api.services.pagination import DEFAULT_PAGE_SIZE, SYNC_START_TOKEN, encode_cursor
+
+
+PG_URL = os.environ.get("PLAN_TEST_DATABASE_URL")
+BASE_TIME = datetime(2020, 1, 1, tzinfo=timezone.utc)
+CUSTOMERS = 200
+# Invoices only reference the first CUSTOMERS; the rest are there for search plans
+SEARCH_CUSTOMERS = 20_000
+# Deleted drafts, so changed_since plans are not over an empty table
+TOMBSTONES = 2_000
+# Every query here fetches at most one page
+PAGE = DEFAULT_PAGE_SIZE + 1
+# Roughly a mature ledger: mostly settled history, a working set of open invoices
+STATUS_WEIGHTS = {
+    InvoiceStatus.PAID: 60,
+    InvoiceStatus.PENDING: 25,
+    InvoiceStatus.VOID: 10,
+    InvoiceStatus.DRAFT: 5,
+}
+
+
+def _seed(engine, rows: int) -> None:
+    rng = random.Random(42)
+    statuses = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=rows)
+    with engine.begin() as conn:
+        conn.execute(insert(Customer), [{"name": f"Customer {i}"} for i in range(SEARCH_CUSTOMERS)])
+        for start in range(0, rows, 10_000):
+            conn.execute(insert(Invoice), [
+                {
+                    "customer_id": rng.randint(1, CUSTOMERS),
+                    "amount": 100,
+                    "currency": "USD",
+                    "amount_paid": 0,
+                    "issued_at": BASE_TIME + timedelta(hours=i),
+                    "due_at": BASE_TIME + timedelta(hours=i, days=30),
+                    "status": statuses[i],
+                }
+                for i in range(start, min(start + 10_000, rows))
+            ])
+        conn.execute(insert(InvoiceTombstone), [
+            {"invoice_id": rows + i + 1, "deleted_at": BASE_TIME} for i in range(TOMBSTONES)
+        ])
+        conn.execute(text("ANALYZE"))
+
+
+@pytest.fixture(scope="module", params=["sqlite", "postgresql"])
+def plan_engine(request):
+    """An engine over a seeded, analyzed invoices table"""
+    if request.param == "sqlite":
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        rows = 20_000
+    else:
+        if not PG_URL:
+            pytest.skip("PLAN_TEST_DATABASE_URL not set")
+        engine = create_engine(PG_URL)
+        rows = 200_000
+    Base.metadata.create_all(engine)
+    try:
+        _seed(engine, rows)
+        yield engine
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def _sqlite_problems(conn, sql: str, filtered: bool, table: str = "invoices") -> list[str]:
+    details = [row[3] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return [
+        detail for detail in details
+        if detail.startswith("USE TEMP B-TREE")
+        or detail == f"SCAN {table}"
+        or (filtered and detail.startswith(f"SCAN {table}"))
+    ]
+
+
+def _pg_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _pg_nodes(child)
+
+
+def _pg_bounded_page(node: dict) -> bool:
+    """A sort over at most a page of rows, all read from a bounded index range"""
+    scans = [n for n in _pg_nodes(node) if "Scan" in n["Node Type"]]
+    return node["Plan Rows"] <= PAGE and all(
+        "Index Cond" in n for n in scans if n["Node Type"] != "Bitmap Heap Scan"
+    )
+
+
+def _pg_problems(conn, sql: str, filtered: bool, table: str = "invoices") -> list[str]:
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    table_rows = conn.execute(
+        text("SELECT reltuples FROM pg_class WHERE relname = :table"), {"table": table}
+    ).scalar()
+    problems = []
+    for node in _pg_nodes(plan[0]["Plan"]):
+        node_type = node["Node Type"]
+        on_table = node.get("Relation Name") == table
+        if node_type in ("Sort", "Incremental Sort"):
+            if not _pg_bounded_page(node):
+                problems.append(node_type)
+        elif node_type == "Seq Scan" and on_table:
+            problems.append(f"Seq Scan {table}")
+        elif filtered and on_table and node_type.startswith("Index") and "Index Cond" not in node:
+            # Stopping early on a filter that keeps most rows costs no more than a range
+            if node["Plan Rows"] < table_rows / 2:
+                problems.append(f"{node_type} {table} without Index Cond")
+    return problems
+
+
+FILTER_COMBINATIONS = list(itertools.product(
+    [None, InvoiceStatus.PENDING, InvoiceStatus.PAID, InvoiceStatus.VOID],
+    [None, 7],
+    [None, "from", "range"],
+    [False, True],
+))
+
+
+@pytest.mark.parametrize(
+    "status,customer_id,dates,with_cursor",
+    FILTER_COMBINATIONS,
+    ids=[
+        f"status={s.value if s else '-'}-customer={c or '-'}-dates={d or '-'}-{'cursor' if cur else 'first'}"
+        for s, c, d, cur in FILTER_COMBINATIONS
+    ],
+)
+def test_invoice_list_plan_uses_index_order(plan_engine, status, customer_id, dates, with_cursor):
+    """Test the list query for this filter combination is an index range in ORDER BY order"""
+    from_date = BASE_TIME + timedelta(days=300) if dates else None
+    to_date = BASE_TIME + timedelta(days=600) if dates == "range" else None
+    cursor = encode_cursor(BASE_TIME + timedelta(days=500), 10_000) if with_cursor else None
+
+    query = apply_invoice_filters(
+        select(Invoice),
+        status=status,
+        customer_id=customer_id,
+        from_date=from_date,
+        to_date=to_date
+    )
+    query = paginate_invoices(query, limit=PAGE, cursor=cursor)
+    sql = str(query.compile(plan_engine, compile_kwargs={"literal_binds": True}))
+    filtered = any([status, customer_id, dates, cursor])
+
+    with plan_engine.connect() as conn:
+        if plan_engine.dialect.name == "sqlite":
+            problems = _sqlite_problems(conn, sql, filtered)
+        else:
+            problems = _pg_problems(conn, sql, filtered)
+    assert problems == [], f"plan falls back to {problems} for:\n{sql}"
+
+
+@pytest.mark.parametrize("term", [None, "customer 12"])
+@pytest.mark.parametrize("with_cursor", [False, True], ids=["first", "cursor"])
+def test_customer_search_plan_uses_index_order(plan_engine, term, with_cursor):
+    """Test the name listing and the prefix tier are index ranges in (key, id) order"""
+    cursor = encode_cursor(PREFIX_TIER, "customer 1234", 1235) if with_cursor else None
+    [(tier, query)] = [q for q in customer_search_queries(term, cursor) if q[0] == PREFIX_TIER]
+    query = query.limit(PAGE)
+    sql = str(query.compile(plan_engine, compile_kwargs={"literal_binds": True}))
+    filtered = bool(term or cursor)
+
+    with plan_engine.connect() as conn:
+        if plan_engine.dialect.name == "sqlite":
+            problems = _sqlite_problems(conn, sql, filtered, table="customers")
+        else:
+            problems = _pg_problems(conn, sql, filtered, table="customers")
+    assert problems == [], f"plan falls back to {problems} for:\n{sql}"
+
+
+@pytest.mark.parametrize("with_cursor", [False, True], ids=["first", "cursor"])
+def test_overdue_sweep_batch_plan_uses_partial_index(plan_engine, with_cursor):
+    """Test a sweep batch is a range of the partial overdue index in (due_at, id) order"""
+    now = BASE_TIME + timedelta(days=400)
+    after = (BASE_TIME + timedelta(days=100), 2_400) if with_cursor else None
+    query = overdue_batch_query(now, 500, after)
+    sql = str(query.compile(plan_engine, compile_kwargs={"literal_binds": True}))
+
+    with plan_engine.connect() as conn:
+        if plan_engine.dialect.name == "sqlite":
+            problems = _sqlite_problems(conn, sql, filtered=True)
+            details = [row[3] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+            assert any("ix_invoices_overdue_sweep" in detail for detail in details), details
+        else:
+            problems = _pg_problems(conn, sql, filtered=True)
+    assert problems == [], f"plan falls back to {problems} for:\n{sql}"
+
+
+@pytest.mark.parametrize("with_token", [False, True], ids=["start", "token"])
+def test_invoice_changes_plan_uses_row_version_index(plan_engine, with_token):
+    """Test both changed_since queries are index ranges in (row_version, id) order"""
+    with plan_engine.connect() as conn:
+        max_version = conn.execute(select(func.max(Invoice.row_version))).scalar()
+    token = encode_cursor(max_version - 100, 0) if with_token else SYNC_START_TOKEN
+    queries = invoice_changes_queries(plan_engine.dialect.name, ["id", "status"], token, PAGE)
+
+    for query, table in zip(queries, ["invoices", "invoice_tombstones"]):
+        sql = str(query.compile(plan_engine, compile_kwargs={"literal_binds": True}))
+        with plan_engine.connect() as conn:
+            if plan_engine.dialect.name == "sqlite":
+                problems = _sqlite_problems(conn, sql, filtered=True, table=table)
+            else:
+                problems = _pg_problems(conn, sql, filtered=True, table=table)
+        assert problems == [], f"plan falls back to {problems} for:\n{sql}"
+
+
+@pytest.mark.parametrize("customer_id", [None, 7])
+def test_batch_transition_targets_plan_uses_status_index(plan_engine, customer_id):
+    """Test a filtered post-batch selects its rows through a status index range, not a table scan"""
+    query = transition_targets_query(
+        InvoiceStatus.DRAFT, customer_id=customer_id, to_date=BASE_TIME + timedelta(days=300)
+    )
+    sql = str(query.compile(plan_engine, compile_kwargs={"literal_binds": True}))
+
+    with plan_engine.connect() as conn:
+        if plan_engine.dialect.name == "sqlite":
+            problems = _sqlite_problems(conn, sql, filtered=True)
+        else:
+            problems = _pg_problems(conn, sql, filtered=True)
+    # Sorting the matched ids is expected: id order is only the lock order
+    problems = [p for p in problems if not p.startswith(("USE TEMP B-TREE", "Sort", "Incremental Sort"))]
+    assert problems == [], f"plan falls back to {problems} for:\n{sql}"
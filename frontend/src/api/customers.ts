@@ -1,11 +1,25 @@
 import { api } from "./client";
-import type { Customer, Invoice, InvoiceStatus } from "./types";
+import type { Customer, CustomerPage, InvoicePage, InvoiceSummary, InvoiceStatus } from "./types";
 
-export async function getCustomers(): Promise<Customer[]> {
-  const { data } = await api.get<Customer[]>("/customers");
+export type CustomerSearchQuery = {
+  q?: string;
+  limit?: number;
+  cursor?: string;
+};
+
+/** Names starting with q first, then names containing it (q of 3+ characters) */
+export async function searchCustomers(q: CustomerSearchQuery): Promise<CustomerPage> {
+  const { data } = await api.get<CustomerPage>("/customers", { params: q });
   return data;
 }
 
+/** Look up names for the customers shown on a page (at most 200 ids) */
+export async function getCustomersByIds(ids: number[]): Promise<Customer[]> {
+  if (ids.length === 0) return [];
+  const { data } = await api.get<CustomerPage>("/customers", { params: { ids: ids.join(",") } });
+  return data.items;
+}
+
 export async function createCustomer(name: string): Promise<Customer> {
   const { data } = await api.post<Customer>("/customers", { name });
   return data;
@@ -15,11 +29,13 @@ export type CustomerInvoicesQuery = {
   status?: InvoiceStatus;
   from?: string;
   to?: string;
+  limit?: number;
+  cursor?: string;
 };
 
-export async function getCustomerInvoices(customerId: number, q: CustomerInvoicesQuery): Promise<Invoice[]> {
-  const { data } = await api.get<Invoice[]>(`/customers/${customerId}/invoices`, {
+export async function getCustomerInvoices(customerId: number, q: CustomerInvoicesQuery): Promise<InvoiceSummary[]> {
+  const { data } = await api.get<InvoicePage>(`/customers/${customerId}/invoices`, {
     params: q,
   });
-  return data;
+  return data.items;
 }
\ No newline at end of file
@@ -1,14 +1,16 @@
 import { api } from "./client";
-import type { Invoice, InvoiceCreate, InvoiceDraftUpdate, Payment, PaymentCreate, InvoiceStatus } from "./types";
+import type { Invoice, InvoicePage, InvoiceSummary, InvoiceCreate, InvoiceDraftUpdate, Payment, PaymentCreate, InvoiceStatus } from "./types";
 
 export async function getAllInvoices(params?: {
   status?: InvoiceStatus;
   customer_id?: number;
   from?: string;
   to?: string;
-}): Promise<Invoice[]> {
-  const { data } = await api.get<Invoice[]>("/invoices", { params });
-  return data;
+  limit?: number;
+  cursor?: string;
+}): Promise<InvoiceSummary[]> {
+  const { data } = await api.get<InvoicePage>("/invoices", { params });
+  return data.items;
 }
 
 export async function createInvoice(payload: InvoiceCreate): Promise<Invoice> {
@@ -0,0 +1,23 @@
+import { api } from "./client";
+import type { AgingReport, ReceivablesReport } from "./types";
+
+export type ReceivablesQuery = {
+  customer_id?: number;
+  from?: string;
+  to?: string;
+  as_of?: string;
+};
+
+export async function getReceivables(q: ReceivablesQuery = {}): Promise<ReceivablesReport> {
+  const { data } = await api.get<ReceivablesReport>("/reports/receivables", {
+    params: q,
+  });
+  return data;
+}
+
+export async function getAging(q: { customer_id?: number; as_of?: string } = {}): Promise<AgingReport> {
+  const { data } = await api.get<AgingReport>("/reports/aging", {
+    params: q,
+  });
+  return data;
+}
@@ -15,11 +15,25 @@ export type Invoice = {
   issued_at: string;
   due_at: string;
   status: InvoiceStatus;
+  amount_paid: string;  // sum of payments, kept up to date by the backend
+  balance_due: string;  // amount - amount_paid
+  overdue_at: string | null;  // set by the backend's overdue sweep once PENDING past due_at
   payments: Payment[];
   // If you add it on backend, this becomes easy:
   // customer?: { id: number; name: string };
 };
 
+/** List row: invoice header columns; payments only with include=payments */
+export type InvoiceSummary = Omit<Invoice, "payments"> & {
+  payments?: Payment[];
+};
+
+/** One page of a keyset-paginated invoice list */
+export type InvoicePage = {
+  items: InvoiceSummary[];
+  next_cursor: string | null;
+};
+
 export type InvoiceCreate = {
   customer_id: number;
   amount: string;
@@ -42,4 +56,43 @@ export type PaymentCreate = {
   paid_at?: string;
 };
 
-export type Customer = { id: number; name: string };
\ No newline at end of file
+export type Customer = { id: number; name: string };
+
+/** One page of GET /customers (search or name-ordered listing) */
+export type CustomerPage = {
+  items: Customer[];
+  next_cursor: string | null;
+};
+/** GET /reports/receivables: one row per customer and currency */
+export type ReceivablesRow = {
+  customer_id: number;
+  currency: string;
+  total_invoiced: string;
+  total_paid: string;
+  outstanding: string;
+  overdue: string;
+  invoice_counts: Record<InvoiceStatus, number>;
+};
+
+export type ReceivablesReport = {
+  as_of: string;
+  items: ReceivablesRow[];
+};
+
+/** GET /reports/aging: open balances by days past due */
+export type AgingRow = {
+  customer_id: number;
+  currency: string;
+  current: string;
+  days_1_30: string;
+  days_31_60: string;
+  days_61_90: string;
+  days_over_90: string;
+  total: string;
+  invoice_count: number;
+};
+
+export type AgingReport = {
+  as_of: string;
+  items: AgingRow[];
+};
@@ -0,0 +1,115 @@
+import { useEffect, useState } from "react";
+import { keepPreviousData, useQuery } from "@tanstack/react-query";
+import { searchCustomers } from "../api/customers";
+import type { Customer } from "../api/types";
+
+interface CustomerPickerProps {
+  value: Customer | null;
+  onChange: (customer: Customer | null) => void;
+  placeholder?: string;
+  hasError?: boolean;
+  style?: React.CSSProperties;
+}
+
+const SEARCH_DELAY_MS = 150;
+const RESULT_LIMIT = 20;
+
+/** Typeahead over GET /customers?q=: only the best matches are fetched, never the whole list */
+export default function CustomerPicker({ value, onChange, placeholder = "Search customers", hasError, style }: CustomerPickerProps) {
+  const [text, setText] = useState(value?.name ?? "");
+  const [term, setTerm] = useState("");
+  const [open, setOpen] = useState(false);
+
+  useEffect(() => {
+    setText(value?.name ?? "");
+  }, [value]);
+
+  useEffect(() => {
+    const timer = setTimeout(() => setTerm(text.trim()), SEARCH_DELAY_MS);
+    return () => clearTimeout(timer);
+  }, [text]);
+
+  const { data, isFetching } = useQuery({
+    queryKey: ["customers", "search", term],
+    queryFn: () => searchCustomers({ q: term || undefined, limit: RESULT_LIMIT }),
+    enabled: open,
+    placeholderData: keepPreviousData,
+  });
+  const results = data?.items ?? [];
+
+  const select = (customer: Customer | null) => {
+    onChange(customer);
+    setText(customer?.name ?? "");
+    setOpen(false);
+  };
+
+  return (
+    <div style={{ position: "relative", ...style }}>
+      <input
+        type="text"
+        value={text}
+        placeholder={placeholder}
+        onFocus={() => setOpen(true)}
+        onBlur={() => {
+          setOpen(false);
+          setText(value?.name ?? "");
+        }}
+        onChange={(e) => {
+          setText(e.target.value);
+          setOpen(true);
+          if (value && e.target.value === "") onChange(null);
+        }}
+        style={{
+          width: "100%",
+          padding: "6px 12px",
+          borderRadius: "6px",
+          border: hasError ? "1px solid #ef4444" : "1px solid #d1d5db",
+          boxSizing: "border-box",
+        }}
+      />
+      {open && (
+        <ul
+          style={{
+            position: "absolute",
+            zIndex: 10,
+            top: "100%",
+            left: 0,
+            right: 0,
+            margin: "4px 0 0",
+            padding: "4px 0",
+            listStyle: "none",
+            maxHeight: "240px",
+            overflowY: "auto",
+            backgroundColor: "white",
+            border: "1px solid #d1d5db",
+            borderRadius: "6px",
+            boxShadow: "0 4px 12px rgba(0, 0, 0, 0.08)",
+          }}
+        >
+          {results.map((customer) => (
+            <li
+              key={customer.id}
+              // mousedown fires before the input's blur, so the pick is not lost
+              onMouseDown={(e) => {
+                e.preventDefault();
+                select(customer);
+              }}
+              style={{
+                padding: "6px 12px",
+                cursor: "pointer",
+                backgroundColor: customer.id === value?.id ? "#f3f4f6" : undefined,
+              }}
+            >
+              {customer.name}
+            </li>
+          ))}
+          {results.length === 0 && (
+            <li style={{ padding: "6px 12px", color: "#6b7280" }}>
+              {isFetching ? "Searching..." : "No matching customers"}
+            </li>
+          )}
+        </ul>
+      )}
+    </div>
+  );
+}
@@ -2,7 +2,7 @@ import { useState } from "react";
 import { useParams, useNavigate, Link } from "react-router-dom";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { getInvoice, addPayment, postInvoice, voidInvoice, deleteInvoice, updateInvoice } from "../api/invoices";
-import { getCustomers } from "../api/customers";
+import { getCustomersByIds } from "../api/customers";
 import type { PaymentCreate } from "../api/types";
 import StatusBadge from "../components/StatusBadge";
 import { formatCurrency, formatDate } from "../utils/format";
@@ -30,10 +30,11 @@ export default function InvoiceDetailPage() {
     enabled: !!invoiceId,
   });
 
-  // Fetch customers for name lookup
+  // Fetch the invoice's customer for its name
   const { data: customers = [] } = useQuery({
-    queryKey: ["customers"],
-    queryFn: getCustomers,
+    queryKey: ["customers", "ids", [invoice?.customer_id]],
+    queryFn: () => getCustomersByIds([invoice!.customer_id]),
+    enabled: !!invoice,
   });
 
   // Payment mutation
@@ -103,14 +104,11 @@ export default function InvoiceDetailPage() {
     },
   });
 
-  const customerMap = new Map(customers.map((c) => [c.id, c.name]));
-  const customerName = invoice ? customerMap.get(invoice.customer_id) : null;
+  const customerName = customers[0]?.name;
 
-  // Calculate totals
-  const totalPaid =
-    invoice?.payments.reduce((sum, p) => sum + parseFloat(p.amount), 0) || 0;
-  const remainingBalance =
-    invoice ? parseFloat(invoice.amount) - totalPaid : 0;
+  // Totals are maintained by the backend
+  const totalPaid = invoice ? parseFloat(invoice.amount_paid) : 0;
+  const remainingBalance = invoice ? parseFloat(invoice.balance_due) : 0;
   const canAcceptPayment =
     invoice && invoice.status === "PENDING";
 
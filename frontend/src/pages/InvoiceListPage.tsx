@@ -2,35 +2,38 @@ import { useState } from "react";
 import { useQuery } from "@tanstack/react-query";
 import { Link } from "react-router-dom";
 import { getAllInvoices } from "../api/invoices";
-import { getCustomers } from "../api/customers";
-import type { InvoiceStatus } from "../api/types";
+import { getCustomersByIds } from "../api/customers";
+import type { Customer, InvoiceStatus } from "../api/types";
+import CustomerPicker from "../components/CustomerPicker";
 import StatusBadge from "../components/StatusBadge";
 import { formatCurrency, formatDate } from "../utils/format";
 
 export default function InvoiceListPage() {
   const [statusFilter, setStatusFilter] = useState<InvoiceStatus | "">("");
-  const [customerFilter, setCustomerFilter] = useState<number | "">("");
+  const [customerFilter, setCustomerFilter] = useState<Customer | null>(null);
   const [fromDate, setFromDate] = useState<string>("");
   const [toDate, setToDate] = useState<string>("");
 
-  // Fetch customers for dropdown
-  const { data: customers = [] } = useQuery({
-    queryKey: ["customers"],
-    queryFn: getCustomers,
-  });
-
   // Fetch invoices with filters
   const { data: invoices = [], isLoading, error } = useQuery({
-    queryKey: ["invoices", statusFilter, customerFilter, fromDate, toDate],
+    queryKey: ["invoices", statusFilter, customerFilter?.id, fromDate, toDate],
     queryFn: () =>
       getAllInvoices({
         status: statusFilter || undefined,
-        customer_id: customerFilter || undefined,
+        customer_id: customerFilter?.id,
         from: fromDate || undefined,
         to: toDate || undefined,
       }),
   });
 
+  // Names for just the customers on this page
+  const customerIds = [...new Set(invoices.map((invoice) => invoice.customer_id))].sort((a, b) => a - b);
+  const { data: customers = [] } = useQuery({
+    queryKey: ["customers", "ids", customerIds],
+    queryFn: () => getCustomersByIds(customerIds),
+    enabled: customerIds.length > 0,
+  });
+
   const customerMap = new Map(customers.map((c) => [c.id, c.name]));
 
   return (
@@ -58,18 +61,12 @@ export default function InvoiceListPage() {
           <label style={{ display: "block", marginBottom: "4px", fontSize: "14px", fontWeight: "500" }}>
             Customer
           </label>
-          <select
+          <CustomerPicker
             value={customerFilter}
-            onChange={(e) => setCustomerFilter(e.target.value === "" ? "" : Number(e.target.value))}
-            style={{ padding: "6px 12px", borderRadius: "6px", border: "1px solid #d1d5db", minWidth: "200px" }}
-          >
-            <option value="">All Customers</option>
-            {customers.map((customer) => (
-              <option key={customer.id} value={customer.id}>
-                {customer.name}
-              </option>
-            ))}
-          </select>
+            onChange={setCustomerFilter}
+            placeholder="All Customers"
+            style={{ minWidth: "200px" }}
+          />
         </div>
 
         <div>
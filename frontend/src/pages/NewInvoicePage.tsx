@@ -1,9 +1,9 @@
 import { useState } from "react";
 import { Link, useNavigate } from "react-router-dom";
-import { useQuery, useMutation } from "@tanstack/react-query";
+import { useMutation } from "@tanstack/react-query";
 import { createInvoice } from "../api/invoices";
-import { getCustomers } from "../api/customers";
-import type { InvoiceCreate } from "../api/types";
+import type { Customer, InvoiceCreate } from "../api/types";
+import CustomerPicker from "../components/CustomerPicker";
 
 export default function NewInvoicePage() {
   const navigate = useNavigate();
@@ -16,11 +16,7 @@ export default function NewInvoicePage() {
     status: "DRAFT",
   });
   const [errors, setErrors] = useState<Record<string, string>>({});
-
-  const { data: customers = [], isLoading: customersLoading } = useQuery({
-    queryKey: ["customers"],
-    queryFn: getCustomers,
-  });
+  const [customer, setCustomer] = useState<Customer | null>(null);
 
   const createMutation = useMutation({
     mutationFn: createInvoice,
@@ -83,28 +79,15 @@ export default function NewInvoicePage() {
               + New Customer
             </Link>
           </div>
-          {customersLoading ? (
-            <div>Loading customers...</div>
-          ) : (
-            <select
-              value={formData.customer_id}
-              onChange={(e) => setFormData({ ...formData, customer_id: Number(e.target.value) })}
-              style={{
-                width: "100%",
-                padding: "8px 12px",
-                borderRadius: "6px",
-                border: errors.customer_id ? "1px solid #ef4444" : "1px solid #d1d5db",
-              }}
-              required
-            >
-              <option value={0}>Select a customer</option>
-              {customers.map((customer) => (
-                <option key={customer.id} value={customer.id}>
-                  {customer.name}
-                </option>
-              ))}
-            </select>
-          )}
+          <CustomerPicker
+            value={customer}
+            onChange={(picked) => {
+              setCustomer(picked);
+              setFormData({ ...formData, customer_id: picked?.id ?? 0 });
+            }}
+            placeholder="Search for a customer"
+            hasError={!!errors.customer_id}
+          />
           {errors.customer_id && <div style={{ marginTop: "4px", color: "#ef4444", fontSize: "14px" }}>{errors.customer_id}</div>}
         </div>
 